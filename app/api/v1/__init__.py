@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from app.api.v1 import products
+from app.utils.responses import OrjsonResponse
 
-router = APIRouter()
+# v1 接口默认使用 orjson 序列化响应
+router = APIRouter(default_response_class=OrjsonResponse)
 
 # 包含各个模块的路由
 router.include_router(products.router, prefix="/products", tags=["products"])
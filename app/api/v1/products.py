@@ -1,33 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models import get_db
+from typing import List, Optional, Tuple, Union
+from app.models import get_session
+from app.models.database import get_pool_stats
+from app.config.config import Config
 from app.schemas.product import CoolerFilter
 from app.schemas.response import BaseResponse, PaginationParams
-from app.services.cooler_service import CoolerService
+from app.services.catalog_poller import catalog_poller
+from app.services.cooler_catalog import get_catalog
+from app.services.cooler_export import EXPORT_MEDIA_TYPES, iter_export, iter_export_async
+from app.services.cooler_projection import CoolerProjection
+from app.services.cooler_service import TOP_K, CoolerService, filter_cache
+from app.utils.cursor import decode_cursor
+from app.utils.query_stats import query_budget
+from app.utils.responses import render_base_response, render_json
+from app.utils.timing import timing_stats
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 单次选型最多执行的SQL语句数：修正系数、冷量、属性过滤、冷风机各一条
+FILTER_QUERY_BUDGET = 4
 
-@router.post("/cooler/filter", response_model=BaseResponse[dict])
-def filter_coolers(
+
+def cooler_projection(
+    fields: Optional[str] = Query(None, description="返回的字段，逗号分隔，如 model,cooling_capacity"),
+    compact: bool = Query(False, description="紧凑模式：返回表头 fields 和数组行 rows")
+) -> Optional[CoolerProjection]:
+    """解析字段投影参数"""
+    try:
+        return CoolerProjection.parse(fields, compact)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def cooler_page(
+    size: Optional[int] = Query(None, ge=1, le=Config.FILTER_PAGE_MAX_SIZE,
+                                description="分页大小，传入 size 或 cursor 时按冷量差值分页返回并附带 next_cursor"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor")
+) -> Optional[Tuple[int, Optional[Tuple[float, int]]]]:
+    """解析分页参数，返回 (分页大小, 上一页排序键)，未分页时返回None"""
+    if size is None and cursor is None:
+        return None
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return size or TOP_K, after
+
+
+async def filter_cooler_json(db: Union[Session, AsyncSession], filter_params: CoolerFilter,
+                             background_tasks: BackgroundTasks,
+                             projection: Optional[CoolerProjection] = None,
+                             page: Optional[Tuple[int, Optional[Tuple[float, int]]]] = None) -> bytes:
+    """
+    异步会话走异步链路；同步会话在线程池中执行，内存目录模式不访问数据库，直接执行
+
+    分页请求按游标逐页计算，不经过结果缓存
+    """
+    if page is not None:
+        size, after = page
+        if isinstance(db, AsyncSession):
+            result = await CoolerService.filter_cooler_page_async(db, filter_params, size, after, projection)
+        elif get_catalog() is not None:
+            result = CoolerService.filter_cooler_page(db, filter_params, size, after, projection)
+        else:
+            result = await run_in_threadpool(CoolerService.filter_cooler_page, db, filter_params, size, after, projection)
+        return CoolerService.serialize(result)
+    if isinstance(db, AsyncSession):
+        return await CoolerService.filter_cooler_json_async(db, filter_params, background_tasks, projection)
+    if get_catalog() is not None:
+        return CoolerService.filter_cooler_json(db, filter_params, background_tasks, projection)
+    return await run_in_threadpool(CoolerService.filter_cooler_json, db, filter_params, background_tasks, projection)
+
+
+@router.post("/cooler/filter", response_model=BaseResponse[dict],
+             dependencies=[Depends(query_budget(FILTER_QUERY_BUDGET))])
+async def filter_coolers(
     filter_params: CoolerFilter,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    projection: Optional[CoolerProjection] = Depends(cooler_projection),
+    page: Optional[Tuple[int, Optional[Tuple[float, int]]]] = Depends(cooler_page),
+    db: Union[Session, AsyncSession] = Depends(get_session)
 ):
     """过滤产品"""
     try:
-        result = CoolerService.filter_cooler(db, filter_params)
-        return BaseResponse(
-            message="Products filtered successfully",
-            data=result
+        data_json = await filter_cooler_json(db, filter_params, background_tasks, projection, page)
+        return Response(
+            content=render_base_response(data_json, message="Products filtered successfully"),
+            media_type="application/json"
         )
     except Exception as e:
         logger.error(f"Error filtering products: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+
+# 数据库模式下语句数随分组和属性条件组合增长，不设预算
+@router.post("/cooler/filter/batch", response_model=BaseResponse[list],
+             dependencies=[Depends(query_budget(None))])
+async def filter_coolers_batch(
+    filter_params: List[CoolerFilter],
+    projection: Optional[CoolerProjection] = Depends(cooler_projection),
+    db: Union[Session, AsyncSession] = Depends(get_session)
+):
+    """批量过滤冷风机，每个过滤条件对应一组结果"""
+    if len(filter_params) > Config.FILTER_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds {Config.FILTER_BATCH_MAX_SIZE}")
+    try:
+        if isinstance(db, AsyncSession):
+            result = await db.run_sync(CoolerService.filter_cooler_batch, filter_params, projection)
+        else:
+            result = await run_in_threadpool(CoolerService.filter_cooler_batch, db, filter_params, projection)
+        # 结果直接序列化，不再经过 response_model 二次校验
+        return Response(
+            content=render_base_response(render_json(result), message="Coolers filtered successfully"),
+            media_type="application/json"
+        )
+    except Exception as e:
+        logger.error(f"Error filtering coolers in batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # http://localhost:8080/api/v1/products/cooler/filter/-30/-25/150/R404A/direct/4.5
 # evaporating_temp: float,
 #     repo_temp: float,
@@ -35,14 +132,22 @@ def filter_coolers(
 #     refrigerant: str,
 #     refrigerant_supply_type: str,
 #     fan_distance: float,
-@router.get("/cooler/filter", response_model=BaseResponse[dict])
-def filter_coolers_get(
+@router.get("/cooler/filter", response_model=BaseResponse[dict],
+            dependencies=[Depends(query_budget(FILTER_QUERY_BUDGET))])
+async def filter_coolers_get(
         evaporating_temp: float,
         repo_temp: float,
         required_cooling_cap: float,
         refrigerant: str,
         refrigerant_supply_type: str,
-        db: Session = Depends(get_db)
+        background_tasks: BackgroundTasks,
+        fan_distance: Optional[float] = None,
+        series: Optional[str] = None,
+        min_heat_exchange_area: Optional[float] = None,
+        max_heat_exchange_area: Optional[float] = None,
+        projection: Optional[CoolerProjection] = Depends(cooler_projection),
+        page: Optional[Tuple[int, Optional[Tuple[float, int]]]] = Depends(cooler_page),
+        db: Union[Session, AsyncSession] = Depends(get_session)
 ):
     """过滤冷风机（GET请求）"""
     try:
@@ -52,13 +157,42 @@ def filter_coolers_get(
             required_cooling_cap=required_cooling_cap,
             refrigerant=refrigerant,
             refrigerant_supply_type=refrigerant_supply_type,
-            fan_distance=0
+            fan_distance=fan_distance or 0,
+            series=series,
+            min_heat_exchange_area=min_heat_exchange_area,
+            max_heat_exchange_area=max_heat_exchange_area
         )
-        result = CoolerService.filter_cooler(db, filter_params)
-        return BaseResponse(
-            message="Coolers filtered successfully",
-            data=result
+        data_json = await filter_cooler_json(db, filter_params, background_tasks, projection, page)
+        return Response(
+            content=render_base_response(data_json, message="Coolers filtered successfully"),
+            media_type="application/json"
         )
     except Exception as e:
         logger.error(f"Error filtering coolers: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/cooler/export")
+async def export_coolers(
+        export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="导出格式：ndjson 或 csv")
+):
+    """流式导出全部冷风机及各工况、制冷剂的冷量，每条冷量记录一行"""
+    content = iter_export_async(export_format) if Config.ASYNC_DB_ENABLED else iter_export(export_format)
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="coolers.{export_format}"'}
+    )
+
+
+@router.get("/cooler/stats", response_model=BaseResponse[dict])
+async def cooler_stats():
+    """选型缓存、目录版本轮询、数据库连接池及各阶段耗时统计"""
+    return BaseResponse(
+        data={
+            "cache": filter_cache.stats(),
+            "catalog": catalog_poller.stats(),
+            "db_pool": get_pool_stats(),
+            "timing": timing_stats.snapshot()
+        }
+    )
\ No newline at end of file
@@ -15,6 +15,51 @@ class BaseConfig(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
     DB_CHARSET: str = "utf8mb4"
+    # 数据库连接URL，为空时按上述配置拼接 pymysql 连接
+    DATABASE_URL: Optional[str] = None
+    # 是否启用异步请求链路(异步引擎和会话)，异步连接URL为空时按上述配置拼接 aiomysql 连接
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # 连接池大小及允许的溢出连接数
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    
+    # 冷风机目录配置：启用后启动时将选型所需数据加载到内存，/cooler/filter 不再访问数据库
+    CATALOG_ENABLED: bool = False
+    # 目录二进制快照路径(python -m app.utils.snapshot_catalog 生成)，配置后启动时从快照加载目录，不查询数据库
+    CATALOG_SNAPSHOT_PATH: Optional[str] = None
+    # 目录版本号轮询间隔(秒)，为0时不轮询；数据库目录变更后增量更新进程内目录和结果缓存
+    CATALOG_POLL_INTERVAL: float = 5
+    # 单次变更涉及的型号超过该数量时整体重新加载目录
+    CATALOG_DELTA_MAX_MODELS: int = 5000
+    # 未启用目录时，是否以单条SQL(关联、过滤、按冷量差值排序取前k条)完成选型
+    FILTER_DB_PUSHDOWN: bool = False
+    # 工况修正系数超出网格范围时是否钳制到边界取值，否则按工况等级取值
+    SC_QUANT_CLAMP: bool = False
+    # 系数表数据文件(JSON)，为空时使用内置系数
+    COEFFICIENT_FILE: Optional[str] = None
+    # 选型结果缓存：容量、有效期(秒)、过期后仍可返回旧值并后台刷新的时长(秒)、浮点参数量化精度
+    FILTER_CACHE_ENABLED: bool = True
+    FILTER_CACHE_SIZE: int = 1024
+    FILTER_CACHE_TTL: float = 300
+    FILTER_CACHE_STALE_TTL: float = 60
+    FILTER_CACHE_QUANTUM: float = 0.01
+    # 批量选型单次请求的最大条数
+    FILTER_BATCH_MAX_SIZE: int = 1000
+    # 分页选型单页的最大条数
+    FILTER_PAGE_MAX_SIZE: int = 100
+    # 目录导出时每批从数据库游标读取的行数
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # 是否记录各阶段耗时并返回 Server-Timing 响应头
+    SERVER_TIMING_ENABLED: bool = True
+    # 是否采集 /metrics 指标
+    METRICS_ENABLED: bool = True
+    # 慢查询日志阈值(毫秒)，超过时记录语句和参数
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    # 单个请求默认的SQL语句数预算，严格模式下超出时请求失败(用于测试)，否则记录警告
+    QUERY_BUDGET: Optional[int] = 50
+    QUERY_BUDGET_STRICT: bool = False
     
     # 日志配置
     LOG_LEVEL: str = "INFO"
@@ -1,5 +1,12 @@
-from .database import Base, engine, get_db
+from app.config.config import Config
+from app.utils.logger import logger
+from .database import Base, engine, get_db, get_async_db, get_session
 # from .product import Category, Product
 
-# 创建所有表
-Base.metadata.create_all(bind=engine)
+# 创建所有表；配置了目录快照时数据库不可用不阻止启动，由快照提供选型
+try:
+    Base.metadata.create_all(bind=engine)
+except Exception as e:
+    if not (Config.CATALOG_ENABLED and Config.CATALOG_SNAPSHOT_PATH):
+        raise
+    logger.error(f"Failed to create tables, serving from catalog snapshot: {str(e)}")
@@ -0,0 +1,140 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import TypeVar, Generic, Optional, List, Any, AsyncIterator, Sequence, Set, Tuple
+
+from app.models.dao import (
+    Cooler,
+    CoolingCapacity,
+    SCQuant
+)
+from app.models.repositories import (
+    COOLER_RESPONSE_COLUMNS,
+    active_cooler_capacity,
+    cooler_attribute_filters,
+    cooler_export_statement,
+    nearest_coolers_statement,
+    ranked_coolers_statement
+)
+from app.utils.enums import Refrigerant
+
+# 创建泛型类型变量
+ModelType = TypeVar('ModelType')
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """异步基础仓库类，提供选型链路所需的只读方法"""
+
+    def __init__(self, session: AsyncSession, model_class: type):
+        self.session = session
+        self.model_class = model_class
+
+
+class AsyncCoolerRepository(AsyncBaseRepository[Cooler]):
+    """冷风机异步仓库类"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, Cooler)
+
+    async def get_by_cooler_ids(self, cooler_id: List[str]) -> List[Cooler]:
+        """根据冷风机ID获取记录"""
+        result = await self.session.execute(select(Cooler).where(
+            Cooler.model.in_(cooler_id),
+            Cooler.is_deleted == 0
+        ))
+        return list(result.scalars().all())
+
+    async def get_columns_by_cooler_ids(self, cooler_id: List[str], columns: Sequence) -> List[Any]:
+        """根据冷风机ID获取指定列"""
+        result = await self.session.execute(select(*columns).where(
+            Cooler.model.in_(cooler_id),
+            Cooler.is_deleted == 0
+        ))
+        return list(result.all())
+
+    async def stream_with_capacities(self, batch_size: int) -> AsyncIterator[Sequence[Any]]:
+        """以服务端游标分批读取全部冷风机及冷量，异步版本"""
+        result = await self.session.stream(cooler_export_statement().execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_models_by_attributes(self, fin_spacing_num: Optional[float] = None, series: Optional[str] = None,
+                                       min_heat_exchange_area: Optional[float] = None,
+                                       max_heat_exchange_area: Optional[float] = None) -> Set[str]:
+        """获取满足片距、系列和换热面积范围条件的冷风机型号"""
+        result = await self.session.execute(select(Cooler.model).where(
+            Cooler.is_deleted == 0,
+            *cooler_attribute_filters(fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area)
+        ))
+        return set(result.scalars().all())
+
+
+class AsyncCoolingCapacityRepository(AsyncBaseRepository[CoolingCapacity]):
+    """冷量映射表异步仓库类"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, CoolingCapacity)
+
+    async def get_by_working_status_and_refrigerant(self, working_status: str, refrigerant: str = Refrigerant.R404A.value) -> List[CoolingCapacity]:
+        """根据工况和制冷剂获取未删除冷风机的冷量映射记录，已删除冷风机的冷量不参与排序"""
+        result = await self.session.execute(select(CoolingCapacity).where(
+            CoolingCapacity.working_status == working_status,
+            CoolingCapacity.refrigerant == refrigerant,
+            CoolingCapacity.is_deleted == 0,
+            active_cooler_capacity()
+        ))
+        return list(result.scalars().all())
+
+    async def get_nearest_coolers(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        limit: int,
+        fin_spacing_num: Optional[float] = None,
+        series: Optional[str] = None,
+        min_heat_exchange_area: Optional[float] = None,
+        max_heat_exchange_area: Optional[float] = None,
+        columns: Sequence = COOLER_RESPONSE_COLUMNS
+    ) -> List[Any]:
+        """单条SQL查询与目标冷量最接近的冷风机"""
+        result = await self.session.execute(nearest_coolers_statement(
+            working_status, refrigerant, target_cap, limit,
+            fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area, columns
+        ))
+        return list(result.all())
+
+    async def get_ranked_coolers(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        columns: Sequence = COOLER_RESPONSE_COLUMNS,
+        **attribute_filters
+    ) -> List[Any]:
+        """按 (冷量差值, 冷风机ID) 分页查询冷风机"""
+        result = await self.session.execute(ranked_coolers_statement(
+            working_status, refrigerant, target_cap, limit, after, columns=columns, **attribute_filters
+        ))
+        return list(result.all())
+
+
+class AsyncSCQuantRepository(AsyncBaseRepository[SCQuant]):
+    """工况修正系数异步仓库类"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, SCQuant)
+
+    async def get_by_evaporating_temp_and_delta_t(
+        self,
+        evaporating_temp: float,
+        delta_t: float
+    ) -> Optional[SCQuant]:
+        """根据蒸发温度和温差获取工况修正系数"""
+        result = await self.session.execute(select(SCQuant).where(
+            SCQuant.evaporating_temp == evaporating_temp,
+            SCQuant.delta_t == delta_t,
+            SCQuant.is_deleted == 0
+        ))
+        return result.scalars().first()
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Index, BigInteger
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, BigInteger, event
 from datetime import datetime
 
 # 导入基础模型类
 from app.models.database import Base
 
+# 自增主键类型，SQLite 仅 INTEGER 主键支持自增
+BigIntegerId = BigInteger().with_variant(Integer, "sqlite")
+
+# 目录版本号所在行
+CATALOG_VERSION_ROW_ID = 1
+
 
 # class Image(Base):
 #     """图片模型"""
@@ -37,11 +43,13 @@ from app.models.database import Base
 class Cooler(Base):
     """冷风机模型"""
     __tablename__ = "cooler"
-    __table_args__ = {
-        'comment': '冷风机'
-    }
+    __table_args__ = (
+        # 按型号关联冷量映射表
+        Index('ix_cooler_model_deleted', 'model', 'is_deleted'),
+        {'comment': '冷风机'}
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='自增主键')
+    id = Column(BigIntegerId, primary_key=True, autoincrement=True, comment='自增主键')
     heat_exchange_area = Column(Float, nullable=False, comment='换热面积')
     tube_volumn = Column(Float, nullable=True, comment='管容(dm³)')
     air_flow_rate = Column(Float, nullable=True, comment='风量(m³/h)')
@@ -60,11 +68,12 @@ class Cooler(Base):
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment='更新时间')
     is_deleted = Column(Integer, default=0, nullable=True, comment='逻辑删除')
     comment = Column(String(255), nullable=True, comment='参数注释')
+    content_hash = Column(String(32), nullable=True, comment='内容哈希，增量导入时比对')
 
     def to_pydantic(self, capacity: float, working_status: str):
-        """转换为Pydantic模型实例"""
+        """转换为Pydantic模型实例，数据库字段类型可信，跳过校验"""
         from app.schemas.equipment import CoolerResponse
-        return CoolerResponse(
+        return CoolerResponse.model_construct(
             id=self.id,
             cooling_capacity=capacity,
             working_status=working_status,
@@ -89,11 +98,13 @@ class Cooler(Base):
 class CoolingCapacity(Base):
     """冷量映射表模型"""
     __tablename__ = "cooling_capacity"
-    __table_args__ = {
-        'comment': '冷量映射表'
-    }
+    __table_args__ = (
+        # 覆盖索引：按工况、制冷剂取冷量时无需回表
+        Index('ix_cooling_capacity_status_refrigerant', 'working_status', 'refrigerant', 'is_deleted', 'capacity', 'cooler_id'),
+        {'comment': '冷量映射表'}
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='自增主键')
+    id = Column(BigIntegerId, primary_key=True, autoincrement=True, comment='自增主键')
     cooler_id = Column(String(255), nullable=False, comment='冷风机的id')
     working_status = Column(String(100), nullable=False, comment='工况：SC1;SC2;SC3;SC4;SC5')
     refrigerant = Column(String(100), nullable=False, comment='制冷剂')
@@ -101,6 +112,7 @@ class CoolingCapacity(Base):
     created_time = Column(DateTime, default=datetime.now, nullable=True, comment='创建时间')
     updated_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=True, comment='更新时间')
     is_deleted = Column(Integer, default=0, nullable=True, comment='逻辑删除')
+    content_hash = Column(String(32), nullable=True, comment='内容哈希，增量导入时比对')
 
     def to_pydantic(self):
         """转换为Pydantic模型实例"""
@@ -119,17 +131,20 @@ class CoolingCapacity(Base):
 class SCQuant(Base):
     """工况修正系数模型"""
     __tablename__ = "sc_quant"
-    __table_args__ = {
-        'comment': '工况修正系数'
-    }
+    __table_args__ = (
+        # 覆盖索引：按蒸发温度、温差取修正系数时无需回表
+        Index('ix_sc_quant_temp_delta', 'evaporating_temp', 'delta_t', 'is_deleted', 'quant'),
+        {'comment': '工况修正系数'}
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='自增主键')
+    id = Column(BigIntegerId, primary_key=True, autoincrement=True, comment='自增主键')
     evaporating_temp = Column(Float, nullable=False, comment='蒸发温度')
     delta_t = Column(Float, nullable=False, comment='温差')
     quant = Column(Float, nullable=True, comment='修正系数')
     create_time = Column(DateTime, default=datetime.now, nullable=False, comment='创建时间')
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment='更新时间')
     is_deleted = Column(Integer, default=0, nullable=True, comment='逻辑删除')
+    content_hash = Column(String(32), nullable=True, comment='内容哈希，增量导入时比对')
 
     def to_pydantic(self):
         """转换为Pydantic模型实例"""
@@ -143,3 +158,35 @@ class SCQuant(Base):
             update_time=self.update_time,
             is_deleted=self.is_deleted
         )
+
+
+class CatalogVersion(Base):
+    """目录版本号，单行表，导入和写操作在同一事务中加1"""
+    __tablename__ = "catalog_version"
+    __table_args__ = {'comment': '目录版本号'}
+
+    id = Column(Integer, primary_key=True, autoincrement=False, comment='固定为1')
+    version = Column(BigInteger, nullable=False, default=0, comment='版本号，每次目录变更加1')
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment='更新时间')
+
+
+@event.listens_for(CatalogVersion.__table__, "after_create")
+def _seed_catalog_version(target, connection, **kw):
+    """建表时写入版本号行，与 catalog_version.sql 一致"""
+    connection.execute(target.insert().values(id=CATALOG_VERSION_ROW_ID, version=0, update_time=datetime.now()))
+
+
+class CatalogChange(Base):
+    """目录变更日志，记录每个版本涉及的冷风机"""
+    __tablename__ = "catalog_change"
+    __table_args__ = (
+        # 按版本号增量拉取变更
+        Index('ix_catalog_change_version', 'version'),
+        {'comment': '目录变更日志'}
+    )
+
+    id = Column(BigIntegerId, primary_key=True, autoincrement=True, comment='自增主键')
+    version = Column(BigInteger, nullable=False, comment='变更后的目录版本号')
+    table_name = Column(String(50), nullable=False, comment='变更的表：cooler;cooling_capacity;sc_quant')
+    cooler_id = Column(String(255), nullable=True, comment='变更涉及的冷风机型号，为空表示整表变更')
+    create_time = Column(DateTime, default=datetime.now, nullable=False, comment='创建时间')
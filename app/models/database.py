@@ -1,26 +1,56 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from app.config.config import Config
+from app.models.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_stats
+from app.utils import query_stats
 
 # 创建数据库连接URL
-DATABASE_URL = f"mysql+pymysql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}?charset={Config.DB_CHARSET}"
+DATABASE_URL = Config.DATABASE_URL or f"mysql+pymysql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}?charset={Config.DB_CHARSET}"
+ASYNC_DATABASE_URL = Config.ASYNC_DATABASE_URL or f"mysql+aiomysql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}?charset={Config.DB_CHARSET}"
+
+
+def engine_options(url: str, pool_class: type) -> dict:
+    """连接池参数，SQLite 内存库使用默认连接池"""
+    if url.startswith("sqlite") and ":memory:" in url:
+        return {}
+    return {
+        "poolclass": pool_class,
+        "pool_pre_ping": True,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW
+    }
+
 
 # 创建数据库引擎
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, TimedQueuePool))
+
+# 统计每个请求执行的SQL语句数和耗时，记录慢查询
+query_stats.instrument(engine)
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎和会话工厂，仅在启用异步请求链路时创建
+async_engine = None
+AsyncSessionLocal = None
+if Config.ASYNC_DB_ENABLED:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool))
+    query_stats.instrument(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # 创建基础模型类
 Base = declarative_base()
 
+def get_pool_stats() -> dict:
+    """同步及异步引擎的连接池统计"""
+    stats = {"sync": pool_stats(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.pool)
+    return stats
+
 # 依赖项：获取数据库会话
 def get_db():
     db = SessionLocal()
@@ -29,6 +59,14 @@ def get_db():
     finally:
         db.close()
 
+# 依赖项：获取异步数据库会话
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 依赖项：按配置获取同步或异步数据库会话
+get_session = get_async_db if Config.ASYNC_DB_ENABLED else get_db
+
 def db_session_decorator(func):
     def wrapper(*args, **kwargs):
         session = SessionLocal()
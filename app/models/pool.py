@@ -0,0 +1,70 @@
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """连接池取连接等待时间统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += elapsed
+            if elapsed > self.max:
+                self.max = elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "wait_count": self.count,
+                "wait_total_ms": self.total * 1000,
+                "wait_max_ms": self.max * 1000
+            }
+
+
+class _TimedPoolMixin:
+    """记录从连接池取连接的耗时(含排队等待和新建溢出连接)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """记录取连接耗时的连接池"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """记录取连接耗时的异步连接池"""
+
+
+def pool_stats(pool) -> dict:
+    """连接池容量、占用、溢出及取连接等待统计"""
+    stats = {
+        "pool_class": type(pool).__name__
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0)
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.snapshot())
+    return stats
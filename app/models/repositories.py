@@ -1,9 +1,14 @@
+from sqlalchemy import ColumnElement, Select, and_, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from typing import TypeVar, Generic, Optional, List, Dict, Any
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Iterable, Iterator, Sequence, Set, Tuple
 from datetime import datetime
 
 # 导入所有模型
 from app.models.dao import (
+    CATALOG_VERSION_ROW_ID,
+    CatalogChange,
+    CatalogVersion,
     Cooler,
     CoolingCapacity,
     SCQuant
@@ -13,6 +18,164 @@ from app.utils.enums import Refrigerant
 # 创建泛型类型变量
 ModelType = TypeVar('ModelType')
 
+# 目录表及记入变更日志的冷风机型号列，None 表示按整表变更记录
+CATALOG_CHANGE_COLUMNS = {
+    Cooler.__tablename__: "model",
+    CoolingCapacity.__tablename__: "cooler_id",
+    SCQuant.__tablename__: None
+}
+
+# 选型结果(CoolerResponse)所需的冷风机列
+COOLER_RESPONSE_COLUMNS = (
+    Cooler.id,
+    Cooler.heat_exchange_area,
+    Cooler.tube_volumn,
+    Cooler.air_flow_rate,
+    Cooler.total_fan_power,
+    Cooler.total_fan_current,
+    Cooler.air_flow,
+    Cooler.defrost_power,
+    Cooler.pipe_dia,
+    Cooler.noise,
+    Cooler.weight,
+    Cooler.model,
+    Cooler.fin_spacing,
+    Cooler.series,
+    Cooler.comment,
+    Cooler.is_deleted
+)
+
+
+def cooler_attribute_filters(
+    fin_spacing_num: Optional[float] = None,
+    series: Optional[str] = None,
+    min_heat_exchange_area: Optional[float] = None,
+    max_heat_exchange_area: Optional[float] = None
+) -> list:
+    """片距、系列和换热面积范围过滤条件"""
+    conditions = []
+    if fin_spacing_num:
+        conditions.append(Cooler.fin_spacing_num == fin_spacing_num)
+    if series:
+        conditions.append(Cooler.series == series)
+    if min_heat_exchange_area is not None:
+        conditions.append(Cooler.heat_exchange_area >= min_heat_exchange_area)
+    if max_heat_exchange_area is not None:
+        conditions.append(Cooler.heat_exchange_area <= max_heat_exchange_area)
+    return conditions
+
+
+def active_cooler_capacity() -> ColumnElement[bool]:
+    """冷量记录对应的冷风机未删除；以子查询过滤，同一型号有多条冷风机记录时冷量记录不重复"""
+    return CoolingCapacity.cooler_id.in_(select(Cooler.model).where(Cooler.is_deleted == 0))
+
+
+def nearest_coolers_statement(
+    working_status: str,
+    refrigerant: str,
+    target_cap: float,
+    limit: int,
+    fin_spacing_num: Optional[float] = None,
+    series: Optional[str] = None,
+    min_heat_exchange_area: Optional[float] = None,
+    max_heat_exchange_area: Optional[float] = None,
+    columns: Sequence = COOLER_RESPONSE_COLUMNS
+) -> Select:
+    """
+    与目标冷量最接近的冷风机查询语句
+
+    关联冷风机表并下推工况、制冷剂及片距、系列、换热面积条件，按冷量差值排序取前 limit 条，
+    只查询 columns 指定的冷风机列，默认为 CoolerResponse 需要的列
+    """
+    return select(
+        CoolingCapacity.capacity.label("cooling_capacity"),
+        CoolingCapacity.working_status,
+        *columns
+    ).join(
+        Cooler, Cooler.model == CoolingCapacity.cooler_id
+    ).where(
+        CoolingCapacity.working_status == working_status,
+        CoolingCapacity.refrigerant == refrigerant,
+        CoolingCapacity.is_deleted == 0,
+        Cooler.is_deleted == 0,
+        *cooler_attribute_filters(fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area)
+    ).order_by(
+        func.abs(CoolingCapacity.capacity - target_cap), Cooler.id
+    ).limit(limit)
+
+
+def ranked_coolers_statement(
+    working_status: str,
+    refrigerant: str,
+    target_cap: float,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+    fin_spacing_num: Optional[float] = None,
+    series: Optional[str] = None,
+    min_heat_exchange_area: Optional[float] = None,
+    max_heat_exchange_area: Optional[float] = None,
+    columns: Sequence = COOLER_RESPONSE_COLUMNS
+) -> Select:
+    """
+    按 (冷量差值, 冷风机ID) 分页的查询语句
+
+    在 nearest_coolers_statement 基础上返回差值列 distance，并以 after(上一页最后一条的排序键)
+    作为 keyset 条件，翻页不需要 OFFSET 跳过前面的记录
+    """
+    distance = func.abs(CoolingCapacity.capacity - target_cap)
+    statement = nearest_coolers_statement(
+        working_status, refrigerant, target_cap, limit,
+        fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area, columns
+    ).add_columns(distance.label("distance"))
+    if after is not None:
+        statement = statement.where(or_(
+            distance > after[0],
+            and_(distance == after[0], Cooler.id > after[1])
+        ))
+    return statement
+
+
+# 目录导出的冷风机列
+COOLER_EXPORT_COLUMNS = (
+    Cooler.id,
+    Cooler.model,
+    Cooler.series,
+    Cooler.heat_exchange_area,
+    Cooler.tube_volumn,
+    Cooler.air_flow_rate,
+    Cooler.total_fan_power,
+    Cooler.total_fan_current,
+    Cooler.air_flow,
+    Cooler.defrost_power,
+    Cooler.pipe_dia,
+    Cooler.noise,
+    Cooler.weight,
+    Cooler.fin_spacing,
+    Cooler.fin_spacing_num,
+    Cooler.comment
+)
+
+
+def cooler_export_statement() -> Select:
+    """
+    全部未删除冷风机及其各工况、制冷剂冷量的查询语句
+
+    每条冷量记录一行，没有冷量记录的冷风机也输出一行(冷量列为空)，按冷风机ID、工况、制冷剂排序
+    """
+    return select(
+        *COOLER_EXPORT_COLUMNS,
+        CoolingCapacity.working_status,
+        CoolingCapacity.refrigerant,
+        CoolingCapacity.capacity
+    ).outerjoin(
+        CoolingCapacity,
+        (CoolingCapacity.cooler_id == Cooler.model) & (CoolingCapacity.is_deleted == 0)
+    ).where(
+        Cooler.is_deleted == 0
+    ).order_by(
+        Cooler.id, CoolingCapacity.working_status, CoolingCapacity.refrigerant
+    )
+
 
 class BaseRepository(Generic[ModelType]):
     """基础仓库类，提供通用的CRUD方法"""
@@ -20,11 +183,26 @@ class BaseRepository(Generic[ModelType]):
     def __init__(self, session: Session, model_class: type):
         self.session = session
         self.model_class = model_class
+
+    def _catalog_changes(self, instance) -> List[Tuple[str, Optional[str]]]:
+        """记录对应的目录变更日志条目，非目录表返回空列表"""
+        table_name = self.model_class.__tablename__
+        if table_name not in CATALOG_CHANGE_COLUMNS:
+            return []
+        column = CATALOG_CHANGE_COLUMNS[table_name]
+        cooler_id = getattr(instance, column) if column is not None else None
+        return [(table_name, str(cooler_id) if cooler_id is not None else None)]
+
+    def _record_catalog_changes(self, changes: List[Tuple[str, Optional[str]]]) -> None:
+        """在本次写入的事务中递增目录版本号，运行中的服务据此增量更新目录"""
+        if changes:
+            record_catalog_changes(self.session.connection(), changes)
     
     def create(self, **kwargs) -> ModelType:
         """创建新记录"""
         instance = self.model_class(**kwargs)
         self.session.add(instance)
+        self._record_catalog_changes(self._catalog_changes(instance))
         self.session.commit()
         self.session.refresh(instance)
         return instance
@@ -47,17 +225,26 @@ class BaseRepository(Generic[ModelType]):
                 query = query.filter(getattr(self.model_class, field) == value)
         
         return query.first()
-    
+
+    def get_all(self) -> List[ModelType]:
+        """获取全部未删除记录"""
+        return self.session.query(self.model_class).filter(
+            self.model_class.is_deleted == 0
+        ).order_by(self.model_class.id).all()
+
     def update(self, id: int, **kwargs) -> Optional[ModelType]:
         """更新记录"""
         instance = self.get_by_id(id)
         if not instance:
             return None
+        # 修改型号时新旧型号都记入变更日志
+        changes = self._catalog_changes(instance)
         
         for field, value in kwargs.items():
             if hasattr(instance, field):
                 setattr(instance, field, value)
         
+        self._record_catalog_changes(changes + self._catalog_changes(instance))
         self.session.commit()
         self.session.refresh(instance)
         return instance
@@ -70,6 +257,7 @@ class BaseRepository(Generic[ModelType]):
         
         instance.is_deleted = 1
         instance.deleted_at = datetime.now()
+        self._record_catalog_changes(self._catalog_changes(instance))
         self.session.commit()
         return True
     
@@ -169,6 +357,29 @@ class CoolerRepository(BaseRepository[Cooler]):
             Cooler.is_deleted == 0
         ).all()
 
+    def get_columns_by_cooler_ids(self, cooler_id: List[str], columns: Sequence) -> List[Any]:
+        """根据冷风机ID获取指定列"""
+        return self.session.execute(select(*columns).where(
+            Cooler.model.in_(cooler_id),
+            Cooler.is_deleted == 0
+        )).all()
+
+    def stream_with_capacities(self, batch_size: int) -> Iterator[Sequence[Any]]:
+        """以服务端游标分批读取全部冷风机及冷量，每次产出一批结果行，内存占用与总行数无关"""
+        result = self.session.execute(cooler_export_statement().execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+
+    def get_models_by_attributes(self, fin_spacing_num: Optional[float] = None, series: Optional[str] = None,
+                                 min_heat_exchange_area: Optional[float] = None,
+                                 max_heat_exchange_area: Optional[float] = None) -> Set[str]:
+        """获取满足片距、系列和换热面积范围条件的冷风机型号"""
+        query = self.session.query(Cooler.model).filter(
+            Cooler.is_deleted == 0,
+            *cooler_attribute_filters(fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area)
+        )
+        return {model for model, in query.all()}
+
 
 class CoolingCapacityRepository(BaseRepository[CoolingCapacity]):
     """冷量映射表仓库类"""
@@ -186,13 +397,47 @@ class CoolingCapacityRepository(BaseRepository[CoolingCapacity]):
         return query.offset(skip).limit(limit).all()
     
     def get_by_working_status_and_refrigerant(self, working_status: str, refrigerant: str = Refrigerant.R404A.value) -> List[CoolingCapacity]:
-        """根据冷风机ID和工况获取冷量映射记录"""
+        """根据工况和制冷剂获取未删除冷风机的冷量映射记录，已删除冷风机的冷量不参与排序"""
         return self.session.query(CoolingCapacity).filter(
             CoolingCapacity.working_status == working_status,
             CoolingCapacity.refrigerant == refrigerant,
-            CoolingCapacity.is_deleted == 0
+            CoolingCapacity.is_deleted == 0,
+            active_cooler_capacity()
         ).all()
 
+    def get_nearest_coolers(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        limit: int,
+        fin_spacing_num: Optional[float] = None,
+        series: Optional[str] = None,
+        min_heat_exchange_area: Optional[float] = None,
+        max_heat_exchange_area: Optional[float] = None,
+        columns: Sequence = COOLER_RESPONSE_COLUMNS
+    ) -> List[Any]:
+        """单条SQL查询与目标冷量最接近的冷风机"""
+        return self.session.execute(nearest_coolers_statement(
+            working_status, refrigerant, target_cap, limit,
+            fin_spacing_num, series, min_heat_exchange_area, max_heat_exchange_area, columns
+        )).all()
+
+    def get_ranked_coolers(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        columns: Sequence = COOLER_RESPONSE_COLUMNS,
+        **attribute_filters
+    ) -> List[Any]:
+        """按 (冷量差值, 冷风机ID) 分页查询冷风机，attribute_filters 为片距、系列和换热面积条件"""
+        return self.session.execute(ranked_coolers_statement(
+            working_status, refrigerant, target_cap, limit, after, columns=columns, **attribute_filters
+        )).all()
+
     # def get_by_working_status_and_cap(self, capacity: float, working_status: str) -> Optional[CoolingCapacity]:
     #     """根据冷风机ID和工况获取冷量映射记录"""
     #     return self.session.query(CoolingCapacity).filter(
@@ -211,10 +456,27 @@ class CoolingCapacityRepository(BaseRepository[CoolingCapacity]):
         count = query.update({
             CoolingCapacity.is_deleted: 1
         })
-        
+        if count:
+            self._record_catalog_changes([(CoolingCapacity.__tablename__, str(cooler_id))])
+
         self.session.commit()
         return count > 0
 
+    def get_by_cooler_ids(self, cooler_id: List[str]) -> List[CoolingCapacity]:
+        """根据冷风机ID获取所有冷量映射记录，按ID排序"""
+        return self.session.query(CoolingCapacity).filter(
+            CoolingCapacity.cooler_id.in_(cooler_id),
+            CoolingCapacity.is_deleted == 0
+        ).order_by(CoolingCapacity.id).all()
+
+    def get_partitions_by_cooler_ids(self, cooler_id: List[str]) -> Set[Tuple[str, str]]:
+        """冷风机涉及的 (工况, 制冷剂) 分区，包含已逻辑删除的记录"""
+        return {tuple(row) for row in self.session.execute(
+            select(CoolingCapacity.working_status, CoolingCapacity.refrigerant).where(
+                CoolingCapacity.cooler_id.in_(cooler_id)
+            ).distinct()
+        )}
+
 
 class SCQuantRepository(BaseRepository[SCQuant]):
     """工况修正系数仓库类"""
@@ -234,6 +496,28 @@ class SCQuantRepository(BaseRepository[SCQuant]):
             SCQuant.is_deleted == 0
         ).first()
     
+    def get_by_evaporating_temp_and_delta_t_pairs(
+        self,
+        pairs: List[Tuple[float, float]]
+    ) -> Dict[Tuple[float, float], SCQuant]:
+        """批量获取多组(蒸发温度, 温差)的工况修正系数"""
+        if not pairs:
+            return {}
+        evaporating_temps = {evaporating_temp for evaporating_temp, _ in pairs}
+        delta_ts = {delta_t for _, delta_t in pairs}
+        quants = self.session.query(SCQuant).filter(
+            SCQuant.evaporating_temp.in_(evaporating_temps),
+            SCQuant.delta_t.in_(delta_ts),
+            SCQuant.is_deleted == 0
+        ).all()
+        wanted = set(pairs)
+        result = {}
+        for quant in quants:
+            key = (quant.evaporating_temp, quant.delta_t)
+            if key in wanted:
+                result.setdefault(key, quant)
+        return result
+
     def search(
         self, 
         min_evaporating_temp: Optional[float] = None, 
@@ -290,4 +574,60 @@ class SCQuantRepository(BaseRepository[SCQuant]):
             SCQuant.is_deleted == 0
         )
         
-        return query.offset(skip).limit(limit).all()
\ No newline at end of file
+        return query.offset(skip).limit(limit).all()
+
+
+def record_catalog_changes(connection: Connection, changes: Iterable[Tuple[str, Optional[str]]]) -> int:
+    """
+    目录版本号加1并写入变更日志，需与数据变更在同一事务中调用
+
+    版本号行的行锁使并发写入方按提交顺序依次递增；版本号行在建表时写入(见 dao.CatalogVersion)
+
+    Args:
+        connection: 数据变更所在事务的连接
+        changes: [(表名, 冷风机型号)]，型号为None表示整表变更
+
+    Returns:
+        新版本号
+
+    Raises:
+        RuntimeError: 版本号行不存在
+    """
+    table = CatalogVersion.__table__
+    now = datetime.now()
+    result = connection.execute(
+        update(table).where(table.c.id == CATALOG_VERSION_ROW_ID).values(version=table.c.version + 1, update_time=now)
+    )
+    if result.rowcount == 0:
+        raise RuntimeError("catalog_version row is missing, run python -m app.utils.migrate_indexes")
+    version = connection.execute(select(table.c.version).where(table.c.id == CATALOG_VERSION_ROW_ID)).scalar_one()
+    rows = [
+        {"version": version, "table_name": table_name, "cooler_id": cooler_id, "create_time": now}
+        for table_name, cooler_id in dict.fromkeys(changes)
+    ]
+    if rows:
+        connection.execute(insert(CatalogChange.__table__), rows)
+    return version
+
+
+class CatalogVersionRepository:
+    """目录版本号及变更日志仓库类"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_version(self) -> int:
+        """当前目录版本号，未有任何变更时为0"""
+        version = self.session.execute(
+            select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_VERSION_ROW_ID)
+        ).scalar()
+        return version or 0
+
+    def get_changes(self, after_version: int, upto_version: int) -> List[Tuple[str, Optional[str]]]:
+        """版本号在 (after_version, upto_version] 之间的变更 [(表名, 冷风机型号)]，已去重"""
+        return [tuple(row) for row in self.session.execute(
+            select(CatalogChange.table_name, CatalogChange.cooler_id).where(
+                CatalogChange.version > after_version,
+                CatalogChange.version <= upto_version
+            ).distinct()
+        )]
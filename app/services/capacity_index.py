@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CapacityIndex:
+    """单个(工况, 制冷剂)分区的冷量索引，按 (冷量, 行号) 升序排列"""
+
+    def __init__(self, capacities: np.ndarray, rows: np.ndarray):
+        # 冷量相同按行号排列，与记录的读取顺序无关，增量更新与全量加载的结果一致
+        order = np.lexsort((rows, capacities))
+        self.capacities = capacities[order]
+        self.rows = rows[order]
+        # 标量遍历走 Python 列表，避免逐元素访问 ndarray 的开销
+        self._capacity_list: List[float] = self.capacities.tolist()
+        self._row_list: List[int] = self.rows.tolist()
+
+    @classmethod
+    def from_sorted(cls, capacities: np.ndarray, rows: np.ndarray) -> 'CapacityIndex':
+        """以已按 (冷量, 行号) 升序排列的数组构建，跳过排序(读取快照、增量更新目录时使用)"""
+        index = cls.__new__(cls)
+        index.capacities = capacities
+        index.rows = rows
+        index._capacity_list = capacities.tolist()
+        index._row_list = rows.tolist()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._capacity_list)
+
+    def iter_nearest(self, target_cap: float, position: Optional[int] = None) -> Iterator[Tuple[int, float]]:
+        """
+        从目标冷量处二分定位，双指针向两侧展开，按差值升序逐条产出 (行号, 冷量)
+
+        差值相同时优先产出较小的冷量；position 为已知的插入位置，传入时跳过二分
+        """
+        hi = bisect_left(self._capacity_list, target_cap) if position is None else position
+        return self._walk(target_cap, hi - 1, hi)
+
+    def iter_from(self, target_cap: float, distance: float) -> Iterator[Tuple[int, float]]:
+        """
+        按差值升序逐条产出差值不小于 distance 的 (行号, 冷量)，用于从上一页末尾继续遍历
+
+        两侧起点由二分定位，再按实际差值校正浮点误差，差值小于 distance 的记录不会被访问
+        """
+        caps = self._capacity_list
+        size = len(caps)
+        position = bisect_left(caps, target_cap)
+        # 左侧(冷量小于目标)：差值不小于 distance 的最大下标
+        lo = min(bisect_right(caps, target_cap - distance), position) - 1
+        while lo + 1 < position and target_cap - caps[lo + 1] >= distance:
+            lo += 1
+        while lo >= 0 and target_cap - caps[lo] < distance:
+            lo -= 1
+        # 右侧(冷量不小于目标)：差值不小于 distance 的最小下标
+        hi = max(bisect_left(caps, target_cap + distance), position)
+        while hi - 1 >= position and caps[hi - 1] - target_cap >= distance:
+            hi -= 1
+        while hi < size and caps[hi] - target_cap < distance:
+            hi += 1
+        return self._walk(target_cap, lo, hi)
+
+    def _walk(self, target_cap: float, lo: int, hi: int) -> Iterator[Tuple[int, float]]:
+        """从 lo、hi 两个下标分别向下、向上展开，按差值升序产出"""
+        caps = self._capacity_list
+        rows = self._row_list
+        size = len(caps)
+        while lo >= 0 or hi < size:
+            if hi >= size or (lo >= 0 and target_cap - caps[lo] <= caps[hi] - target_cap):
+                yield rows[lo], caps[lo]
+                lo -= 1
+            else:
+                yield rows[hi], caps[hi]
+                hi += 1
+
+    def page(
+        self,
+        target_cap: float,
+        size: int,
+        ids: Sequence[int],
+        after: Optional[Tuple[float, int]] = None,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float, float]]:
+        """
+        按 (差值, 冷风机ID) 升序返回排在 after 之后的 size 条记录 [(行号, 冷量, 差值)]
+
+        从 after 的差值处继续遍历，差值相同的记录收集齐后再按ID排序，
+        复杂度 O(log n + size + 同差值记录数)，与页码无关
+
+        Args:
+            target_cap: 目标冷量
+            size: 返回数量
+            ids: 按行号索引的冷风机ID
+            after: 上一页最后一条的 (差值, 冷风机ID)，None 表示第一页
+            mask: 按行号索引的布尔位图，仅保留为True的行
+        """
+        walk = self.iter_nearest(target_cap) if after is None else self.iter_from(target_cap, after[0])
+        picked = []
+        for row, cap in walk:
+            if mask is not None and not mask[row]:
+                continue
+            distance = abs(cap - target_cap)
+            if len(picked) >= size and distance > picked[-1][0]:
+                break
+            key = (distance, ids[row])
+            if after is not None and key <= after:
+                continue
+            picked.append((distance, ids[row], row, cap))
+        picked.sort()
+        return [(row, cap, distance) for distance, _, row, cap in picked[:size]]
+
+    def nearest(self, target_cap: float, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        返回与目标冷量最接近的k条记录 [(行号, 冷量)]，复杂度 O(log n + k)
+
+        Args:
+            target_cap: 目标冷量
+            k: 返回数量
+            mask: 按行号索引的布尔位图，仅保留为True的行；遍历会持续向外展开直到凑满k条
+        """
+        return self._nearest(target_cap, k, mask)
+
+    def _nearest(
+        self,
+        target_cap: float,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        position: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        if mask is None:
+            return list(islice(self.iter_nearest(target_cap, position), k))
+        return list(islice(((row, cap) for row, cap in self.iter_nearest(target_cap, position) if mask[row]), k))
+
+    def nearest_batch(
+        self,
+        target_caps: np.ndarray,
+        k: int,
+        masks: Optional[List[Optional[np.ndarray]]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        批量最近冷量查询
+
+        一次 searchsorted 定位全部目标；无位图条件的目标在插入位置两侧各k个元素的窗口内
+        向量化求 top-k（最近的k个必然落在该窗口内），带位图条件的目标从插入位置开始逐个展开
+
+        Args:
+            target_caps: 目标冷量数组
+            k: 每个目标返回数量
+            masks: 与 target_caps 对齐的位图列表，元素为None表示无条件
+
+        Returns:
+            与 target_caps 对齐的 [(行号, 冷量)] 列表
+        """
+        count = len(target_caps)
+        size = len(self)
+        if size == 0 or k <= 0:
+            return [[] for _ in range(count)]
+
+        positions = np.searchsorted(self.capacities, target_caps, side="left")
+        results: List[Optional[List[Tuple[int, float]]]] = [None] * count
+
+        plain = np.array([i for i in range(count) if masks is None or masks[i] is None], dtype=np.intp)
+        if len(plain):
+            # 偏移量按逐个展开的先后排列（先向下再向上），稳定排序后差值相同时与 iter_nearest 顺序一致
+            offsets = np.concatenate((np.arange(-1, -k - 1, -1), np.arange(k)))
+            window = positions[plain, None] + offsets
+            valid = (window >= 0) & (window < size)
+            window = np.clip(window, 0, size - 1)
+            deltas = np.where(valid, np.abs(self.capacities[window] - target_caps[plain, None]), np.inf)
+            order = np.argsort(deltas, axis=1, kind="stable")[:, :k]
+            picked = np.take_along_axis(window, order, axis=1)
+            picked_valid = np.take_along_axis(valid, order, axis=1)
+            picked_rows = self.rows[picked].tolist()
+            picked_caps = self.capacities[picked].tolist()
+            picked_valid = picked_valid.tolist()
+            for j, i in enumerate(plain.tolist()):
+                results[i] = [
+                    (row, cap)
+                    for row, cap, ok in zip(picked_rows[j], picked_caps[j], picked_valid[j])
+                    if ok
+                ]
+
+        for i in range(count):
+            if results[i] is None:
+                results[i] = self._nearest(float(target_caps[i]), k, masks[i], int(positions[i]))
+        return results
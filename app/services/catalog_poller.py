@@ -0,0 +1,130 @@
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config.config import Config
+from app.models.dao import SCQuant
+from app.models.database import SessionLocal
+from app.models.repositories import CatalogVersionRepository, CoolingCapacityRepository
+from app.services.cooler_catalog import get_catalog, load_catalog, update_catalog
+from app.services.cooler_service import CoolerService, filter_cache
+from app.services.sc_quant_grid import get_sc_quant_grid, load_sc_quant_grid
+from app.utils.logger import logger
+
+
+class CatalogPoller:
+    """
+    轮询数据库目录版本号(catalog_version)，有变更时按变更日志增量更新进程内目录和结果缓存
+
+    每次轮询只按主键读取一行版本号；版本升高时读取期间的变更型号，只重新加载这些型号的记录，
+    以读-复制-更新方式替换目录，并只淘汰受影响冷量分区的缓存条目。
+    整表变更或变更型号超过 CATALOG_DELTA_MAX_MODELS 时整体重新加载
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # 已应用的数据库目录版本号，None 表示尚未取得基准
+        self.source_version: Optional[int] = None
+        self.polls = 0
+        self.delta_updates = 0
+        self.full_reloads = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread is not None:
+            return
+        catalog = get_catalog()
+        if catalog is not None:
+            self.source_version = catalog.source_version
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Catalog poller started, interval {self.interval}s")
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            db = SessionLocal()
+            try:
+                self.poll(db)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error polling catalog version: {str(e)}")
+            finally:
+                db.close()
+
+    def poll(self, session: Session) -> bool:
+        """
+        检查一次目录版本号，有变更时应用
+
+        Returns:
+            是否应用了变更
+        """
+        self.polls += 1
+        repo = CatalogVersionRepository(session)
+        latest = repo.get_version()
+        if self.source_version is None:
+            self.source_version = latest
+            return False
+        if latest <= self.source_version:
+            return False
+
+        changes = repo.get_changes(self.source_version, latest)
+        quants_changed = any(table_name == SCQuant.__tablename__ for table_name, _ in changes)
+        models = {cooler_id for _, cooler_id in changes if cooler_id is not None}
+        full = any(cooler_id is None and table_name != SCQuant.__tablename__ for table_name, cooler_id in changes)
+        full = full or len(models) > Config.CATALOG_DELTA_MAX_MODELS
+
+        # 受影响的冷量分区；修正系数变化影响所有目标冷量，整体失效
+        partitions = None
+        if not full and not quants_changed and models:
+            partitions = CoolingCapacityRepository(session).get_partitions_by_cooler_ids(list(models))
+
+        if get_catalog() is not None:
+            if full:
+                load_catalog(session)
+                self.full_reloads += 1
+            else:
+                update_catalog(session, models, quants_changed, latest,
+                               before_swap=lambda catalog: filter_cache.rebase(catalog.version, partitions))
+                self.delta_updates += 1
+        else:
+            if quants_changed and get_sc_quant_grid() is not None:
+                load_sc_quant_grid(session, clamp=Config.SC_QUANT_CLAMP)
+            CoolerService.advance_data_version(None if full else partitions)
+            if full:
+                self.full_reloads += 1
+            else:
+                self.delta_updates += 1
+
+        logger.info(
+            f"Catalog source version {self.source_version} -> {latest}: {len(models)} models changed"
+            f"{', sc quants changed' if quants_changed else ''}{', full reload' if full else ''}"
+        )
+        self.source_version = latest
+        return True
+
+    def stats(self) -> dict:
+        """轮询统计"""
+        return {
+            "source_version": self.source_version,
+            "polls": self.polls,
+            "delta_updates": self.delta_updates,
+            "full_reloads": self.full_reloads,
+            "last_error": self.last_error
+        }
+
+
+catalog_poller = CatalogPoller(Config.CATALOG_POLL_INTERVAL)
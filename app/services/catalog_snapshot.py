@@ -0,0 +1,176 @@
+"""
+冷风机目录二进制快照
+
+快照为一个目录：数值数组各存为 .npy 文件，读取时以内存映射(mmap)方式打开；
+字符串列存为 JSON，预渲染的JSON片段拼接为一个二进制文件并记录偏移量；
+manifest.json 记录快照格式版本、构建时的数据库目录版本号(catalog_version)和系数表。
+
+启动时从快照还原目录无需查询数据库，之后由目录轮询从快照的版本号起增量追上数据库；
+数据库不可用时继续以快照中的目录提供选型
+"""
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from app.config.config import Config
+from app.services.capacity_index import CapacityIndex
+from app.services.cooler_catalog import FLOAT_COLUMNS, STRING_COLUMNS, CoolerCatalog, set_catalog
+from app.services.sc_quant_grid import SCQuantGrid
+from app.utils.coefficients import coefficient_registry
+from app.utils.logger import logger
+
+# 快照格式版本，文件布局变化时递增，读取时不一致即拒绝
+SNAPSHOT_FORMAT = 2
+MANIFEST_FILE = "manifest.json"
+
+
+def _save(path: str, name: str, array: np.ndarray) -> str:
+    file_name = f"{name}.npy"
+    np.save(os.path.join(path, file_name), np.ascontiguousarray(array))
+    return file_name
+
+
+def _load(path: str, file_name: str) -> np.ndarray:
+    return np.load(os.path.join(path, file_name), mmap_mode="r", allow_pickle=False)
+
+
+def write_snapshot(catalog: CoolerCatalog, path: str, coefficients: Optional[dict] = None) -> dict:
+    """
+    将目录写入快照目录
+
+    先写入临时目录再替换，写入失败时原快照保持不变
+
+    Returns:
+        manifest
+    """
+    path = os.path.abspath(path)
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    fragments = catalog.fragments
+    offsets = np.zeros(len(fragments) + 1, dtype=np.int64)
+    np.cumsum([len(fragment) for fragment in fragments], out=offsets[1:])
+    with open(os.path.join(tmp_path, "fragments.bin"), "wb") as f:
+        f.write(b"".join(fragments))
+    with open(os.path.join(tmp_path, "strings.json"), "wb") as f:
+        f.write(orjson.dumps({column: catalog.string_columns[column] for column in STRING_COLUMNS}))
+
+    partitions = []
+    for i, ((working_status, refrigerant), index) in enumerate(catalog.partitions.items()):
+        partitions.append({
+            "working_status": working_status,
+            "refrigerant": refrigerant,
+            "capacities": _save(tmp_path, f"partition_{i}_capacities", index.capacities),
+            "rows": _save(tmp_path, f"partition_{i}_rows", index.rows)
+        })
+
+    grid = catalog.sc_quant_grid
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "source_version": catalog.source_version,
+        "created_time": datetime.now().isoformat(timespec="seconds"),
+        "size": catalog.size,
+        "ids": _save(tmp_path, "ids", catalog.ids),
+        "float_columns": {column: _save(tmp_path, f"float_{column}", catalog.float_columns[column])
+                          for column in FLOAT_COLUMNS},
+        "strings": "strings.json",
+        "fragments": "fragments.bin",
+        "fragment_offsets": _save(tmp_path, "fragment_offsets", offsets),
+        "partitions": partitions,
+        "sc_quant": {
+            "size": grid.size,
+            "evaporating_temps": _save(tmp_path, "sc_quant_evaporating_temps", grid.evaporating_temps),
+            "delta_ts": _save(tmp_path, "sc_quant_delta_ts", grid.delta_ts),
+            "values": _save(tmp_path, "sc_quant_values", grid.values)
+        },
+        "coefficients": coefficients
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "wb") as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+    old_path = f"{path}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path: str) -> dict:
+    """
+    读取快照 manifest
+
+    Raises:
+        ValueError: 快照格式版本不一致
+    """
+    with open(os.path.join(path, MANIFEST_FILE), "rb") as f:
+        manifest = orjson.loads(f.read())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported catalog snapshot format {manifest.get('format')}, expected {SNAPSHOT_FORMAT}")
+    return manifest
+
+
+def read_snapshot(path: str, clamp: bool = False) -> Tuple[CoolerCatalog, dict]:
+    """
+    从快照目录还原目录，数值数组以只读内存映射方式打开
+
+    Returns:
+        (目录, manifest)
+    """
+    manifest = read_manifest(path)
+    with open(os.path.join(path, manifest["strings"]), "rb") as f:
+        string_columns: Dict[str, List[Optional[str]]] = orjson.loads(f.read())
+    with open(os.path.join(path, manifest["fragments"]), "rb") as f:
+        blob = f.read()
+    offsets = _load(path, manifest["fragment_offsets"]).tolist()
+    fragments = [blob[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    partitions = {
+        (partition["working_status"], partition["refrigerant"]): CapacityIndex.from_sorted(
+            _load(path, partition["capacities"]), _load(path, partition["rows"])
+        )
+        for partition in manifest["partitions"]
+    }
+    sc_quant = manifest["sc_quant"]
+    grid = SCQuantGrid.from_arrays(
+        _load(path, sc_quant["evaporating_temps"]),
+        _load(path, sc_quant["delta_ts"]),
+        _load(path, sc_quant["values"]),
+        sc_quant["size"],
+        clamp=clamp
+    )
+    catalog = CoolerCatalog.restore(
+        _load(path, manifest["ids"]),
+        {column: _load(path, file_name) for column, file_name in manifest["float_columns"].items()},
+        string_columns,
+        partitions,
+        grid,
+        fragments,
+        source_version=manifest["source_version"]
+    )
+    return catalog, manifest
+
+
+def load_catalog_snapshot(path: str) -> CoolerCatalog:
+    """
+    从快照加载目录并替换当前目录，不访问数据库
+
+    未配置系数表数据文件且快照中的系数表版本更新时，一并加载系数表
+    """
+    catalog, manifest = read_snapshot(path, clamp=Config.SC_QUANT_CLAMP)
+    set_catalog(catalog)
+    coefficients = manifest.get("coefficients")
+    if coefficients and not Config.COEFFICIENT_FILE and coefficients["version"] > coefficient_registry.version:
+        coefficient_registry.load_mapping(coefficients)
+    logger.info(
+        f"Cooler catalog v{catalog.version} loaded from snapshot {path} (created {manifest['created_time']}): "
+        f"{catalog.size} coolers, {len(catalog.partitions)} capacity partitions, {catalog.sc_quant_grid.size} sc quants, "
+        f"source version {catalog.source_version}"
+    )
+    return catalog
@@ -0,0 +1,541 @@
+import sys
+import threading
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config.config import Config
+from app.models.dao import Cooler, CoolingCapacity, SCQuant
+from app.models.repositories import (
+    CatalogVersionRepository,
+    CoolerRepository,
+    CoolingCapacityRepository,
+    SCQuantRepository
+)
+from app.schemas.equipment import CoolerResponse
+from app.services.capacity_index import CapacityIndex
+from app.services.sc_quant_grid import SCQuantGrid
+from app.utils.logger import logger
+from app.utils.responses import render_json
+
+# 数值列：float64 存储，空值记为 NaN
+FLOAT_COLUMNS = (
+    "heat_exchange_area",
+    "tube_volumn",
+    "air_flow_rate",
+    "defrost_power",
+    "noise",
+    "weight",
+    "fin_spacing_num",
+)
+
+# 字符串列：intern 后的 str 列表存储，空值保持 None
+STRING_COLUMNS = (
+    "model",
+    "total_fan_power",
+    "total_fan_current",
+    "air_flow",
+    "pipe_dia",
+    "fin_spacing",
+    "series",
+    "comment",
+)
+
+
+# 预渲染片段的截取位置
+_CAPACITY_KEY = b',"cooling_capacity":'
+
+
+def _intern(value):
+    """字符串驻留，重复的型号/系列等只保留一份"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_optional_float(value: float) -> Optional[float]:
+    """NaN 还原为 None"""
+    return None if value != value else float(value)
+
+
+def _splice_list(values: List, kept_rows: np.ndarray, kept_dest: np.ndarray, new_values: List,
+                 new_dest: np.ndarray, size: int) -> List:
+    """按新行号拼接保留的元素和新元素，以 object 数组整体搬移，不逐个访问保留的元素"""
+    spliced = np.empty(size, dtype=object)
+    spliced[kept_dest] = np.array(values, dtype=object)[kept_rows]
+    spliced[new_dest] = np.array(new_values, dtype=object)
+    return spliced.tolist()
+
+
+class CoolerCatalog:
+    """
+    冷风机选型目录：cooler / cooling_capacity / sc_quant 的只读列式快照
+
+    version 为进程内版本号，每次替换目录加1；source_version 为构建时数据库中的目录版本号(catalog_version)
+    """
+
+    def __init__(
+        self,
+        coolers: List[Cooler],
+        capacities: List[CoolingCapacity],
+        quants: List[SCQuant],
+        version: int = 1,
+        clamp: bool = False,
+        source_version: int = 0
+    ):
+        self.version = version
+        self.source_version = source_version
+
+        # cooler 表：按行号寻址的列式存储
+        self.size = len(coolers)
+        self.ids = np.fromiter((cooler.id for cooler in coolers), dtype=np.int64, count=self.size)
+        self.id_list: List[int] = self.ids.tolist()
+        self.float_columns: Dict[str, np.ndarray] = {
+            column: np.array(
+                [np.nan if getattr(cooler, column) is None else getattr(cooler, column) for cooler in coolers],
+                dtype=np.float64
+            )
+            for column in FLOAT_COLUMNS
+        }
+        self.string_columns: Dict[str, List[Optional[str]]] = {
+            column: [_intern(getattr(cooler, column)) for cooler in coolers]
+            for column in STRING_COLUMNS
+        }
+        self._index_columns()
+
+        # cooling_capacity 表：按 (工况, 制冷剂) 分区，同一型号重复记录以后出现的为准
+        grouped: Dict[Tuple[str, str], Dict[int, float]] = {}
+        for cap in capacities:
+            row = self.model_index.get(cap.cooler_id)
+            if row is None:
+                continue
+            key = (_intern(cap.working_status), _intern(cap.refrigerant))
+            grouped.setdefault(key, {})[row] = cap.capacity
+        self.partitions: Dict[Tuple[str, str], CapacityIndex] = {
+            key: CapacityIndex(
+                np.fromiter(row_caps.values(), dtype=np.float64, count=len(row_caps)),
+                np.fromiter(row_caps.keys(), dtype=np.int32, count=len(row_caps))
+            )
+            for key, row_caps in grouped.items()
+        }
+
+        # sc_quant 表：(蒸发温度, 温差) 二维插值网格
+        self.sc_quant_grid = SCQuantGrid.from_rows(quants, clamp=clamp)
+
+        # 每台冷风机预先序列化的JSON片段，随目录整体替换而失效，增量更新时未变更的冷风机沿用
+        self.fragments: List[bytes] = [self._render_fragment(row) for row in range(self.size)]
+        self.status_suffixes: Dict[str, bytes] = {
+            working_status: self._render_suffix(working_status) for working_status, _ in self.partitions
+        }
+
+    @classmethod
+    def restore(
+        cls,
+        ids: np.ndarray,
+        float_columns: Dict[str, np.ndarray],
+        string_columns: Dict[str, List[Optional[str]]],
+        partitions: Dict[Tuple[str, str], CapacityIndex],
+        sc_quant_grid: SCQuantGrid,
+        fragments: List[bytes],
+        version: int = 1,
+        source_version: int = 0
+    ) -> 'CoolerCatalog':
+        """以已准备好的列、冷量索引、网格和预渲染片段还原目录(读取快照时使用)，不访问数据库"""
+        catalog = cls.__new__(cls)
+        catalog.version = version
+        catalog.source_version = source_version
+        catalog.size = len(ids)
+        catalog.ids = ids
+        catalog.id_list = ids.tolist()
+        catalog.float_columns = float_columns
+        catalog.string_columns = {
+            column: [_intern(value) for value in values] for column, values in string_columns.items()
+        }
+        catalog._index_columns()
+        catalog.partitions = partitions
+        catalog.sc_quant_grid = sc_quant_grid
+        catalog.fragments = fragments
+        catalog.status_suffixes = {
+            working_status: cls._render_suffix(working_status) for working_status, _ in partitions
+        }
+        return catalog
+
+    def _index_columns(self) -> None:
+        """建立型号索引和属性位图"""
+        # cooling_capacity.cooler_id 存的是型号，这里建立型号到行号的映射；型号重复时取第一行，其余行另行记录
+        self.model_index: Dict[str, int] = {}
+        self.duplicate_rows: Dict[str, List[int]] = {}
+        for row, model in enumerate(self.string_columns["model"]):
+            if model is not None and self.model_index.setdefault(model, row) != row:
+                self.duplicate_rows.setdefault(model, []).append(row)
+
+        # 片距、系列的位图索引，按行号对齐，选型时直接按位与
+        self.fin_spacing_bitmaps: Dict[float, np.ndarray] = self._build_bitmaps(
+            [None if value != value else float(value) for value in self.float_columns["fin_spacing_num"].tolist()]
+        )
+        self.series_bitmaps: Dict[str, np.ndarray] = self._build_bitmaps(self.string_columns["series"])
+
+    def _build_bitmaps(self, values: List) -> Dict:
+        """为列中每个取值构建布尔位图"""
+        positions: Dict = {}
+        for row, value in enumerate(values):
+            if value is not None:
+                positions.setdefault(value, []).append(row)
+        bitmaps = {}
+        for value, rows in positions.items():
+            bitmap = np.zeros(self.size, dtype=bool)
+            bitmap[rows] = True
+            bitmaps[value] = bitmap
+        return bitmaps
+
+    def field_value(self, row: int, field: str):
+        """单个 CoolerResponse 冷风机字段的取值，与 to_response 一致"""
+        if field == "id":
+            return int(self.ids[row])
+        if field == "is_deleted":
+            return 0
+        if field in self.float_columns:
+            return _to_optional_float(self.float_columns[field][row])
+        return self.string_columns[field][row]
+
+    def _render_fragment(self, row: int) -> bytes:
+        """
+        序列化冷风机的静态字段，得到 cooling_capacity 取值之前的JSON片段
+
+        以 to_response 的完整输出截取，字段顺序与 CoolerResponse 保持一致；
+        字符串值中的引号会被转义，截取位置不会落在取值内部
+        """
+        rendered = render_json(self.to_response(row, 0.0, ""))
+        return rendered[:rendered.rindex(_CAPACITY_KEY) + len(_CAPACITY_KEY)]
+
+    @staticmethod
+    def _render_suffix(working_status: str) -> bytes:
+        """cooling_capacity 取值之后的JSON片段，同一工况的冷风机共用"""
+        return b',"working_status":' + render_json(working_status) + b',"is_deleted":0}'
+
+    def render_items(self, nearest: List[Tuple[int, float]], working_status: str) -> bytes:
+        """将 [(行号, 冷量)] 拼接为 items 数组的JSON字节，与逐条 to_response 序列化结果一致"""
+        suffix = self.status_suffixes.get(working_status)
+        if suffix is None:
+            suffix = self._render_suffix(working_status)
+        fragments = self.fragments
+        return b"[" + b",".join(fragments[row] + render_json(cap) + suffix for row, cap in nearest) + b"]"
+
+    @classmethod
+    def load(cls, session: Session, version: int = 1, clamp: bool = False, source_version: int = 0) -> 'CoolerCatalog':
+        """从数据库加载目录"""
+        coolers = CoolerRepository(session).get_all()
+        capacities = CoolingCapacityRepository(session).get_all()
+        quants = SCQuantRepository(session).get_all()
+        return cls(coolers, capacities, quants, version=version, clamp=clamp, source_version=source_version)
+
+    def apply_changes(
+        self,
+        models: Collection[str],
+        coolers: List[Cooler],
+        capacities: List[CoolingCapacity],
+        quants: Optional[List[SCQuant]] = None,
+        version: Optional[int] = None,
+        source_version: Optional[int] = None,
+        clamp: bool = False
+    ) -> 'CoolerCatalog':
+        """
+        构建应用变更后的新目录，当前目录保持不变
+
+        变更型号原有的行整体移除，coolers 按ID插入；列数组、位图和冷量索引的行号以 numpy 整体重映射，
+        只有含变更型号的冷量分区重新排序，其余分区和未变更冷风机的预渲染片段直接沿用。
+        逐条处理的只有变更的记录，其余行只有向量化的数组搬移
+
+        Args:
+            models: 变更涉及的冷风机型号
+            coolers: 这些型号当前未删除的冷风机记录
+            capacities: 这些型号当前未删除的冷量记录，按ID排序
+            quants: 修正系数有变更时为全部未删除记录，None 表示沿用当前网格
+        """
+        models = set(models)
+        removed = [row for model in models if model in self.model_index
+                   for row in [self.model_index[model]] + self.duplicate_rows.get(model, [])]
+        keep = np.ones(self.size, dtype=bool)
+        keep[removed] = False
+        kept_rows = np.flatnonzero(keep)
+
+        # 与全量加载一样按ID排列：保留行与新记录的ID合并排序，得到各自的新行号
+        coolers = sorted(coolers, key=lambda cooler: cooler.id)
+        new_ids = np.fromiter((cooler.id for cooler in coolers), dtype=np.int64, count=len(coolers))
+        merged_ids = np.concatenate((self.ids[kept_rows], new_ids))
+        order = np.argsort(merged_ids, kind="stable")
+        size = len(merged_ids)
+        dest = np.empty(size, dtype=np.int64)
+        dest[order] = np.arange(size)
+        kept_dest, new_dest = dest[:len(kept_rows)], dest[len(kept_rows):]
+        # 旧行号到新行号，移除的行为-1
+        remap = np.full(self.size, -1, dtype=np.int64)
+        remap[kept_rows] = kept_dest
+        # 新记录恰好落在移除的行上(只修改了已有冷风机)时行号不变
+        stable = size == self.size and np.array_equal(kept_dest, kept_rows)
+
+        catalog = CoolerCatalog.__new__(CoolerCatalog)
+        catalog.version = self.version + 1 if version is None else version
+        catalog.source_version = self.source_version if source_version is None else source_version
+        catalog.size = size
+        catalog.ids = merged_ids[order]
+        catalog.id_list = catalog.ids.tolist()
+
+        catalog.float_columns = {}
+        for column, values in self.float_columns.items():
+            spliced = np.empty(size, dtype=np.float64)
+            spliced[kept_dest] = values[kept_rows]
+            spliced[new_dest] = [np.nan if getattr(cooler, column) is None else getattr(cooler, column)
+                                 for cooler in coolers]
+            catalog.float_columns[column] = spliced
+        catalog.string_columns = {
+            column: _splice_list(values, kept_rows, kept_dest,
+                                 [_intern(getattr(cooler, column)) for cooler in coolers], new_dest, size)
+            for column, values in self.string_columns.items()
+        }
+
+        # 型号索引：未变更型号按新行号平移，变更型号按新记录重建
+        catalog.model_index = dict(zip(
+            self.model_index.keys(),
+            remap[np.fromiter(self.model_index.values(), dtype=np.int64, count=len(self.model_index))].tolist()
+        ))
+        catalog.duplicate_rows = {
+            model: remap[rows].tolist() for model, rows in self.duplicate_rows.items() if model not in models
+        }
+        for model in models:
+            catalog.model_index.pop(model, None)
+        for cooler, row in zip(coolers, new_dest.tolist()):
+            model = _intern(cooler.model)
+            if model is not None and catalog.model_index.setdefault(model, row) != row:
+                catalog.duplicate_rows.setdefault(model, []).append(row)
+
+        # 位图：按新行号搬移后补上新记录，不再有任何行的取值去掉
+        fin_spacings = [cooler.fin_spacing_num for cooler in coolers]
+        series = [cooler.series for cooler in coolers]
+        catalog.fin_spacing_bitmaps = self._splice_bitmaps(
+            self.fin_spacing_bitmaps, kept_rows, kept_dest, new_dest, size,
+            [None if value is None else float(value) for value in fin_spacings]
+        )
+        catalog.series_bitmaps = self._splice_bitmaps(self.series_bitmaps, kept_rows, kept_dest, new_dest, size, series)
+
+        # 冷量分区：含移除行或新冷量的分区过滤后重新排序，其余分区只平移行号
+        grouped: Dict[Tuple[str, str], Dict[int, float]] = {}
+        for cap in capacities:
+            row = catalog.model_index.get(cap.cooler_id)
+            if row is None:
+                continue
+            key = (_intern(cap.working_status), _intern(cap.refrigerant))
+            grouped.setdefault(key, {})[row] = cap.capacity
+        catalog.partitions = {}
+        for key, index in self.partitions.items():
+            rows = remap[index.rows]
+            alive = rows >= 0
+            added = grouped.pop(key, None)
+            if added is None and alive.all():
+                catalog.partitions[key] = index if stable else CapacityIndex.from_sorted(
+                    index.capacities, rows.astype(np.int32)
+                )
+                continue
+            caps, rows = index.capacities[alive], rows[alive].astype(np.int32)
+            if added:
+                caps = np.concatenate((caps, np.fromiter(added.values(), dtype=np.float64, count=len(added))))
+                rows = np.concatenate((rows, np.fromiter(added.keys(), dtype=np.int32, count=len(added))))
+            if len(caps):
+                catalog.partitions[key] = CapacityIndex(caps, rows)
+        for key, row_caps in grouped.items():
+            catalog.partitions[key] = CapacityIndex(
+                np.fromiter(row_caps.values(), dtype=np.float64, count=len(row_caps)),
+                np.fromiter(row_caps.keys(), dtype=np.int32, count=len(row_caps))
+            )
+
+        catalog.sc_quant_grid = self.sc_quant_grid if quants is None else SCQuantGrid.from_rows(quants, clamp=clamp)
+
+        # 预渲染片段：保留行沿用，新记录在列数据就位后渲染
+        catalog.fragments = _splice_list(self.fragments, kept_rows, kept_dest, [None] * len(coolers), new_dest, size)
+        for row in new_dest.tolist():
+            catalog.fragments[row] = catalog._render_fragment(row)
+        catalog.status_suffixes = {
+            working_status: self._render_suffix(working_status) for working_status, _ in catalog.partitions
+        }
+        return catalog
+
+    @staticmethod
+    def _splice_bitmaps(bitmaps: Dict, kept_rows: np.ndarray, kept_dest: np.ndarray, new_dest: np.ndarray,
+                        size: int, new_values: List) -> Dict:
+        """按新行号搬移位图并设置新记录的位，与 _build_bitmaps 的结果一致"""
+        spliced = {}
+        for value, bitmap in bitmaps.items():
+            moved = np.zeros(size, dtype=bool)
+            moved[kept_dest] = bitmap[kept_rows]
+            spliced[value] = moved
+        for row, value in zip(new_dest.tolist(), new_values):
+            if value is None:
+                continue
+            if value not in spliced:
+                spliced[value] = np.zeros(size, dtype=bool)
+            spliced[value][row] = True
+        return {value: bitmap for value, bitmap in spliced.items() if bitmap.any()}
+
+    def get_quant(self, evaporating_temp: float, delta_t: float) -> Optional[float]:
+        """根据蒸发温度和温差获取工况修正系数"""
+        return self.sc_quant_grid.lookup(evaporating_temp, delta_t)
+
+    def build_mask(
+        self,
+        fin_spacing_num: Optional[float] = None,
+        series: Optional[str] = None,
+        min_heat_exchange_area: Optional[float] = None,
+        max_heat_exchange_area: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """根据片距、系列和换热面积范围构建行位图，无任何条件时返回None"""
+        mask = None
+        if fin_spacing_num:
+            mask = self.fin_spacing_bitmaps.get(float(fin_spacing_num), np.zeros(self.size, dtype=bool))
+        if series:
+            bitmap = self.series_bitmaps.get(series, np.zeros(self.size, dtype=bool))
+            mask = bitmap if mask is None else mask & bitmap
+        area = self.float_columns["heat_exchange_area"]
+        if min_heat_exchange_area is not None:
+            bitmap = area >= min_heat_exchange_area
+            mask = bitmap if mask is None else mask & bitmap
+        if max_heat_exchange_area is not None:
+            bitmap = area <= max_heat_exchange_area
+            mask = bitmap if mask is None else mask & bitmap
+        return mask
+
+    def nearest(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """返回与目标冷量最接近且满足位图条件的k条记录 [(行号, 冷量)]，按差值升序"""
+        index = self.partitions.get((working_status, refrigerant))
+        if index is None or k <= 0:
+            return []
+        return index.nearest(target_cap, k, mask)
+
+    def rank_page(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_cap: float,
+        size: int,
+        after: Optional[Tuple[float, int]] = None,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float, float]]:
+        """按 (冷量差值, 冷风机ID) 升序返回排在 after 之后的 size 条记录 [(行号, 冷量, 差值)]"""
+        index = self.partitions.get((working_status, refrigerant))
+        if index is None or size <= 0:
+            return []
+        return index.page(target_cap, size, self.id_list, after, mask)
+
+    def nearest_batch(
+        self,
+        working_status: str,
+        refrigerant: str,
+        target_caps: np.ndarray,
+        k: int,
+        masks: Optional[List[Optional[np.ndarray]]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """批量返回同一分区内多个目标冷量的最近k条记录"""
+        index = self.partitions.get((working_status, refrigerant))
+        if index is None:
+            return [[] for _ in range(len(target_caps))]
+        return index.nearest_batch(target_caps, k, masks)
+
+    def to_response(self, row: int, capacity: float, working_status: str) -> CoolerResponse:
+        """转换为Pydantic模型实例，字段与 Cooler.to_pydantic 一致，同样跳过校验"""
+        floats = self.float_columns
+        strings = self.string_columns
+        return CoolerResponse.model_construct(
+            id=int(self.ids[row]),
+            cooling_capacity=capacity,
+            working_status=working_status,
+            heat_exchange_area=float(floats["heat_exchange_area"][row]),
+            tube_volumn=_to_optional_float(floats["tube_volumn"][row]),
+            air_flow_rate=_to_optional_float(floats["air_flow_rate"][row]),
+            total_fan_power=strings["total_fan_power"][row],
+            total_fan_current=strings["total_fan_current"][row],
+            air_flow=strings["air_flow"][row],
+            defrost_power=_to_optional_float(floats["defrost_power"][row]),
+            pipe_dia=strings["pipe_dia"][row],
+            noise=_to_optional_float(floats["noise"][row]),
+            weight=_to_optional_float(floats["weight"][row]),
+            model=strings["model"][row],
+            fin_spacing=strings["fin_spacing"][row],
+            series=strings["series"][row],
+            comment=strings["comment"][row],
+            is_deleted=0
+        )
+
+
+# 当前生效的目录，整体替换(读-复制-更新)保证读者无需加锁
+_catalog: Optional[CoolerCatalog] = None
+_load_lock = threading.Lock()
+
+
+def get_catalog() -> Optional[CoolerCatalog]:
+    """获取当前目录，未启用时返回None"""
+    return _catalog
+
+
+def set_catalog(catalog: CoolerCatalog) -> CoolerCatalog:
+    """替换当前目录，版本号接续当前目录"""
+    global _catalog
+    with _load_lock:
+        catalog.version = _catalog.version + 1 if _catalog is not None else 1
+        _catalog = catalog
+    return catalog
+
+
+def load_catalog(session: Session) -> CoolerCatalog:
+    """从数据库(重新)加载目录并替换当前目录"""
+    global _catalog
+    with _load_lock:
+        version = _catalog.version + 1 if _catalog is not None else 1
+        # 先读版本号再读数据，期间的变更由之后的轮询重复应用，结果一致
+        source_version = CatalogVersionRepository(session).get_version()
+        catalog = CoolerCatalog.load(session, version=version, clamp=Config.SC_QUANT_CLAMP,
+                                     source_version=source_version)
+        _catalog = catalog
+    logger.info(
+        f"Cooler catalog v{catalog.version} loaded: {catalog.size} coolers, "
+        f"{len(catalog.partitions)} capacity partitions, {catalog.sc_quant_grid.size} sc quants, "
+        f"source version {catalog.source_version}"
+    )
+    return catalog
+
+
+def update_catalog(
+    session: Session,
+    models: Collection[str],
+    quants_changed: bool,
+    source_version: int,
+    before_swap: Optional[Callable[[CoolerCatalog], None]] = None
+) -> Optional[CoolerCatalog]:
+    """
+    只从数据库读取变更型号的记录，增量构建新目录并替换当前目录，未启用目录时返回None
+
+    新目录构建期间读者继续使用旧目录；before_swap 在替换前调用，用于按新版本淘汰结果缓存
+    """
+    global _catalog
+    with _load_lock:
+        current = _catalog
+        if current is None:
+            return None
+        models = list(models)
+        coolers = CoolerRepository(session).get_by_cooler_ids(models) if models else []
+        capacities = CoolingCapacityRepository(session).get_by_cooler_ids(models) if models else []
+        quants = SCQuantRepository(session).get_all() if quants_changed else None
+        catalog = current.apply_changes(models, coolers, capacities, quants, source_version=source_version,
+                                        clamp=Config.SC_QUANT_CLAMP)
+        if before_swap is not None:
+            before_swap(catalog)
+        _catalog = catalog
+    logger.info(
+        f"Cooler catalog v{catalog.version} updated: {len(models)} models changed"
+        f"{', sc quants reloaded' if quants_changed else ''}, source version {catalog.source_version}"
+    )
+    return catalog
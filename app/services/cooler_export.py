@@ -0,0 +1,66 @@
+import csv
+import io
+from typing import AsyncIterator, Iterator, Sequence
+
+from app.config.config import Config
+from app.models.async_repositories import AsyncCoolerRepository
+from app.models.database import AsyncSessionLocal, SessionLocal
+from app.models.repositories import COOLER_EXPORT_COLUMNS, CoolerRepository
+from app.utils.responses import render_json
+
+# 导出字段，与 cooler_export_statement 的列顺序一致
+EXPORT_FIELDS = tuple(column.key for column in COOLER_EXPORT_COLUMNS) + ("working_status", "refrigerant", "capacity")
+
+# 导出格式对应的 Content-Type
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def render_ndjson(rows: Sequence[tuple]) -> bytes:
+    """每行一个JSON对象"""
+    return b"".join(render_json(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+
+def render_csv(rows: Sequence[tuple]) -> bytes:
+    """CSV 行，空值输出为空字符串"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+_RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def export_header(export_format: str) -> bytes:
+    """导出内容的首部，CSV 为表头行"""
+    return render_csv([EXPORT_FIELDS]) if export_format == "csv" else b""
+
+
+def iter_export(export_format: str) -> Iterator[bytes]:
+    """
+    逐批产出导出内容
+
+    使用独立会话，随响应流结束关闭；每批行数为 EXPORT_BATCH_SIZE，内存占用与目录规模无关
+    """
+    render = _RENDERERS[export_format]
+    db = SessionLocal()
+    try:
+        yield export_header(export_format)
+        for partition in CoolerRepository(db).stream_with_capacities(Config.EXPORT_BATCH_SIZE):
+            yield render(partition)
+    finally:
+        db.close()
+
+
+async def iter_export_async(export_format: str) -> AsyncIterator[bytes]:
+    """逐批产出导出内容，异步会话版本"""
+    render = _RENDERERS[export_format]
+    async with AsyncSessionLocal() as db:
+        yield export_header(export_format)
+        async for partition in AsyncCoolerRepository(db).stream_with_capacities(Config.EXPORT_BATCH_SIZE):
+            yield render(partition)
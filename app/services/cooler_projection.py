@@ -0,0 +1,75 @@
+from typing import Any, Iterable, Mapping, Optional, Sequence, Tuple
+
+from app.models.dao import Cooler
+from app.schemas.equipment import CoolerResponse
+
+# 可投影的字段，顺序与 CoolerResponse 一致
+COOLER_FIELDS = tuple(CoolerResponse.model_fields)
+
+# 取自冷量映射表的字段，其余字段取自冷风机表
+CAPACITY_FIELDS = ("cooling_capacity", "working_status")
+
+
+class CoolerProjection:
+    """
+    选型结果的字段投影
+
+    只查询、只序列化 fields 指定的字段；compact 为 True 时输出表头加数组行：
+    {"fields": [...], "rows": [[...], ...], "total": n}
+    """
+
+    def __init__(self, fields: Sequence[str], compact: bool = False):
+        self.fields = tuple(fields)
+        self.compact = compact
+        self.cooler_fields = tuple(field for field in self.fields if field not in CAPACITY_FIELDS)
+
+    @classmethod
+    def parse(cls, fields: Optional[str], compact: bool = False) -> Optional['CoolerProjection']:
+        """
+        解析逗号分隔的字段列表
+
+        未指定字段且非紧凑模式时返回None，即完整输出；紧凑模式未指定字段时输出全部字段
+
+        Raises:
+            ValueError: 存在未知字段
+        """
+        names = []
+        for name in (fields or "").split(","):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        if not names:
+            if not compact:
+                return None
+            names = list(COOLER_FIELDS)
+        unknown = [name for name in names if name not in COOLER_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return cls(names, compact)
+
+    @property
+    def key(self) -> Tuple[Tuple[str, ...], bool]:
+        """用于结果缓存键"""
+        return self.fields, self.compact
+
+    def columns(self) -> list:
+        """需要查询的冷风机列，型号和ID始终查询，分别用于关联冷量和生成分页游标"""
+        columns = [getattr(Cooler, field) for field in self.cooler_fields]
+        for field in ("model", "id"):
+            if field not in self.cooler_fields:
+                columns.append(getattr(Cooler, field))
+        return columns
+
+    def row(self, source: Mapping[str, Any], capacity: float, working_status: str) -> tuple:
+        """按 fields 顺序取值，source 提供冷风机字段"""
+        return tuple(
+            capacity if field == "cooling_capacity" else working_status if field == "working_status" else source[field]
+            for field in self.fields
+        )
+
+    def build(self, rows: Iterable[tuple]) -> dict:
+        """组装投影后的选型结果"""
+        rows = list(rows)
+        if self.compact:
+            return {"fields": list(self.fields), "rows": [list(row) for row in rows], "total": len(rows)}
+        return {"items": [dict(zip(self.fields, row)) for row in rows], "total": len(rows)}
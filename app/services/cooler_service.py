@@ -1,49 +1,112 @@
+import heapq
+import threading
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config.config import Config
+from app.models.database import AsyncSessionLocal, SessionLocal
+from app.models.async_repositories import AsyncSCQuantRepository, AsyncCoolerRepository, AsyncCoolingCapacityRepository
+from app.models.dao import Cooler, CoolingCapacity
 from app.models.repositories import SCQuantRepository, CoolerRepository, CoolingCapacityRepository
+from app.schemas.equipment import CoolerResponse
 from app.schemas.product import CoolerFilter
+from app.services.capacity_index import CapacityIndex
+from app.services.cooler_catalog import CoolerCatalog, get_catalog
+from app.services.cooler_projection import CoolerProjection
+from app.services.sc_quant_grid import get_sc_quant_grid
+from app.utils.cache import TTLCache, CACHE_FRESH, CACHE_STALE
+from app.utils.coefficients import get_coefficient_registry
+from app.utils.cursor import encode_cursor
 from app.utils.enums import SCLevel, Refrigerant
 from app.utils.logger import logger
+from app.utils.responses import render_json
+from app.utils.timing import stage
+
+# 返回的候选冷风机数量
+TOP_K = 5
+
+# 缓存键中按 FILTER_CACHE_QUANTUM 量化的浮点参数
+QUANTIZED_FIELDS = (
+    "evaporating_temp", "repo_temp", "required_cooling_cap",
+    "fan_distance", "min_heat_exchange_area", "max_heat_exchange_area"
+)
+
+# 选型结果缓存，值为已序列化的 data JSON
+filter_cache = TTLCache(
+    maxsize=Config.FILTER_CACHE_SIZE,
+    ttl=Config.FILTER_CACHE_TTL,
+    stale_ttl=Config.FILTER_CACHE_STALE_TTL
+)
+
+# 未启用目录时的数据版本号，轮询到数据库目录变更时递增，结果缓存随之失效
+_data_version = 0
+_data_version_lock = threading.Lock()
 
 
 class CoolerService:
     """产品服务类"""
     @staticmethod
-    def filter_cooler(db: Session, filter_params: CoolerFilter) -> dict:
-        """过滤产品"""
-        logger.info("aaaa")
+    def filter_cooler(db: Session, filter_params: CoolerFilter, projection: Optional[CoolerProjection] = None) -> dict:
+        """过滤产品，传入 projection 时只查询和返回投影字段"""
+        catalog = get_catalog()
+        if catalog is not None:
+            return CoolerService.filter_cooler_from_catalog(catalog, filter_params, projection)
+        if Config.FILTER_DB_PUSHDOWN:
+            return CoolerService.filter_cooler_pushdown(db, filter_params, projection)
+
         delta_t = filter_params.repo_temp - filter_params.evaporating_temp
         working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
         logger.info(f"working status: {working_status}")
-        quant_repo = SCQuantRepository(db)
-        q_dto = quant_repo.get_by_evaporating_temp_and_delta_t(filter_params.evaporating_temp, delta_t)
-        if not q_dto:
-            logger.debug(f"can't find target quant evap_temp: {filter_params.evaporating_temp}, delta_t: {delta_t}")
-            q = SCLevel.get_q(filter_params.evaporating_temp, filter_params.refrigerant_supply_type)
-        else:
-            q = q_dto.quant
-
-        refrigerant_quant = Refrigerant.get_q(filter_params.refrigerant, filter_params.refrigerant_supply_type)
-
-        target_cap = filter_params.required_cooling_cap / q / refrigerant_quant
+        target_cap = CoolerService.get_target_cap(filter_params, CoolerService.get_quant(db, filter_params))
 
         cooler_repo = CoolerRepository(db)
         cooler_cap_repo = CoolingCapacityRepository(db)
 
-        cooler_cap_dtos = cooler_cap_repo.get_by_working_status_and_refrigerant(working_status, filter_params.refrigerant)
-        logger.info(cooler_cap_dtos)
+        with stage("capacity_fetch"):
+            cooler_cap_dtos = cooler_cap_repo.get_by_working_status_and_refrigerant(working_status, filter_params.refrigerant)
+        # 属性条件在排序前生效，保证凑满k条满足条件的冷风机
+        allowed_models = None
+        if CoolerService.has_attribute_filter(filter_params):
+            with stage("attribute_filter"):
+                allowed_models = cooler_repo.get_models_by_attributes(
+                    fin_spacing_num=filter_params.fan_distance,
+                    series=filter_params.series,
+                    min_heat_exchange_area=filter_params.min_heat_exchange_area,
+                    max_heat_exchange_area=filter_params.max_heat_exchange_area
+                )
+        with stage("ranking"):
+            top5, cooler_id_cap_map = CoolerService.rank_capacities(cooler_cap_dtos, target_cap, allowed_models)
+        if projection is not None:
+            with stage("cooler_fetch"):
+                rows = cooler_repo.get_columns_by_cooler_ids(top5, projection.columns())
+            return CoolerService.build_projected_result(rows, cooler_id_cap_map, projection)
+        with stage("cooler_fetch"):
+            coolers = cooler_repo.get_by_cooler_ids(top5)
+        with stage("to_pydantic"):
+            return CoolerService.build_result(coolers, cooler_id_cap_map)
+
+    @staticmethod
+    def rank_capacities(cooler_cap_dtos: List[CoolingCapacity], target_cap: float,
+                        allowed_models: Optional[Set[str]] = None) -> Tuple[List[str], Dict[str, CoolingCapacity]]:
+        """选出与目标冷量最接近的k个冷风机型号，返回 (型号列表, 型号到冷量记录的映射)"""
+        if allowed_models is not None:
+            cooler_cap_dtos = [cap for cap in cooler_cap_dtos if cap.cooler_id in allowed_models]
         cooler_id_cap_map = {}
         allowed_cooler = []
         for cap in cooler_cap_dtos:
             delta = abs(cap.capacity - target_cap)
             allowed_cooler.append((cap.cooler_id, delta))
             cooler_id_cap_map[cap.cooler_id] = cap
-        sorted_allowed_cooler = sorted(allowed_cooler, key=lambda x: x[1])
-        top5 = [element[0] for element in sorted_allowed_cooler[:5]]
-        coolers = cooler_repo.get_by_cooler_ids(top5)
-        if filter_params.fan_distance:
-            coolers = [cooler for cooler in coolers if cooler.fin_spacing_num == filter_params.fan_distance]
+        # 只需保留前k个，堆选择 O(n log k) 代替整体排序
+        sorted_allowed_cooler = heapq.nsmallest(TOP_K, allowed_cooler, key=lambda x: x[1])
+        return [element[0] for element in sorted_allowed_cooler], cooler_id_cap_map
 
+    @staticmethod
+    def build_result(coolers: List[Cooler], cooler_id_cap_map: Dict[str, CoolingCapacity]) -> dict:
+        """组装选型结果"""
         # 计算总数
         total = len(coolers)
 
@@ -53,10 +116,588 @@ class CoolerService:
         #
         # # 计算总页数
         # pages = (total + pagination.size - 1) // pagination.size
-        print(len(coolers))
         return {
             "items": [cooler.to_pydantic(cooler_id_cap_map[cooler.model].capacity,
                                          cooler_id_cap_map[cooler.model].working_status) for cooler in coolers],
             "total": total
         }
 
+    @staticmethod
+    def build_projected_result(rows: List[Any], cooler_id_cap_map: Dict[str, CoolingCapacity],
+                               projection: CoolerProjection) -> dict:
+        """以查询到的冷风机列组装投影结果"""
+        with stage("to_pydantic"):
+            return projection.build(
+                projection.row(row._mapping, cooler_id_cap_map[row.model].capacity,
+                               cooler_id_cap_map[row.model].working_status)
+                for row in rows
+            )
+
+    @staticmethod
+    def filter_cooler_pushdown(db: Session, filter_params: CoolerFilter,
+                               projection: Optional[CoolerProjection] = None) -> dict:
+        """以单条SQL完成关联、过滤、排序和截取"""
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        target_cap = CoolerService.get_target_cap(filter_params, CoolerService.get_quant(db, filter_params))
+        with stage("pushdown_query"):
+            rows = CoolingCapacityRepository(db).get_nearest_coolers(
+                working_status,
+                filter_params.refrigerant,
+                target_cap,
+                TOP_K,
+                fin_spacing_num=filter_params.fan_distance,
+                series=filter_params.series,
+                min_heat_exchange_area=filter_params.min_heat_exchange_area,
+                max_heat_exchange_area=filter_params.max_heat_exchange_area,
+                **CoolerService.pushdown_columns(projection)
+            )
+        return CoolerService.build_pushdown_result(rows, projection)
+
+    @staticmethod
+    def pushdown_columns(projection: Optional[CoolerProjection]) -> dict:
+        """下推查询的列参数，未投影时使用默认列"""
+        return {"columns": projection.columns()} if projection is not None else {}
+
+    @staticmethod
+    def build_pushdown_result(rows: List[Any], projection: Optional[CoolerProjection] = None) -> dict:
+        """以下推查询的结果行组装选型结果"""
+        with stage("to_pydantic"):
+            if projection is not None:
+                return projection.build(
+                    projection.row(row._mapping, row.cooling_capacity, row.working_status) for row in rows
+                )
+            return {
+                "items": [CoolerResponse.model_construct(**row._mapping) for row in rows],
+                "total": len(rows)
+            }
+
+    @staticmethod
+    def get_quant(db: Session, filter_params: CoolerFilter) -> Optional[float]:
+        """获取工况修正系数，网格未加载时查询数据库"""
+        delta_t = filter_params.repo_temp - filter_params.evaporating_temp
+        grid = get_sc_quant_grid()
+        with stage("sc_quant"):
+            if grid is not None:
+                return grid.lookup(filter_params.evaporating_temp, delta_t)
+            q_dto = SCQuantRepository(db).get_by_evaporating_temp_and_delta_t(filter_params.evaporating_temp, delta_t)
+            return q_dto.quant if q_dto else None
+
+    @staticmethod
+    def filter_cooler_json(db: Session, filter_params: CoolerFilter, background_tasks=None,
+                           projection: Optional[CoolerProjection] = None) -> bytes:
+        """
+        过滤产品并返回已序列化的 data JSON，经过结果缓存
+
+        命中时不访问数据库也不做序列化；条目过期但仍在 stale 窗口内时先返回旧值，
+        传入 background_tasks 时在后台刷新，否则同步重新计算；
+        启用缓存时按量化后的参数计算，同一缓存键下的结果与先到的请求无关
+        """
+        if not Config.FILTER_CACHE_ENABLED:
+            return CoolerService.render_filter(db, filter_params, projection)
+
+        filter_params = CoolerService.quantize_params(filter_params)
+        with stage("cache_lookup"):
+            key, version, value = CoolerService.lookup_cache(filter_params, background_tasks, CoolerService.refresh_cache,
+                                                             projection)
+        if value is not None:
+            return value
+
+        value = CoolerService.render_filter(db, filter_params, projection)
+        filter_cache.set(key, value, version, CoolerService.cache_tag(filter_params))
+        return value
+
+    @staticmethod
+    def render_filter(db: Session, filter_params: CoolerFilter, projection: Optional[CoolerProjection] = None) -> bytes:
+        """过滤产品并序列化，内存目录模式下完整输出直接拼接预渲染片段"""
+        catalog = get_catalog()
+        if catalog is not None and projection is None:
+            return CoolerService.filter_cooler_from_catalog_json(catalog, filter_params)
+        return CoolerService.serialize(CoolerService.filter_cooler(db, filter_params, projection))
+
+    @staticmethod
+    def serialize(result: dict) -> bytes:
+        """序列化选型结果"""
+        with stage("serialize"):
+            return render_json(result)
+
+    @staticmethod
+    def lookup_cache(filter_params: CoolerFilter, background_tasks, refresh,
+                     projection: Optional[CoolerProjection] = None) -> Tuple[tuple, int, Optional[bytes]]:
+        """
+        查询结果缓存，返回 (缓存键, 数据版本, 可直接返回的值)，需要重新计算时值为None
+
+        条目过期但仍在 stale 窗口内且传入 background_tasks 时，返回旧值并登记后台刷新任务 refresh
+        """
+        version = CoolerService.catalog_version()
+        filter_cache.ensure_version(version)
+        key = CoolerService.cache_key(filter_params) + (projection.key if projection is not None else None,)
+        value, state = filter_cache.get(key)
+        if state == CACHE_FRESH:
+            return key, version, value
+        if state == CACHE_STALE and background_tasks is not None:
+            if filter_cache.begin_refresh(key):
+                background_tasks.add_task(refresh, key, filter_params, version, projection)
+            return key, version, value
+        return key, version, None
+
+    @staticmethod
+    def refresh_cache(key, filter_params: CoolerFilter, version, projection: Optional[CoolerProjection] = None) -> None:
+        """后台刷新缓存条目"""
+        db = SessionLocal()
+        try:
+            filter_cache.set(key, CoolerService.render_filter(db, filter_params, projection), version,
+                             CoolerService.cache_tag(filter_params))
+        except Exception as e:
+            logger.error(f"Error refreshing cooler filter cache: {str(e)}")
+        finally:
+            filter_cache.end_refresh(key)
+            db.close()
+
+    @staticmethod
+    async def filter_cooler_async(db: AsyncSession, filter_params: CoolerFilter,
+                                  projection: Optional[CoolerProjection] = None) -> dict:
+        """过滤产品，异步会话版本"""
+        catalog = get_catalog()
+        if catalog is not None:
+            return CoolerService.filter_cooler_from_catalog(catalog, filter_params, projection)
+
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        target_cap = CoolerService.get_target_cap(filter_params, await CoolerService.get_quant_async(db, filter_params))
+
+        if Config.FILTER_DB_PUSHDOWN:
+            with stage("pushdown_query"):
+                rows = await AsyncCoolingCapacityRepository(db).get_nearest_coolers(
+                    working_status,
+                    filter_params.refrigerant,
+                    target_cap,
+                    TOP_K,
+                    fin_spacing_num=filter_params.fan_distance,
+                    series=filter_params.series,
+                    min_heat_exchange_area=filter_params.min_heat_exchange_area,
+                    max_heat_exchange_area=filter_params.max_heat_exchange_area,
+                    **CoolerService.pushdown_columns(projection)
+                )
+            return CoolerService.build_pushdown_result(rows, projection)
+
+        cooler_repo = AsyncCoolerRepository(db)
+        with stage("capacity_fetch"):
+            cooler_cap_dtos = await AsyncCoolingCapacityRepository(db).get_by_working_status_and_refrigerant(
+                working_status, filter_params.refrigerant
+            )
+        allowed_models = None
+        if CoolerService.has_attribute_filter(filter_params):
+            with stage("attribute_filter"):
+                allowed_models = await cooler_repo.get_models_by_attributes(
+                    fin_spacing_num=filter_params.fan_distance,
+                    series=filter_params.series,
+                    min_heat_exchange_area=filter_params.min_heat_exchange_area,
+                    max_heat_exchange_area=filter_params.max_heat_exchange_area
+                )
+        with stage("ranking"):
+            top5, cooler_id_cap_map = CoolerService.rank_capacities(cooler_cap_dtos, target_cap, allowed_models)
+        if projection is not None:
+            with stage("cooler_fetch"):
+                rows = await cooler_repo.get_columns_by_cooler_ids(top5, projection.columns())
+            return CoolerService.build_projected_result(rows, cooler_id_cap_map, projection)
+        with stage("cooler_fetch"):
+            coolers = await cooler_repo.get_by_cooler_ids(top5)
+        with stage("to_pydantic"):
+            return CoolerService.build_result(coolers, cooler_id_cap_map)
+
+    @staticmethod
+    async def get_quant_async(db: AsyncSession, filter_params: CoolerFilter) -> Optional[float]:
+        """获取工况修正系数，异步会话版本"""
+        delta_t = filter_params.repo_temp - filter_params.evaporating_temp
+        grid = get_sc_quant_grid()
+        with stage("sc_quant"):
+            if grid is not None:
+                return grid.lookup(filter_params.evaporating_temp, delta_t)
+            q_dto = await AsyncSCQuantRepository(db).get_by_evaporating_temp_and_delta_t(filter_params.evaporating_temp, delta_t)
+            return q_dto.quant if q_dto else None
+
+    @staticmethod
+    async def filter_cooler_json_async(db: AsyncSession, filter_params: CoolerFilter, background_tasks=None,
+                                       projection: Optional[CoolerProjection] = None) -> bytes:
+        """过滤产品并返回已序列化的 data JSON，异步会话版本"""
+        if not Config.FILTER_CACHE_ENABLED:
+            return await CoolerService.render_filter_async(db, filter_params, projection)
+
+        filter_params = CoolerService.quantize_params(filter_params)
+        with stage("cache_lookup"):
+            key, version, value = CoolerService.lookup_cache(filter_params, background_tasks,
+                                                             CoolerService.refresh_cache_async, projection)
+        if value is not None:
+            return value
+
+        value = await CoolerService.render_filter_async(db, filter_params, projection)
+        filter_cache.set(key, value, version, CoolerService.cache_tag(filter_params))
+        return value
+
+    @staticmethod
+    async def render_filter_async(db: AsyncSession, filter_params: CoolerFilter,
+                                  projection: Optional[CoolerProjection] = None) -> bytes:
+        """过滤产品并序列化，异步会话版本"""
+        catalog = get_catalog()
+        if catalog is not None and projection is None:
+            return CoolerService.filter_cooler_from_catalog_json(catalog, filter_params)
+        return CoolerService.serialize(await CoolerService.filter_cooler_async(db, filter_params, projection))
+
+    @staticmethod
+    async def refresh_cache_async(key, filter_params: CoolerFilter, version,
+                                  projection: Optional[CoolerProjection] = None) -> None:
+        """后台刷新缓存条目，异步会话版本"""
+        try:
+            async with AsyncSessionLocal() as db:
+                filter_cache.set(key, await CoolerService.render_filter_async(db, filter_params, projection), version,
+                                 CoolerService.cache_tag(filter_params))
+        except Exception as e:
+            logger.error(f"Error refreshing cooler filter cache: {str(e)}")
+        finally:
+            filter_cache.end_refresh(key)
+
+    @staticmethod
+    def quantize_params(filter_params: CoolerFilter) -> CoolerFilter:
+        """浮点参数取整到 FILTER_CACHE_QUANTUM 的倍数，缓存的计算、刷新和分区标记都使用取整后的参数"""
+        scale = 1 / Config.FILTER_CACHE_QUANTUM
+
+        def quantize(value: Optional[float]) -> Optional[float]:
+            # 除以倍率而非乘以精度，-4.004 取整为 -4.0 而不是 -4.000000000000001
+            return None if value is None else round(value * scale) / scale
+
+        return filter_params.model_copy(update={
+            field: quantize(getattr(filter_params, field)) for field in QUANTIZED_FIELDS
+        })
+
+    @staticmethod
+    def cache_key(filter_params: CoolerFilter) -> tuple:
+        """规范化的缓存键，浮点参数按 FILTER_CACHE_QUANTUM 量化"""
+        quantum = Config.FILTER_CACHE_QUANTUM
+
+        def quantize(value: Optional[float]) -> Optional[int]:
+            return None if value is None else round(value / quantum)
+
+        return (
+            quantize(filter_params.evaporating_temp),
+            quantize(filter_params.repo_temp),
+            quantize(filter_params.required_cooling_cap),
+            filter_params.refrigerant,
+            filter_params.refrigerant_supply_type,
+            quantize(filter_params.fan_distance or None),
+            filter_params.series or None,
+            quantize(filter_params.min_heat_exchange_area),
+            quantize(filter_params.max_heat_exchange_area)
+        )
+
+    @staticmethod
+    def cache_tag(filter_params: CoolerFilter) -> Tuple[str, str]:
+        """缓存条目依赖的冷量分区 (工况, 制冷剂)，目录增量更新时只淘汰受影响分区的条目"""
+        return SCLevel.get_level_by_value(filter_params.evaporating_temp).value, filter_params.refrigerant
+
+    @staticmethod
+    def catalog_version() -> int:
+        """当前数据版本：启用目录时为目录版本，否则为数据库目录变更的本地计数"""
+        catalog = get_catalog()
+        return catalog.version if catalog is not None else _data_version
+
+    @staticmethod
+    def advance_data_version(partitions: Optional[Collection[Tuple[str, str]]] = None) -> int:
+        """
+        未启用目录时数据库目录已变更：数据版本加1，只淘汰 partitions 涉及的结果缓存，None 时整体失效
+
+        先切换缓存版本再递增，期间按旧版本计算的结果不会写入缓存
+        """
+        global _data_version
+        with _data_version_lock:
+            filter_cache.rebase(_data_version + 1, partitions)
+            _data_version += 1
+            return _data_version
+
+    @staticmethod
+    def filter_cooler_from_catalog(catalog: CoolerCatalog, filter_params: CoolerFilter,
+                                   projection: Optional[CoolerProjection] = None) -> dict:
+        """基于内存目录过滤产品，不访问数据库"""
+        delta_t = filter_params.repo_temp - filter_params.evaporating_temp
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        with stage("sc_quant"):
+            quant = catalog.get_quant(filter_params.evaporating_temp, delta_t)
+        target_cap = CoolerService.get_target_cap(filter_params, quant)
+
+        with stage("catalog_search"):
+            mask = CoolerService.build_catalog_mask(catalog, filter_params)
+            nearest = catalog.nearest(working_status, filter_params.refrigerant, target_cap, TOP_K, mask)
+
+        return CoolerService.build_catalog_result(catalog, nearest, working_status, projection)
+
+    @staticmethod
+    def build_catalog_result(catalog: CoolerCatalog, nearest: List[Tuple[int, float]], working_status: str,
+                             projection: Optional[CoolerProjection] = None) -> dict:
+        """以目录行号和冷量组装选型结果"""
+        with stage("to_pydantic"):
+            if projection is not None:
+                return projection.build(
+                    projection.row({field: catalog.field_value(row, field) for field in projection.cooler_fields},
+                                   cap, working_status)
+                    for row, cap in nearest
+                )
+            return {
+                "items": [catalog.to_response(row, cap, working_status) for row, cap in nearest],
+                "total": len(nearest)
+            }
+
+    @staticmethod
+    def filter_cooler_from_catalog_json(catalog: CoolerCatalog, filter_params: CoolerFilter) -> bytes:
+        """基于内存目录过滤产品，直接拼接预渲染的冷风机JSON片段，不构建 CoolerResponse"""
+        delta_t = filter_params.repo_temp - filter_params.evaporating_temp
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        with stage("sc_quant"):
+            quant = catalog.get_quant(filter_params.evaporating_temp, delta_t)
+        target_cap = CoolerService.get_target_cap(filter_params, quant)
+
+        with stage("catalog_search"):
+            mask = CoolerService.build_catalog_mask(catalog, filter_params)
+            nearest = catalog.nearest(working_status, filter_params.refrigerant, target_cap, TOP_K, mask)
+
+        with stage("serialize"):
+            return b'{"items":' + catalog.render_items(nearest, working_status) + b',"total":' + render_json(len(nearest)) + b"}"
+
+    @staticmethod
+    def filter_cooler_page(db: Session, filter_params: CoolerFilter, size: int,
+                           after: Optional[Tuple[float, int]] = None,
+                           projection: Optional[CoolerProjection] = None) -> dict:
+        """
+        按 (冷量差值, 冷风机ID) 分页过滤产品
+
+        after 为上一页最后一条的排序键，本页从该处继续遍历，代价与页码无关；
+        多取一条判断是否还有下一页，结果附带 next_cursor，没有下一页时为None
+        """
+        catalog = get_catalog()
+        if catalog is not None:
+            return CoolerService.filter_cooler_page_from_catalog(catalog, filter_params, size, after, projection)
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        target_cap = CoolerService.get_target_cap(filter_params, CoolerService.get_quant(db, filter_params))
+        with stage("pushdown_query"):
+            rows = CoolingCapacityRepository(db).get_ranked_coolers(
+                working_status, filter_params.refrigerant, target_cap, size + 1, after,
+                **CoolerService.pushdown_columns(projection), **CoolerService.attribute_filters(filter_params)
+            )
+        return CoolerService.build_page_result(rows, size, projection)
+
+    @staticmethod
+    async def filter_cooler_page_async(db: AsyncSession, filter_params: CoolerFilter, size: int,
+                                       after: Optional[Tuple[float, int]] = None,
+                                       projection: Optional[CoolerProjection] = None) -> dict:
+        """分页过滤产品，异步会话版本"""
+        catalog = get_catalog()
+        if catalog is not None:
+            return CoolerService.filter_cooler_page_from_catalog(catalog, filter_params, size, after, projection)
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        target_cap = CoolerService.get_target_cap(filter_params, await CoolerService.get_quant_async(db, filter_params))
+        with stage("pushdown_query"):
+            rows = await AsyncCoolingCapacityRepository(db).get_ranked_coolers(
+                working_status, filter_params.refrigerant, target_cap, size + 1, after,
+                **CoolerService.pushdown_columns(projection), **CoolerService.attribute_filters(filter_params)
+            )
+        return CoolerService.build_page_result(rows, size, projection)
+
+    @staticmethod
+    def filter_cooler_page_from_catalog(catalog: CoolerCatalog, filter_params: CoolerFilter, size: int,
+                                        after: Optional[Tuple[float, int]] = None,
+                                        projection: Optional[CoolerProjection] = None) -> dict:
+        """基于内存目录分页过滤产品"""
+        delta_t = filter_params.repo_temp - filter_params.evaporating_temp
+        working_status = SCLevel.get_level_by_value(filter_params.evaporating_temp).value
+        with stage("sc_quant"):
+            quant = catalog.get_quant(filter_params.evaporating_temp, delta_t)
+        target_cap = CoolerService.get_target_cap(filter_params, quant)
+
+        with stage("catalog_search"):
+            mask = CoolerService.build_catalog_mask(catalog, filter_params)
+            ranked = catalog.rank_page(working_status, filter_params.refrigerant, target_cap, size + 1, after, mask)
+
+        result = CoolerService.build_catalog_result(
+            catalog, [(row, cap) for row, cap, _ in ranked[:size]], working_status, projection
+        )
+        return CoolerService.page_result(result, [(distance, catalog.id_list[row]) for row, _, distance in ranked], size)
+
+    @staticmethod
+    def build_page_result(rows: List[Any], size: int, projection: Optional[CoolerProjection] = None) -> dict:
+        """以分页查询的结果行(多取一条)组装分页结果"""
+        result = CoolerService.build_pushdown_result(rows[:size], projection)
+        return CoolerService.page_result(result, [(row.distance, row.id) for row in rows], size)
+
+    @staticmethod
+    def page_result(result: dict, keys: List[Tuple[float, int]], size: int) -> dict:
+        """
+        选型结果转为分页结果：total 改为本页条数 count(匹配总数需额外遍历或查询，分页时不计算)，附带下一页游标
+
+        Args:
+            keys: 本页及多取一条的排序键 [(差值, 冷风机ID)]
+        """
+        result["count"] = result.pop("total")
+        result["next_cursor"] = CoolerService.next_cursor(keys, size)
+        return result
+
+    @staticmethod
+    def next_cursor(keys: List[Tuple[float, int]], size: int) -> Optional[str]:
+        """多取的一条存在时，以本页最后一条的排序键生成下一页游标"""
+        return encode_cursor(*keys[size - 1]) if len(keys) > size else None
+
+    @staticmethod
+    def attribute_filters(filter_params: CoolerFilter) -> dict:
+        """片距、系列和换热面积条件参数"""
+        return {
+            "fin_spacing_num": filter_params.fan_distance,
+            "series": filter_params.series,
+            "min_heat_exchange_area": filter_params.min_heat_exchange_area,
+            "max_heat_exchange_area": filter_params.max_heat_exchange_area
+        }
+
+    @staticmethod
+    def filter_cooler_batch(db: Session, filter_params_list: List[CoolerFilter],
+                            projection: Optional[CoolerProjection] = None) -> List[dict]:
+        """
+        批量过滤产品
+
+        修正系数和目标冷量对整批数组运算一次完成，再按(工况, 制冷剂)分组以数组运算查询最近冷量；
+        数据库模式下每组只查询一次冷量表，冷风机详情最后一次性查询，传入 projection 时只查询投影列
+
+        Returns:
+            与 filter_params_list 对齐的结果列表，每项结构与 filter_cooler 相同
+        """
+        catalog = get_catalog()
+        if not filter_params_list:
+            return []
+
+        evaporating_temps = np.array([params.evaporating_temp for params in filter_params_list], dtype=np.float64)
+        delta_ts = np.array([params.repo_temp for params in filter_params_list], dtype=np.float64) - evaporating_temps
+        grid = catalog.sc_quant_grid if catalog is not None else get_sc_quant_grid()
+        if grid is not None:
+            quants = grid.lookup_many(evaporating_temps, delta_ts)
+        else:
+            pairs = list(zip(evaporating_temps.tolist(), delta_ts.tolist()))
+            quant_dtos = SCQuantRepository(db).get_by_evaporating_temp_and_delta_t_pairs(pairs)
+            quants = np.array([quant_dtos[pair].quant if pair in quant_dtos else np.nan for pair in pairs],
+                              dtype=np.float64)
+        all_target_caps = CoolerService.get_target_caps(filter_params_list, quants)
+
+        # 供液方式已体现在目标冷量中，最近冷量查询只需按(工况, 制冷剂)分组
+        levels = list(SCLevel)
+        level_codes = get_coefficient_registry().sc_level_codes(evaporating_temps).tolist()
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, filter_params in enumerate(filter_params_list):
+            groups.setdefault((levels[level_codes[i]].value, filter_params.refrigerant), []).append(i)
+
+        results: List[Optional[dict]] = [None] * len(filter_params_list)
+        # 数据库模式下先收集各组选中的 (结果下标, 型号, 冷量, 工况)，最后统一查询冷风机
+        selected: List[Tuple[int, str, float, str]] = []
+        for (working_status, refrigerant), indices in groups.items():
+            group_params = [filter_params_list[i] for i in indices]
+            target_caps = all_target_caps[indices]
+
+            if catalog is not None:
+                mask_cache = {}
+                masks = [CoolerService.build_catalog_mask(catalog, params, mask_cache) for params in group_params]
+                ranked = catalog.nearest_batch(working_status, refrigerant, target_caps, TOP_K, masks)
+                for i, nearest in zip(indices, ranked):
+                    results[i] = CoolerService.build_catalog_result(catalog, nearest, working_status, projection)
+                continue
+
+            cap_dtos = CoolingCapacityRepository(db).get_by_working_status_and_refrigerant(working_status, refrigerant)
+            # 同一型号重复记录以后出现的为准
+            model_caps = {cap.cooler_id: cap.capacity for cap in cap_dtos}
+            models = list(model_caps)
+            index = CapacityIndex(
+                np.fromiter(model_caps.values(), dtype=np.float64, count=len(models)),
+                np.arange(len(models), dtype=np.int32)
+            )
+            allowed_cache = {}
+            masks = []
+            for params in group_params:
+                if not CoolerService.has_attribute_filter(params):
+                    masks.append(None)
+                    continue
+                key = (params.fan_distance, params.series, params.min_heat_exchange_area, params.max_heat_exchange_area)
+                if key not in allowed_cache:
+                    allowed_models = CoolerRepository(db).get_models_by_attributes(*key)
+                    allowed_cache[key] = np.fromiter((model in allowed_models for model in models),
+                                                     dtype=bool, count=len(models))
+                masks.append(allowed_cache[key])
+            ranked = index.nearest_batch(target_caps, TOP_K, masks)
+            for i, nearest in zip(indices, ranked):
+                selected.extend((i, models[row], cap, working_status) for row, cap in nearest)
+
+        # 数据库模式下各结果的冷风机条目，投影时为按 fields 排列的元组
+        items: Dict[int, list] = {}
+        if selected:
+            models = list({model for _, model, _, _ in selected})
+            cooler_repo = CoolerRepository(db)
+            if projection is not None:
+                rows = cooler_repo.get_columns_by_cooler_ids(models, projection.columns())
+                source_map = {row.model: row._mapping for row in rows}
+                for i, model, cap, working_status in selected:
+                    if model in source_map:
+                        items.setdefault(i, []).append(projection.row(source_map[model], cap, working_status))
+            else:
+                cooler_map = {cooler.model: cooler for cooler in cooler_repo.get_by_cooler_ids(models)}
+                for i, model, cap, working_status in selected:
+                    if model in cooler_map:
+                        items.setdefault(i, []).append(cooler_map[model].to_pydantic(cap, working_status))
+
+        return [
+            result if result is not None else CoolerService.build_items_result(items.get(i, []), projection)
+            for i, result in enumerate(results)
+        ]
+
+    @staticmethod
+    def build_items_result(items: list, projection: Optional[CoolerProjection] = None) -> dict:
+        """以已组装的条目组装选型结果，投影时 items 为 projection.row 产出的元组"""
+        if projection is not None:
+            return projection.build(items)
+        return {"items": items, "total": len(items)}
+
+    @staticmethod
+    def build_catalog_mask(catalog: CoolerCatalog, filter_params: CoolerFilter,
+                           cache: Optional[dict] = None) -> Optional[np.ndarray]:
+        """构建目录位图，cache 用于批量请求中复用相同条件的位图"""
+        key = (filter_params.fan_distance, filter_params.series,
+               filter_params.min_heat_exchange_area, filter_params.max_heat_exchange_area)
+        if cache is not None and key in cache:
+            return cache[key]
+        mask = catalog.build_mask(*key)
+        if cache is not None:
+            cache[key] = mask
+        return mask
+
+    @staticmethod
+    def has_attribute_filter(filter_params: CoolerFilter) -> bool:
+        """是否包含片距、系列或换热面积条件"""
+        return bool(
+            filter_params.fan_distance
+            or filter_params.series
+            or filter_params.min_heat_exchange_area is not None
+            or filter_params.max_heat_exchange_area is not None
+        )
+
+    @staticmethod
+    def get_target_cap(filter_params: CoolerFilter, quant: Optional[float]) -> float:
+        """根据工况修正系数和制冷剂系数计算目标冷量，找不到修正系数时按工况等级取值"""
+        if quant is None:
+            logger.debug(f"can't find target quant evap_temp: {filter_params.evaporating_temp}, "
+                         f"delta_t: {filter_params.repo_temp - filter_params.evaporating_temp}")
+            quant = SCLevel.get_q(filter_params.evaporating_temp, filter_params.refrigerant_supply_type)
+
+        refrigerant_quant = Refrigerant.get_q(filter_params.refrigerant, filter_params.refrigerant_supply_type)
+
+        return filter_params.required_cooling_cap / quant / refrigerant_quant
+
+    @staticmethod
+    def get_target_caps(filter_params_list: List[CoolerFilter], quants: np.ndarray) -> np.ndarray:
+        """批量计算目标冷量，quants 中为 NaN 的修正系数按工况等级取值"""
+        registry = get_coefficient_registry()
+        supply_codes = registry.encode_supply_types(params.refrigerant_supply_type for params in filter_params_list)
+        refrigerant_codes = registry.encode_refrigerants(params.refrigerant for params in filter_params_list)
+        evaporating_temps = np.array([params.evaporating_temp for params in filter_params_list], dtype=np.float64)
+        required_caps = np.array([params.required_cooling_cap for params in filter_params_list], dtype=np.float64)
+        quants = np.where(np.isnan(quants), registry.sc_level_q_many(evaporating_temps, supply_codes), quants)
+        refrigerant_quants = registry.refrigerant_q_many(refrigerant_codes, supply_codes)
+        return required_caps / quants / refrigerant_quants
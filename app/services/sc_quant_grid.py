@@ -0,0 +1,185 @@
+import math
+import threading
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.dao import SCQuant
+from app.models.repositories import SCQuantRepository
+from app.utils.logger import logger
+
+# 判断坐标轴等间距、网格边界时的浮点容差
+_EPSILON = 1e-9
+
+
+class _Axis:
+    """网格坐标轴，等间距时以算术运算 O(1) 定位单元格"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.size = len(values)
+        self.min = float(values[0])
+        self.max = float(values[-1])
+        steps = np.diff(values)
+        self.step = float(steps[0]) if self.size > 1 and np.allclose(steps, steps[0]) else None
+        self._value_list: List[float] = values.tolist()
+
+    def locate(self, x: float, clamp: bool) -> Optional[Tuple[int, float]]:
+        """返回 (单元格下标, 单元格内比例)，越界且不钳制时返回None"""
+        if x < self.min - _EPSILON or x > self.max + _EPSILON:
+            if not clamp:
+                return None
+        x = min(max(x, self.min), self.max)
+        if self.size == 1:
+            return 0, 0.0
+        if self.step is not None:
+            position = (x - self.min) / self.step
+            i = min(int(math.floor(position)), self.size - 2)
+            return i, min(max(position - i, 0.0), 1.0)
+        values = self._value_list
+        i = min(max(bisect_right(values, x) - 1, 0), self.size - 2)
+        return i, (x - values[i]) / (values[i + 1] - values[i])
+
+    def locate_many(self, x: np.ndarray, clamp: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量定位，返回 (单元格下标, 单元格内比例, 是否越界)"""
+        out_of_range = (x < self.min - _EPSILON) | (x > self.max + _EPSILON)
+        if clamp:
+            out_of_range = np.zeros(len(x), dtype=bool)
+        x = np.clip(x, self.min, self.max)
+        if self.size == 1:
+            return np.zeros(len(x), dtype=np.intp), np.zeros(len(x)), out_of_range
+        if self.step is not None:
+            position = (x - self.min) / self.step
+            i = np.minimum(np.floor(position).astype(np.intp), self.size - 2)
+            return i, np.clip(position - i, 0.0, 1.0), out_of_range
+        i = np.clip(np.searchsorted(self.values, x, side="right") - 1, 0, self.size - 2)
+        return i, (x - self.values[i]) / (self.values[i + 1] - self.values[i]), out_of_range
+
+
+class SCQuantGrid:
+    """
+    工况修正系数网格
+
+    将 sc_quant 表编译为以 (蒸发温度, 温差) 为坐标的稠密二维数组，网格点之间双线性插值，
+    正好落在网格点上时结果与精确匹配一致；缺失的网格点记为 NaN，插值用到缺失点时视为查不到
+    """
+
+    def __init__(self, points: List[Tuple[float, float, float]], clamp: bool = False):
+        """
+        Args:
+            points: (蒸发温度, 温差, 修正系数) 列表
+            clamp: 超出网格范围时是否钳制到边界取值，否则视为查不到
+        """
+        self.clamp = clamp
+        self.size = len(points)
+        if not points:
+            self.evaporating_temps = np.empty(0)
+            self.delta_ts = np.empty(0)
+            self.values = np.empty((0, 0))
+            return
+        self.evaporating_temps = np.unique([point[0] for point in points])
+        self.delta_ts = np.unique([point[1] for point in points])
+        self.values = np.full((len(self.evaporating_temps), len(self.delta_ts)), np.nan)
+        temp_index = {value: i for i, value in enumerate(self.evaporating_temps.tolist())}
+        delta_index = {value: j for j, value in enumerate(self.delta_ts.tolist())}
+        for evaporating_temp, delta_t, quant in points:
+            # 重复坐标以先出现的记录为准，与按条件取第一条一致
+            i, j = temp_index[evaporating_temp], delta_index[delta_t]
+            if np.isnan(self.values[i, j]):
+                self.values[i, j] = quant
+        self._temp_axis = _Axis(self.evaporating_temps)
+        self._delta_axis = _Axis(self.delta_ts)
+        self._value_list: List[List[float]] = self.values.tolist()
+
+    @classmethod
+    def from_arrays(cls, evaporating_temps: np.ndarray, delta_ts: np.ndarray, values: np.ndarray, size: int,
+                    clamp: bool = False) -> 'SCQuantGrid':
+        """以已编译的坐标轴和网格值构建(读取快照时使用)"""
+        grid = cls([], clamp=clamp)
+        if size:
+            grid.size = size
+            grid.evaporating_temps = evaporating_temps
+            grid.delta_ts = delta_ts
+            grid.values = values
+            grid._temp_axis = _Axis(evaporating_temps)
+            grid._delta_axis = _Axis(delta_ts)
+            grid._value_list = values.tolist()
+        return grid
+
+    @classmethod
+    def from_rows(cls, quants: List[SCQuant], clamp: bool = False) -> 'SCQuantGrid':
+        """从 SCQuant 记录构建网格"""
+        return cls(
+            [(quant.evaporating_temp, quant.delta_t, quant.quant) for quant in quants if quant.quant is not None],
+            clamp=clamp
+        )
+
+    def lookup(self, evaporating_temp: float, delta_t: float) -> Optional[float]:
+        """插值获取工况修正系数，查不到时返回None"""
+        if self.size == 0:
+            return None
+        temp_cell = self._temp_axis.locate(evaporating_temp, self.clamp)
+        delta_cell = self._delta_axis.locate(delta_t, self.clamp)
+        if temp_cell is None or delta_cell is None:
+            return None
+        i, tx = temp_cell
+        j, ty = delta_cell
+        values = self._value_list
+        total = 0.0
+        for di, wx in ((0, 1.0 - tx), (1, tx)):
+            if wx <= 0.0:
+                continue
+            for dj, wy in ((0, 1.0 - ty), (1, ty)):
+                if wy <= 0.0:
+                    continue
+                value = values[i + di][j + dj]
+                if value != value:
+                    return None
+                total += value * wx * wy
+        return total
+
+    def lookup_many(self, evaporating_temps: np.ndarray, delta_ts: np.ndarray) -> np.ndarray:
+        """批量插值获取工况修正系数，查不到的位置为 NaN"""
+        evaporating_temps = np.asarray(evaporating_temps, dtype=np.float64)
+        delta_ts = np.asarray(delta_ts, dtype=np.float64)
+        if self.size == 0:
+            return np.full(len(evaporating_temps), np.nan)
+        i, tx, temp_out = self._temp_axis.locate_many(evaporating_temps, self.clamp)
+        j, ty, delta_out = self._delta_axis.locate_many(delta_ts, self.clamp)
+        i1 = np.minimum(i + 1, self.values.shape[0] - 1)
+        j1 = np.minimum(j + 1, self.values.shape[1] - 1)
+        total = np.zeros(len(evaporating_temps))
+        missing = temp_out | delta_out
+        for rows, wx in ((i, 1.0 - tx), (i1, tx)):
+            for cols, wy in ((j, 1.0 - ty), (j1, ty)):
+                weight = wx * wy
+                value = self.values[rows, cols]
+                active = weight > 0.0
+                missing |= active & np.isnan(value)
+                total += np.where(active & ~np.isnan(value), value * weight, 0.0)
+        return np.where(missing, np.nan, total)
+
+
+# 当前生效的网格
+_grid: Optional[SCQuantGrid] = None
+_load_lock = threading.Lock()
+
+
+def get_sc_quant_grid() -> Optional[SCQuantGrid]:
+    """获取当前网格，未加载时返回None"""
+    return _grid
+
+
+def load_sc_quant_grid(session: Session, clamp: bool = False) -> SCQuantGrid:
+    """从数据库(重新)加载网格并替换当前网格"""
+    global _grid
+    with _load_lock:
+        grid = SCQuantGrid.from_rows(SCQuantRepository(session).get_all(), clamp=clamp)
+        _grid = grid
+    logger.info(
+        f"SC quant grid loaded: {len(grid.evaporating_temps)} evaporating temps x "
+        f"{len(grid.delta_ts)} delta_t, {grid.size} points"
+    )
+    return grid
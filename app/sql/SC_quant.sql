@@ -6,7 +6,9 @@ CREATE TABLE SC_quant (
 	create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL COMMENT '创建时间',
 	update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP NOT NULL,
 	is_deleted TINYINT DEFAULT 0 NULL COMMENT '逻辑删除',
-	CONSTRAINT cooler_pk PRIMARY KEY (id)
+	content_hash char(32) NULL COMMENT '内容哈希，增量导入时比对',
+	CONSTRAINT cooler_pk PRIMARY KEY (id),
+	KEY ix_sc_quant_temp_delta (evaporating_temp, delta_t, is_deleted, quant)
 )
 ENGINE=InnoDB
 DEFAULT CHARSET=utf8mb4
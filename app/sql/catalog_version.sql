@@ -0,0 +1,26 @@
+CREATE TABLE catalog_version (
+	id INT NOT NULL COMMENT '固定为1',
+	version BIGINT DEFAULT 0 NOT NULL COMMENT '版本号，每次目录变更加1',
+	update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP NOT NULL COMMENT '更新时间',
+	CONSTRAINT catalog_version_pk PRIMARY KEY (id)
+)
+ENGINE=InnoDB
+DEFAULT CHARSET=utf8mb4
+COLLATE=utf8mb4_0900_ai_ci
+COMMENT='目录版本号';
+
+INSERT INTO catalog_version (id, version) VALUES (1, 0);
+
+CREATE TABLE catalog_change (
+	id BIGINT UNSIGNED auto_increment NOT NULL COMMENT 'pk',
+	version BIGINT NOT NULL COMMENT '变更后的目录版本号',
+	table_name varchar(50) NOT NULL COMMENT '变更的表：cooler;cooling_capacity;sc_quant',
+	cooler_id varchar(255) NULL COMMENT '变更涉及的冷风机型号，为空表示整表变更',
+	create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL COMMENT '创建时间',
+	CONSTRAINT catalog_change_pk PRIMARY KEY (id),
+	KEY ix_catalog_change_version (version)
+)
+ENGINE=InnoDB
+DEFAULT CHARSET=utf8mb4
+COLLATE=utf8mb4_0900_ai_ci
+COMMENT='目录变更日志';
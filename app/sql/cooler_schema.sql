@@ -12,12 +12,15 @@ CREATE TABLE cooler (
 	weight FLOAT NULL COMMENT '重量(kg）',
 	model varchar(100) NULL COMMENT '型号',
 	fin_spacing varchar(100) NULL COMMENT '翅片间距',
+	fin_spacing_num FLOAT NULL COMMENT '翅片间距数字',
 	series varchar(100) NULL COMMENT '系列',
 	create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL COMMENT '创建时间',
 	update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP NOT NULL,
 	is_deleted TINYINT DEFAULT 0 NULL COMMENT '逻辑删除',
 	comment varchar(255) NULL COMMENT '参数注释',
-	CONSTRAINT cooler_pk PRIMARY KEY (id)
+	content_hash char(32) NULL COMMENT '内容哈希，增量导入时比对',
+	CONSTRAINT cooler_pk PRIMARY KEY (id),
+	KEY ix_cooler_model_deleted (model, is_deleted)
 )
 ENGINE=InnoDB
 DEFAULT CHARSET=utf8mb4
@@ -28,11 +31,14 @@ CREATE TABLE cooling_capacity (
 	id BIGINT UNSIGNED auto_increment NOT NULL COMMENT 'pk',
 	cooler_id varchar(255) NOT NULL COMMENT '冷风机的id',
 	working_status varchar(100) NOT NULL COMMENT '工况：SC1;SC2;SC3;SC4;SC5',
+	refrigerant varchar(100) NOT NULL COMMENT '制冷剂',
 	capacity FLOAT NOT NULL COMMENT '制冷量（KW）',
 	created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP NULL COMMENT '创建时间',
 	updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP NULL COMMENT '更新时间',
 	is_deleted TINYINT DEFAULT 0 NULL COMMENT '逻辑删除',
-	CONSTRAINT cooling_capacity_pk PRIMARY KEY (id)
+	content_hash char(32) NULL COMMENT '内容哈希，增量导入时比对',
+	CONSTRAINT cooling_capacity_pk PRIMARY KEY (id),
+	KEY ix_cooling_capacity_status_refrigerant (working_status, refrigerant, is_deleted, capacity, cooler_id)
 )
 ENGINE=InnoDB
 DEFAULT CHARSET=utf8mb4
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Collection, Hashable, Optional, Tuple
+
+# get 返回的缓存状态
+CACHE_FRESH = "fresh"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+class TTLCache:
+    """
+    LRU + TTL 缓存
+
+    超过 ttl 但未超过 ttl + stale_ttl 的条目仍可返回(CACHE_STALE)，由调用方在后台刷新；
+    缓存绑定单调递增的数据版本号，版本变化时整体失效，或经 rebase 只淘汰受影响标签的条目
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.version: Any = None
+        self._clock = clock
+        # 键 -> (写入时间, 值, 标签)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, Hashable]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ensure_version(self, version: Any) -> None:
+        """数据版本升高时清空缓存，旧版本的读者不影响缓存"""
+        if version == self.version:
+            return
+        with self._lock:
+            if self.version is None or version > self.version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self._refreshing.clear()
+                self.version = version
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """获取缓存值，返回 (值, 状态)"""
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, CACHE_MISS
+            stored_at, value, _ = entry
+            age = now - stored_at
+            if age <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value, CACHE_FRESH
+            if age <= self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                return value, CACHE_STALE
+            del self._data[key]
+            self.misses += 1
+            return None, CACHE_MISS
+
+    def set(self, key: Hashable, value: Any, version: Any = None, tag: Hashable = None) -> None:
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目；version 与当前版本不一致时丢弃
+
+        tag 标记条目依赖的数据分区，供 rebase 按分区淘汰
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = (self._clock(), value, tag)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def rebase(self, version: Any, tags: Optional[Collection[Hashable]] = None) -> int:
+        """
+        切换到新版本，只淘汰标签在 tags 中或没有标签的条目，其余条目保留
+
+        tags 为None时整体失效；之后旧版本计算的结果写入时会被丢弃
+
+        Returns:
+            淘汰的条目数
+        """
+        with self._lock:
+            if self.version is not None and version <= self.version:
+                return 0
+            self.version = version
+            self._refreshing.clear()
+            if tags is None:
+                count = len(self._data)
+                self._data.clear()
+            else:
+                stale = [key for key, (_, _, tag) in self._data.items() if tag is None or tag in tags]
+                for key in stale:
+                    del self._data[key]
+                count = len(stale)
+            if count:
+                self.invalidations += 1
+            return count
+
+    def begin_refresh(self, key: Hashable) -> bool:
+        """标记开始刷新，已有刷新在进行时返回False"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: Hashable) -> None:
+        """标记刷新结束"""
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._refreshing.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """命中、未命中、淘汰等统计"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "version": self.version,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,277 @@
+"""
+冷风机目录增量同步
+
+导入行按自然键与数据库现有行比对内容哈希，只对新增、变化和消失的行分别执行
+INSERT、UPDATE 和逻辑删除，未变化的行不写入，更新时间保持不变。
+消失的行只在导入数据覆盖的范围内删除(如导入型号的冷量、导入蒸发温度的修正系数)，
+只导入部分工作簿或工作表时其余行保持不变；delete_missing 为 True 时才删除整表中导入数据没有的行。
+
+每个写入事务同时递增目录版本号并记录涉及的冷风机型号，供运行中的服务增量更新目录
+"""
+import hashlib
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Table, bindparam, select, update
+from sqlalchemy.engine import Engine
+
+from app.models.dao import Cooler, CoolingCapacity, SCQuant
+from app.models.database import engine
+from app.models.repositories import record_catalog_changes
+
+
+def _normalize(value):
+    """Excel 中的整数与数据库读出的浮点数按同一数值处理"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def chunks(rows: Iterable, size: int) -> Iterator[list]:
+    """按 size 分块"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SyncSpec:
+    """
+    表的同步规则
+
+    Args:
+        table: 目标表
+        key_columns: 自然键列，用于匹配导入行与数据库行
+        value_columns: 其余参与内容哈希的列
+        update_time_column: 更新时间列名
+        keep_first: 自然键重复时以先出现的行为准，与选型读取时的取舍一致
+        change_column: 记入变更日志的冷风机型号列；为None时按整表变更记录
+        scope_columns: 删除范围列(自然键列的子集)，导入数据中出现过的取值范围内消失的行逻辑删除；
+            为None时只在 delete_missing 时删除
+    """
+
+    def __init__(self, table: Table, key_columns: Sequence[str], value_columns: Sequence[str],
+                 update_time_column: str, keep_first: bool = False, change_column: Optional[str] = None,
+                 scope_columns: Optional[Sequence[str]] = None):
+        self.table = table
+        self.key_columns = tuple(key_columns)
+        self.value_columns = tuple(value_columns)
+        self.hash_columns = self.key_columns + self.value_columns
+        self.update_time_column = update_time_column
+        self.keep_first = keep_first
+        self.change_column = change_column
+        self.scope_columns = tuple(scope_columns) if scope_columns is not None else None
+
+    def key(self, row) -> tuple:
+        return tuple(_normalize(row[name]) for name in self.key_columns)
+
+    def scope(self, row) -> tuple:
+        return tuple(_normalize(row[name]) for name in self.scope_columns)
+
+    def content_hash(self, row: dict) -> str:
+        """按 hash_columns 顺序计算行内容哈希(32位十六进制)"""
+        values = [_normalize(row.get(name)) for name in self.hash_columns]
+        return hashlib.blake2b(orjson.dumps(values), digest_size=16).hexdigest()
+
+    def with_hash(self, row: dict) -> dict:
+        row["content_hash"] = self.content_hash(row)
+        return row
+
+    def changes(self, rows: Iterable) -> List[Tuple[str, Optional[str]]]:
+        """行对应的变更日志条目 [(表名, 冷风机型号)]，rows 为导入行或数据库行"""
+        if self.change_column is None:
+            return [(self.table.name, None)]
+        return [(self.table.name, str(row[self.change_column])) for row in rows]
+
+
+COOLER_SYNC = SyncSpec(
+    Cooler.__table__,
+    ("model",),
+    ("heat_exchange_area", "tube_volumn", "air_flow_rate", "total_fan_power", "total_fan_current", "air_flow",
+     "defrost_power", "pipe_dia", "noise", "weight", "series", "comment", "fin_spacing", "fin_spacing_num"),
+    "update_time",
+    keep_first=True,
+    change_column="model"
+)
+# 工作簿中一台冷风机的一列即该型号的全部冷量，导入型号下消失的工况逻辑删除
+CAPACITY_SYNC = SyncSpec(
+    CoolingCapacity.__table__,
+    ("cooler_id", "working_status", "refrigerant"),
+    ("capacity",),
+    "updated_time",
+    change_column="cooler_id",
+    scope_columns=("cooler_id",)
+)
+# 修正系数工作表按蒸发温度分列，导入蒸发温度下消失的温差逻辑删除
+SC_QUANT_SYNC = SyncSpec(
+    SCQuant.__table__,
+    ("evaporating_temp", "delta_t"),
+    ("quant",),
+    "update_time",
+    keep_first=True,
+    scope_columns=("evaporating_temp",)
+)
+
+
+class _Existing(NamedTuple):
+    id: int
+    content_hash: str
+    active: bool
+    # 自然键列的原值
+    row: dict
+
+
+class _Duplicate(NamedTuple):
+    key: tuple
+    id: int
+    row: dict
+
+
+class SyncPlan:
+    """一张表的同步计划"""
+
+    def __init__(self, spec: SyncSpec):
+        self.spec = spec
+        self.inserts: List[dict] = []
+        # 待更新行，"_id" 为数据库行ID
+        self.updates: List[dict] = []
+        # 待逻辑删除的 (行ID, 自然键列的原值)
+        self.deletes: List[Tuple[int, dict]] = []
+        self.unchanged = 0
+
+    @property
+    def changes(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+            "deleted": len(self.deletes),
+            "unchanged": self.unchanged
+        }
+
+
+def _load_existing(spec: SyncSpec, bind: Engine) -> Tuple[Dict[tuple, _Existing], List[_Duplicate]]:
+    """
+    读取数据库现有行的自然键和内容哈希
+
+    同一自然键有多条行时优先保留未删除的一条(按 keep_first 取ID最小或最大)，其余未删除的行返回为待删除行
+
+    Returns:
+        ({自然键: 现有行}, [重复行])
+    """
+    table = spec.table
+    key_columns = [table.c[name] for name in spec.key_columns]
+    existing: Dict[tuple, _Existing] = {}
+    duplicates = []
+    # 按保留优先级升序遍历，后遍历到的未删除行替换先前的行
+    order = table.c.id.desc() if spec.keep_first else table.c.id
+    statement = select(table.c.id, table.c.content_hash, table.c.is_deleted, *key_columns).order_by(order)
+    with bind.connect() as connection:
+        for row_id, content_hash, is_deleted, *values in connection.execute(statement):
+            row = dict(zip(spec.key_columns, values))
+            key = spec.key(row)
+            active = is_deleted == 0
+            previous = existing.get(key)
+            if previous is not None and previous.active:
+                if not active:
+                    continue
+                duplicates.append(_Duplicate(key, previous.id, previous.row))
+            existing[key] = _Existing(row_id, content_hash, active, row)
+    return existing, duplicates
+
+
+def plan_sync(spec: SyncSpec, rows: Iterable[dict], delete_missing: bool = False,
+              bind: Engine = engine) -> SyncPlan:
+    """
+    比对导入行与数据库现有行
+
+    - 自然键不存在：新增
+    - 内容哈希不同或已逻辑删除：更新并恢复
+    - 数据库中未删除而导入数据中没有的行：删除范围(scope_columns)在导入数据中出现过时逻辑删除，
+      delete_missing 为 True 时一律逻辑删除
+    - 同一自然键的重复行：自然键在导入数据中或 delete_missing 为 True 时逻辑删除
+
+    导入行需已带 content_hash，同一自然键重复时按 keep_first 取舍
+    """
+    plan = SyncPlan(spec)
+    existing, duplicates = _load_existing(spec, bind)
+
+    incoming: Dict[tuple, dict] = {}
+    for row in rows:
+        key = spec.key(row)
+        if spec.keep_first and key in incoming:
+            continue
+        incoming[key] = row
+
+    now = datetime.now()
+    for key, row in incoming.items():
+        current = existing.pop(key, None)
+        if current is None:
+            plan.inserts.append(row)
+        elif current.content_hash != row["content_hash"] or not current.active:
+            values = {name: row.get(name) for name in spec.hash_columns}
+            values.update({
+                "_id": current.id,
+                "content_hash": row["content_hash"],
+                spec.update_time_column: now,
+                "is_deleted": 0
+            })
+            plan.updates.append(values)
+        else:
+            plan.unchanged += 1
+
+    plan.deletes = [(duplicate.id, duplicate.row) for duplicate in duplicates
+                    if delete_missing or duplicate.key in incoming]
+    if delete_missing:
+        plan.deletes.extend((current.id, current.row) for current in existing.values() if current.active)
+    elif spec.scope_columns is not None:
+        scopes = {spec.scope(row) for row in incoming.values()}
+        plan.deletes.extend((current.id, current.row) for current in existing.values()
+                            if current.active and spec.scope(current.row) in scopes)
+    return plan
+
+
+def apply_sync(plan: SyncPlan, chunk_size: int, bind: Engine = engine) -> None:
+    """
+    按块执行同步计划，每块一个事务，新增和更新均以 executemany 批量执行
+
+    每个事务内同时递增目录版本号并记录本块涉及的冷风机型号
+    """
+    spec = plan.spec
+    table = spec.table
+    for chunk in chunks(plan.inserts, chunk_size):
+        with bind.begin() as connection:
+            connection.execute(table.insert(), chunk)
+            record_catalog_changes(connection, spec.changes(chunk))
+
+    # SET 子句由参数字典中除 _id 以外的键生成
+    update_statement = update(table).where(table.c.id == bindparam("_id"))
+    for chunk in chunks(plan.updates, chunk_size):
+        with bind.begin() as connection:
+            connection.execute(update_statement, chunk)
+            record_catalog_changes(connection, spec.changes(chunk))
+
+    now = datetime.now()
+    for chunk in chunks(plan.deletes, chunk_size):
+        with bind.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(table.c.id.in_([row_id for row_id, _ in chunk]))
+                .values({"is_deleted": 1, spec.update_time_column: now})
+            )
+            record_catalog_changes(connection, spec.changes(row for _, row in chunk))
+
+
+def sync_table(spec: SyncSpec, rows: Iterable[dict], chunk_size: int, dry_run: bool = False,
+               delete_missing: bool = False, bind: Engine = engine) -> SyncPlan:
+    """比对并同步一张表，dry_run 为 True 时只生成计划不写入，delete_missing 见 plan_sync"""
+    plan = plan_sync(spec, rows, delete_missing, bind)
+    if not dry_run and plan.changes:
+        apply_sync(plan, chunk_size, bind)
+    return plan
@@ -0,0 +1,177 @@
+import json
+import threading
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.utils.enums import SC_LEVEL_MAX_TEMP, SC_LEVEL_RANGES, SCLevel, Refrigerant, RefrigerantSupplyType
+
+# 枚举成员到小整数编码，编码即系数表的行/列下标
+SC_LEVEL_CODES: Dict[SCLevel, int] = {member: code for code, member in enumerate(SCLevel)}
+REFRIGERANT_CODES: Dict[Refrigerant, int] = {member: code for code, member in enumerate(Refrigerant)}
+SUPPLY_TYPE_CODES: Dict[RefrigerantSupplyType, int] = {member: code for code, member in enumerate(RefrigerantSupplyType)}
+
+# 默认系数表：{等级/制冷剂: {供液方式: 系数}}
+DEFAULT_SC_LEVEL_Q = {
+    SCLevel.SC1.value: {RefrigerantSupplyType.DIRECT.value: 1.481, RefrigerantSupplyType.PUMP.value: 1.403},
+    SCLevel.SC2.value: {RefrigerantSupplyType.DIRECT.value: 1.0, RefrigerantSupplyType.PUMP.value: 1.005},
+    SCLevel.SC3.value: {RefrigerantSupplyType.DIRECT.value: 0.769, RefrigerantSupplyType.PUMP.value: 0.758},
+    SCLevel.SC4.value: {RefrigerantSupplyType.DIRECT.value: 0.638, RefrigerantSupplyType.PUMP.value: 0.616},
+    SCLevel.SC5.value: {RefrigerantSupplyType.DIRECT.value: 0.603, RefrigerantSupplyType.PUMP.value: 0.6},
+}
+
+DEFAULT_REFRIGERANT_Q = {
+    Refrigerant.R404A.value: {RefrigerantSupplyType.DIRECT.value: 1.0, RefrigerantSupplyType.PUMP.value: 1.005},
+    Refrigerant.R22.value: {RefrigerantSupplyType.DIRECT.value: 0.927, RefrigerantSupplyType.PUMP.value: 0.999},
+    Refrigerant.R407C.value: {RefrigerantSupplyType.DIRECT.value: 0.98, RefrigerantSupplyType.PUMP.value: 1.027},
+    Refrigerant.R410A.value: {RefrigerantSupplyType.DIRECT.value: 0.995, RefrigerantSupplyType.PUMP.value: 1.066},
+    Refrigerant.R507C.value: {RefrigerantSupplyType.DIRECT.value: 0.961, RefrigerantSupplyType.PUMP.value: 0.999},
+    Refrigerant.R23.value: {RefrigerantSupplyType.DIRECT.value: 1.017, RefrigerantSupplyType.PUMP.value: 1.099},
+}
+
+
+def _compile_table(mapping: Mapping[str, Mapping[str, float]], row_codes: Dict, row_enum) -> np.ndarray:
+    """将 {行枚举值: {供液方式: 系数}} 编译为二维数组，缺失项为 NaN"""
+    table = np.full((len(row_codes), len(SUPPLY_TYPE_CODES)), np.nan)
+    for row_value, row in mapping.items():
+        row_code = row_codes[row_enum.from_value(row_value)]
+        for supply_value, quant in row.items():
+            table[row_code, SUPPLY_TYPE_CODES[RefrigerantSupplyType.from_value(supply_value)]] = quant
+    return table
+
+
+def _encode(values: Iterable[str], enum_class, codes: Dict) -> np.ndarray:
+    """将枚举值字符串编码为整数数组"""
+    return np.array([codes[enum_class.from_value(value)] for value in values], dtype=np.intp)
+
+
+class CoefficientRegistry:
+    """
+    系数注册表
+
+    将工况等级系数表和制冷剂系数表编译为以小整数编码为下标的二维数组，支持标量和批量查询；
+    系数表可从映射或数据文件重新加载，每次加载带版本号，整体替换保证并发读取无需加锁
+    """
+
+    def __init__(
+        self,
+        sc_level_q: Mapping[str, Mapping[str, float]] = DEFAULT_SC_LEVEL_Q,
+        refrigerant_q: Mapping[str, Mapping[str, float]] = DEFAULT_REFRIGERANT_Q,
+        version: int = 0
+    ):
+        self._lock = threading.Lock()
+        self._tables = self._compile(sc_level_q, refrigerant_q, version)
+
+    @staticmethod
+    def _compile(sc_level_q, refrigerant_q, version: int) -> Tuple:
+        sc_level_table = _compile_table(sc_level_q, SC_LEVEL_CODES, SCLevel)
+        refrigerant_table = _compile_table(refrigerant_q, REFRIGERANT_CODES, Refrigerant)
+        return version, sc_level_table, refrigerant_table, sc_level_table.tolist(), refrigerant_table.tolist()
+
+    @property
+    def version(self) -> int:
+        return self._tables[0]
+
+    @property
+    def sc_level_table(self) -> np.ndarray:
+        return self._tables[1]
+
+    @property
+    def refrigerant_table(self) -> np.ndarray:
+        return self._tables[2]
+
+    def load_mapping(self, data: Mapping, force: bool = False) -> int:
+        """
+        从映射重新加载系数表
+
+        Args:
+            data: {"version": 版本号, "sc_level": {等级: {供液方式: 系数}}, "refrigerant": {制冷剂: {供液方式: 系数}}}，
+                  缺少的表沿用默认值
+            force: 是否允许加载不高于当前版本的数据
+
+        Returns:
+            加载后的版本号
+        """
+        version = int(data.get("version", self.version + 1))
+        with self._lock:
+            if not force and version <= self.version:
+                raise ValueError(f"coefficient version {version} is not newer than {self.version}")
+            self._tables = self._compile(
+                data.get("sc_level", DEFAULT_SC_LEVEL_Q),
+                data.get("refrigerant", DEFAULT_REFRIGERANT_Q),
+                version
+            )
+        return version
+
+    def to_mapping(self) -> dict:
+        """导出为 load_mapping 的格式"""
+        def export(table: np.ndarray, codes: Dict) -> Dict[str, Dict[str, float]]:
+            return {
+                member.value: {
+                    supply.value: float(table[code, supply_code])
+                    for supply, supply_code in SUPPLY_TYPE_CODES.items()
+                    if not np.isnan(table[code, supply_code])
+                }
+                for member, code in codes.items()
+            }
+        version, sc_level_table, refrigerant_table = self._tables[:3]
+        return {
+            "version": version,
+            "sc_level": export(sc_level_table, SC_LEVEL_CODES),
+            "refrigerant": export(refrigerant_table, REFRIGERANT_CODES)
+        }
+
+    def load_file(self, path: str, force: bool = False) -> int:
+        """从JSON数据文件重新加载系数表，格式同 load_mapping"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.load_mapping(json.load(f), force=force)
+
+    def sc_level_q(self, level: SCLevel, supply_type: RefrigerantSupplyType) -> Optional[float]:
+        """获取工况等级系数"""
+        quant = self._tables[3][SC_LEVEL_CODES[level]][SUPPLY_TYPE_CODES[supply_type]]
+        return None if quant != quant else quant
+
+    def refrigerant_q(self, refrigerant: Refrigerant, supply_type: RefrigerantSupplyType) -> Optional[float]:
+        """获取制冷剂系数"""
+        quant = self._tables[4][REFRIGERANT_CODES[refrigerant]][SUPPLY_TYPE_CODES[supply_type]]
+        return None if quant != quant else quant
+
+    @staticmethod
+    def sc_level_codes(evaporating_temps: np.ndarray) -> np.ndarray:
+        """批量将蒸发温度映射为工况等级编码"""
+        evaporating_temps = np.asarray(evaporating_temps, dtype=np.float64)
+        if (evaporating_temps > SC_LEVEL_MAX_TEMP).any():
+            value = evaporating_temps[evaporating_temps > SC_LEVEL_MAX_TEMP][0]
+            raise ValueError(f"{value}在范围之外")
+        return np.select(
+            [(low <= evaporating_temps) & (evaporating_temps <= high) for low, high, _ in SC_LEVEL_RANGES],
+            [SC_LEVEL_CODES[level] for _, _, level in SC_LEVEL_RANGES],
+            default=SC_LEVEL_CODES[SCLevel.SC5]
+        )
+
+    @staticmethod
+    def encode_refrigerants(values: Iterable[str]) -> np.ndarray:
+        """批量将制冷剂编码"""
+        return _encode(values, Refrigerant, REFRIGERANT_CODES)
+
+    @staticmethod
+    def encode_supply_types(values: Iterable[str]) -> np.ndarray:
+        """批量将供液方式编码"""
+        return _encode(values, RefrigerantSupplyType, SUPPLY_TYPE_CODES)
+
+    def sc_level_q_many(self, evaporating_temps: np.ndarray, supply_codes: np.ndarray) -> np.ndarray:
+        """批量获取工况等级系数"""
+        return self._tables[1][self.sc_level_codes(evaporating_temps), supply_codes]
+
+    def refrigerant_q_many(self, refrigerant_codes: np.ndarray, supply_codes: np.ndarray) -> np.ndarray:
+        """批量获取制冷剂系数"""
+        return self._tables[2][refrigerant_codes, supply_codes]
+
+
+# 全局系数注册表
+coefficient_registry = CoefficientRegistry()
+
+
+def get_coefficient_registry() -> CoefficientRegistry:
+    """获取全局系数注册表"""
+    return coefficient_registry
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from typing import Tuple
+
+import orjson
+
+
+def encode_cursor(distance: float, cooler_id: int) -> str:
+    """将排序键 (冷量差值, 冷风机ID) 编码为不透明的分页游标"""
+    return base64.urlsafe_b64encode(orjson.dumps({"d": distance, "i": cooler_id})).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    解析分页游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(payload["d"]), int(payload["i"])
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -1,6 +1,10 @@
+import math
 from enum import Enum
 from typing import Dict, Tuple, Optional
 
+# 蒸发温度上限，高于该值不属于任何工况等级
+SC_LEVEL_MAX_TEMP = 10
+
 
 class SCLevel(Enum):
     """温度等级枚举"""
@@ -13,55 +17,48 @@ class SCLevel(Enum):
     @classmethod
     def get_level_by_value(cls, value: float) -> Optional['SCLevel']:
         """根据温度值获取等级"""
-        if value > 10:
+        if value > SC_LEVEL_MAX_TEMP:
             raise ValueError(f"{value}在范围之外")
-        if -4 <= value <= 10:
-            return cls.SC1
-        elif -15 <= value <= -5:
-            return cls.SC2
-        elif -27 <= value <= -16:
-            return cls.SC3
-        elif -35 <= value <= -28:
-            return cls.SC4
-        else:
-            return cls.SC5
+        # 区间端点均为整数：整数温度直接查表，小数取两侧整数查表，两侧同级才属于该级，
+        # 其余(低于最低区间或落在区间缝隙中)为SC5
+        level = _SC_LEVEL_BY_TEMP.get(value)
+        if level is None and value > _SC_LEVEL_MIN_TEMP:
+            low = math.floor(value)
+            level = _SC_LEVEL_BY_TEMP.get(low)
+            if level is not _SC_LEVEL_BY_TEMP.get(low + 1):
+                level = None
+        return level or cls.SC5
 
     @classmethod
     def from_value(cls, value):
         """通过值获取枚举"""
-        for member in cls:
-            if member.value == value:
-                return member
-        raise ValueError(f"{value} is not a valid {cls.__name__}")
+        member = cls._value2member_map_.get(value)
+        if member is None:
+            raise ValueError(f"{value} is not a valid {cls.__name__}")
+        return member
 
     @classmethod
     def get_q(cls, evap_temp: float, refrigerant_supply_type: str):
+        from app.utils.coefficients import coefficient_registry
         target_refrigerant = cls.get_level_by_value(evap_temp)
         target_refrigerant_supply_type = RefrigerantSupplyType.from_value(refrigerant_supply_type)
-        q = {
-            cls.SC1: {
-                RefrigerantSupplyType.DIRECT: 1.481,
-                RefrigerantSupplyType.PUMP: 1.403
-            },
-            cls.SC2: {
-                RefrigerantSupplyType.DIRECT: 1.0,
-                RefrigerantSupplyType.PUMP: 1.005
-            },
-            cls.SC3: {
-                RefrigerantSupplyType.DIRECT: 0.769,
-                RefrigerantSupplyType.PUMP: 0.758
-            },
-            cls.SC4: {
-                RefrigerantSupplyType.DIRECT: 0.638,
-                RefrigerantSupplyType.PUMP: 0.616
-            },
-            cls.SC5: {
-                RefrigerantSupplyType.DIRECT: 0.603,
-                RefrigerantSupplyType.PUMP: 0.6
-            }
-
-        }
-        return q.get(target_refrigerant).get(target_refrigerant_supply_type)
+        return coefficient_registry.sc_level_q(target_refrigerant, target_refrigerant_supply_type)
+
+
+# 蒸发温度闭区间 (下限, 上限, 等级)，端点均为整数，不在任何区间内的为 SC5；
+# get_level_by_value 和系数注册表的批量映射共用该表
+SC_LEVEL_RANGES: Tuple[Tuple[int, int, SCLevel], ...] = (
+    (-4, SC_LEVEL_MAX_TEMP, SCLevel.SC1),
+    (-15, -5, SCLevel.SC2),
+    (-27, -16, SCLevel.SC3),
+    (-35, -28, SCLevel.SC4),
+)
+_SC_LEVEL_MIN_TEMP = min(low for low, _, _ in SC_LEVEL_RANGES)
+_SC_LEVEL_BY_TEMP: Dict[int, SCLevel] = {
+    temp: level
+    for low, high, level in SC_LEVEL_RANGES
+    for temp in range(low, high + 1)
+}
 
 
 class Refrigerant(Enum):
@@ -76,43 +73,17 @@ class Refrigerant(Enum):
     @classmethod
     def from_value(cls, value):
         """通过值获取枚举"""
-        for member in cls:
-            if member.value == value:
-                return member
-        raise ValueError(f"{value} is not a valid {cls.__name__}")
+        member = cls._value2member_map_.get(value)
+        if member is None:
+            raise ValueError(f"{value} is not a valid {cls.__name__}")
+        return member
 
     @classmethod
     def get_q(cls, refrigerant: str, refrigerant_supply_type: str):
+        from app.utils.coefficients import coefficient_registry
         target_refrigerant = cls.from_value(refrigerant)
         target_refrigerant_supply_type = RefrigerantSupplyType.from_value(refrigerant_supply_type)
-        q = {
-            cls.R404A: {
-                RefrigerantSupplyType.DIRECT: 1.0,
-                RefrigerantSupplyType.PUMP: 1.005
-            },
-            cls.R22: {
-                RefrigerantSupplyType.DIRECT: 0.927,
-                RefrigerantSupplyType.PUMP: 0.999
-            },
-            cls.R407C: {
-                RefrigerantSupplyType.DIRECT: 0.98,
-                RefrigerantSupplyType.PUMP: 1.027
-            },
-            cls.R410A: {
-                RefrigerantSupplyType.DIRECT: 0.995,
-                RefrigerantSupplyType.PUMP: 1.066
-            },
-            cls.R507C: {
-                RefrigerantSupplyType.DIRECT: 0.961,
-                RefrigerantSupplyType.PUMP: 0.999
-            },
-            cls.R23: {
-                RefrigerantSupplyType.DIRECT: 1.017,
-                RefrigerantSupplyType.PUMP: 1.099
-            },
-
-        }
-        return q.get(target_refrigerant).get(target_refrigerant_supply_type)
+        return coefficient_registry.refrigerant_q(target_refrigerant, target_refrigerant_supply_type)
 
 
 class RefrigerantSupplyType(Enum):
@@ -123,10 +94,10 @@ class RefrigerantSupplyType(Enum):
     @classmethod
     def from_value(cls, value):
         """通过值获取枚举"""
-        for member in cls:
-            if member.value == value:
-                return member
-        raise ValueError(f"{value} is not a valid {cls.__name__}")
+        member = cls._value2member_map_.get(value)
+        if member is None:
+            raise ValueError(f"{value} is not a valid {cls.__name__}")
+        return member
 
 
 if __name__ == '__main__':
@@ -0,0 +1,328 @@
+"""
+冷风机目录批量导入
+
+直接从 Excel 读取数据写入数据库，取代先生成逐行 INSERT 的SQL文件再回放的流程：
+工作簿以流式模式读取(openpyxl read_only、xlrd on_demand)，数据按块以多行 executemany 写入
+
+默认增量导入：每行计算内容哈希，与数据库中的哈希比对后只写入新增、变化和消失的行，
+消失的行只在导入数据覆盖的型号、蒸发温度范围内删除(见 catalog_sync)；
+--delete-missing 时逻辑删除整表中本次导入数据没有的行；--replace 在一个事务中逻辑删除对应表的现有行并全量写入，
+运行中的服务不会读到清空或写入一半的表
+
+可同时导入多个工作簿：各冷风机工作簿、各修正系数工作表分别在进程池中解析，
+解析结果按提交顺序交给主进程，同一张表的全部工作簿合并后统一比对写入，数据库只有一个写入方
+
+用法:
+    python -m app.utils.import_catalog --coolers 冷风机数据.xlsx --sc-quant 转换系数.xls
+    python -m app.utils.import_catalog --coolers 厂家A.xlsx 厂家B.xlsx --sc-quant 转换系数.xls --workers 4
+    python -m app.utils.import_catalog --coolers 冷风机数据.xlsx --dry-run
+    python -m app.utils.import_catalog --coolers 厂家A.xlsx 厂家B.xlsx --delete-missing --dry-run
+    python -m app.utils.import_catalog --coolers 冷风机数据.xlsx --replace --chunk-size 2000
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain, islice, zip_longest
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import openpyxl
+import xlrd
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+
+from app.models.database import engine
+from app.models.repositories import record_catalog_changes
+from app.utils.catalog_sync import CAPACITY_SYNC, COOLER_SYNC, SC_QUANT_SYNC, SyncSpec, chunks, sync_table
+from app.utils.excel_to_sql import parse_sheet_names
+from app.utils.generate_cooler_sql import extract_fin_spacing_num
+
+# 每个事务写入的行数
+DEFAULT_CHUNK_SIZE = 1000
+
+# 冷风机工作簿按列存放：第1行型号，第2-6行各工况冷量，第7行制冷剂，第8-20行冷风机参数(行号从1开始)
+COOLER_SHEET_ROWS = 20
+WORKING_STATUS_ROWS = {2: "SC1", 3: "SC2", 4: "SC3", 5: "SC4", 6: "SC5"}
+REFRIGERANT_ROW = 7
+COOLER_ATTRIBUTE_ROWS = {
+    "heat_exchange_area": 8,
+    "tube_volumn": 9,
+    "air_flow_rate": 10,
+    "total_fan_power": 11,
+    "total_fan_current": 12,
+    "air_flow": 13,
+    "defrost_power": 14,
+    "pipe_dia": 15,
+    "noise": 16,
+    "weight": 17,
+    "series": 18,
+    "comment": 19,
+    "fin_spacing": 20,
+}
+
+# 修正系数默认导入的工作簿
+DEFAULT_SC_QUANT_SHEETS = "SC1/SC2/SC3/SC4"
+
+
+def _blank_to_none(value):
+    """空字符串按空值处理，与生成SQL时的 NULL 一致"""
+    return None if value == "" else value
+
+
+def _model_name(value) -> Optional[str]:
+    """型号统一为去除首尾空白的字符串，数字单元格(如 1001 或 1001.0)与文本 '1001' 一致"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _audit_columns(now: datetime) -> dict:
+    return {"create_time": now, "update_time": now, "is_deleted": 0}
+
+
+def read_cooler_workbook(path: str) -> Tuple[List[dict], List[dict]]:
+    """
+    以只读流式模式读取冷风机工作簿
+
+    Returns:
+        (cooler 行列表, cooling_capacity 行列表)
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[workbook.sheetnames[0]]
+        rows = list(sheet.iter_rows(min_row=1, max_row=COOLER_SHEET_ROWS, values_only=True))
+    finally:
+        workbook.close()
+
+    now = datetime.now()
+    coolers, capacities = [], []
+    # 第1列为参数名，从第2列开始每列一台冷风机
+    for column in islice(zip_longest(*rows), 1, None):
+        values = [_blank_to_none(value) for value in column] + [None] * (COOLER_SHEET_ROWS - len(column))
+        model = _model_name(values[0])
+        if model is None:
+            continue
+        cooler = {name: values[row - 1] for name, row in COOLER_ATTRIBUTE_ROWS.items()}
+        cooler["model"] = model
+        cooler["fin_spacing_num"] = extract_fin_spacing_num(cooler["fin_spacing"])
+        cooler.update(_audit_columns(now))
+        coolers.append(COOLER_SYNC.with_hash(cooler))
+
+        refrigerant = values[REFRIGERANT_ROW - 1]
+        if refrigerant is None:
+            print(f"冷风机 {model} 未填写制冷剂，跳过冷量数据")
+            continue
+        for row, working_status in WORKING_STATUS_ROWS.items():
+            capacity = values[row - 1]
+            if capacity is None:
+                continue
+            capacities.append(CAPACITY_SYNC.with_hash({
+                "cooler_id": model,
+                "working_status": working_status,
+                "refrigerant": str(refrigerant),
+                "capacity": capacity,
+                "created_time": now,
+                "updated_time": now,
+                "is_deleted": 0
+            }))
+    return coolers, capacities
+
+
+def iter_sc_quant_workbook(path: str, sheet_names: Optional[List[str]] = None) -> Iterator[dict]:
+    """
+    按需加载修正系数工作簿，逐行产出 sc_quant 行
+
+    第1行为蒸发温度，第1列为温差；工作簿处理完即卸载，只有当前工作簿常驻内存
+    """
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        available = workbook.sheet_names()
+        names = [name for name in sheet_names if name in available] if sheet_names else available
+        now = datetime.now()
+        for name in names:
+            sheet = workbook.sheet_by_name(name)
+            if sheet.nrows < 2 or sheet.ncols < 2:
+                print(f"工作簿 {name} 数据不足，跳过")
+                workbook.unload_sheet(name)
+                continue
+            evaporating_temps = [_to_float(value) for value in sheet.row_values(0)]
+            for row_idx in range(1, sheet.nrows):
+                values = sheet.row_values(row_idx)
+                delta_t = _to_float(values[0])
+                if delta_t is None:
+                    continue
+                for col_idx in range(1, len(values)):
+                    evaporating_temp = evaporating_temps[col_idx]
+                    quant = _to_float(values[col_idx])
+                    if evaporating_temp is None or quant is None:
+                        continue
+                    row = {"evaporating_temp": evaporating_temp, "delta_t": delta_t, "quant": quant}
+                    row.update(_audit_columns(now))
+                    yield SC_QUANT_SYNC.with_hash(row)
+            workbook.unload_sheet(name)
+    finally:
+        workbook.release_resources()
+
+
+def list_sc_quant_sheets(path: str, sheet_names: Optional[List[str]] = None) -> List[str]:
+    """返回修正系数工作簿中待导入的工作表名称，未指定时返回全部"""
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        available = workbook.sheet_names()
+    finally:
+        workbook.release_resources()
+    return [name for name in sheet_names if name in available] if sheet_names else available
+
+
+def read_sc_quant_sheet(path: str, sheet_name: str) -> List[dict]:
+    """读取修正系数工作簿中的一个工作表，作为进程池任务"""
+    return list(iter_sc_quant_workbook(path, [sheet_name]))
+
+
+def parse_in_pool(tasks: Sequence[Tuple[Callable, tuple]], workers: int) -> Iterator[Any]:
+    """
+    在进程池中并行执行解析任务，按提交顺序逐个产出结果
+
+    调用方消费前面的结果(写入数据库)时，后面的任务仍在并行解析；
+    workers 不大于1或只有一个任务时直接在当前进程执行
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for func, args in tasks:
+            yield func(*args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, *args) for func, args in tasks]
+        for future in futures:
+            yield future.result()
+
+
+def _to_float(value) -> Optional[float]:
+    """转换为浮点数，空值或无效值返回None"""
+    if value == "" or value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def replace_table(spec: SyncSpec, rows: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  bind: Engine = engine) -> Tuple[int, int]:
+    """
+    整表替换：逻辑删除现有行后分块以多行 executemany 写入
+
+    全部在一个事务中完成并同时递增目录版本号，失败时回滚，原数据保持不变
+
+    Returns:
+        (逻辑删除行数, 写入行数)
+    """
+    table = spec.table
+    count = 0
+    with bind.begin() as connection:
+        deleted = connection.execute(
+            update(table)
+            .where(table.c.is_deleted == 0)
+            .values({"is_deleted": 1, spec.update_time_column: datetime.now()})
+        ).rowcount
+        for chunk in chunks(rows, chunk_size):
+            connection.execute(table.insert(), chunk)
+            count += len(chunk)
+        # 整表替换，运行中的服务收到后整体重新加载目录
+        record_catalog_changes(connection, [(table.name, None)])
+    return deleted, count
+
+
+def load(spec: SyncSpec, rows: Iterable[dict], chunk_size: int, replace: bool, dry_run: bool = False,
+         delete_missing: bool = False, bind: Engine = engine) -> Dict[str, float]:
+    """
+    写入一张表并输出吞吐量
+
+    replace 为 True 时逻辑删除现有行后全量写入，否则增量同步；dry_run 为 True 时只输出增量同步的变更行数；
+    delete_missing 见 catalog_sync.plan_sync。rows 需包含该表本次导入的全部数据
+    """
+    table = spec.table
+    start = time.perf_counter()
+    if replace:
+        if dry_run:
+            rows = list(rows)
+            print(f"{table.name}: 将逻辑删除现有行后写入 {len(rows)} 行")
+            return {"rows": 0, "seconds": 0.0, "rows_per_second": 0.0}
+        deleted, count = replace_table(spec, rows, chunk_size, bind)
+        summary = f"逻辑删除 {deleted} 行，写入 {count} 行"
+    else:
+        plan = sync_table(spec, rows, chunk_size, dry_run, delete_missing, bind)
+        count = 0 if dry_run else plan.changes
+        if dry_run and plan.deletes:
+            scope = "整表中导入数据没有的行" if delete_missing else "导入范围内已不存在的行"
+            print(f"!!! {table.name}: 将逻辑删除 {len(plan.deletes)} 行({scope}) !!!")
+        summary = (f"{'将' if dry_run else ''}新增 {len(plan.inserts)} 行，更新 {len(plan.updates)} 行，"
+                   f"删除 {len(plan.deletes)} 行，未变化 {plan.unchanged} 行")
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{table.name}: {summary}，耗时 {elapsed:.2f} 秒，{rate:,.0f} 行/秒")
+    return {"rows": count, "seconds": elapsed, "rows_per_second": rate}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="从 Excel 批量导入冷风机目录")
+    parser.add_argument("--coolers", nargs="+", help="冷风机工作簿(.xlsx)，可指定多个，写入 cooler 和 cooling_capacity 表")
+    parser.add_argument("--sc-quant", nargs="+", help="修正系数工作簿(.xls)，可指定多个，写入 sc_quant 表")
+    parser.add_argument("--sheets", default=DEFAULT_SC_QUANT_SHEETS, help="修正系数工作簿名称，以/分隔")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个事务写入的行数")
+    parser.add_argument("--replace", action="store_true", help="在一个事务中逻辑删除对应表的现有行后全量写入，默认按内容哈希增量导入")
+    parser.add_argument("--dry-run", action="store_true", help="只输出各表变更行数，不写入")
+    parser.add_argument("--delete-missing", action="store_true",
+                        help="逻辑删除整表中本次导入数据没有的行，需一次导入全部工作簿；默认只删除导入范围内已不存在的行")
+    parser.add_argument("--workers", type=int, help="解析进程数，默认取任务数与CPU核数的较小值，1表示不使用进程池")
+    args = parser.parse_args(argv)
+
+    if not args.coolers and not args.sc_quant:
+        parser.error("至少指定 --coolers 或 --sc-quant")
+
+    try:
+        start = time.perf_counter()
+        total = 0
+        cooler_paths = args.coolers or []
+        tasks = [(read_cooler_workbook, (path,)) for path in cooler_paths]
+        sheet_names = parse_sheet_names(args.sheets)
+        for path in args.sc_quant or []:
+            tasks.extend((read_sc_quant_sheet, (path, name)) for name in list_sc_quant_sheets(path, sheet_names))
+        workers = args.workers or min(len(tasks), os.cpu_count() or 1)
+        results = parse_in_pool(tasks, workers)
+
+        if cooler_paths:
+            coolers, capacities = [], []
+            for path in cooler_paths:
+                workbook_coolers, workbook_capacities = next(results)
+                print(f"读取 {path}: {len(workbook_coolers)} 台冷风机，{len(workbook_capacities)} 条冷量")
+                coolers.extend(workbook_coolers)
+                capacities.extend(workbook_capacities)
+            print(f"解析冷风机工作簿耗时 {time.perf_counter() - start:.2f} 秒({workers} 个进程)")
+            total += load(COOLER_SYNC, coolers, args.chunk_size, args.replace, args.dry_run,
+                          args.delete_missing)["rows"]
+            total += load(CAPACITY_SYNC, capacities, args.chunk_size, args.replace, args.dry_run,
+                          args.delete_missing)["rows"]
+        if args.sc_quant:
+            # 其余结果均为修正系数工作表，全部工作表合并后一次比对
+            rows = chain.from_iterable(results)
+            total += load(SC_QUANT_SYNC, rows, args.chunk_size, args.replace, args.dry_run,
+                          args.delete_missing)["rows"]
+        elapsed = time.perf_counter() - start
+        print(f"\n导入完成：共写入 {total} 行，耗时 {elapsed:.2f} 秒，{total / elapsed if elapsed > 0 else 0:,.0f} 行/秒")
+    except FileNotFoundError as e:
+        print(f"错误: 找不到文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
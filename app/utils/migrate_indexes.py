@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.engine import Engine
+
+from app.models.database import Base, engine
+from app.models import dao  # noqa: F401  注册模型
+from app.models.dao import CATALOG_VERSION_ROW_ID, CatalogVersion
+
+
+def migrate_columns(bind: Engine = engine) -> List[str]:
+    """
+    为已有数据库补建模型中新增的可空列，已存在的列跳过，可重复执行
+
+    Returns:
+        新建的列名列表(表名.列名)
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    quote = bind.dialect.identifier_preparer.quote
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                print(f"跳过非空列: {table.name}.{column.name}，请手动迁移")
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type} NULL"))
+            created.append(f"{table.name}.{column.name}")
+            print(f"已添加列: {table.name}.{column.name}")
+    return created
+
+
+def migrate_indexes(bind: Engine = engine) -> List[str]:
+    """
+    为已有数据库补建模型中声明的索引，已存在的索引跳过，可重复执行
+
+    Returns:
+        新建的索引名列表
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            index.create(bind=bind)
+            created.append(index.name)
+            print(f"已创建索引: {table.name}.{index.name}")
+    return created
+
+
+def seed_catalog_version(bind: Engine = engine) -> bool:
+    """
+    为建表时未写入版本号行的已有数据库补写该行，可重复执行
+
+    Returns:
+        是否写入
+    """
+    table = CatalogVersion.__table__
+    if not inspect(bind).has_table(table.name):
+        return False
+    with bind.begin() as connection:
+        if connection.execute(select(table.c.id).where(table.c.id == CATALOG_VERSION_ROW_ID)).first():
+            return False
+        connection.execute(insert(table).values(id=CATALOG_VERSION_ROW_ID, version=0, update_time=datetime.now()))
+    print("已写入目录版本号行")
+    return True
+
+
+def main():
+    try:
+        added = migrate_columns()
+        if added:
+            print(f"\n共添加 {len(added)} 个列")
+        seed_catalog_version()
+        created = migrate_indexes()
+        if created:
+            print(f"\n共创建 {len(created)} 个索引")
+        else:
+            print("索引均已存在，无需迁移")
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
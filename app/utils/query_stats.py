@@ -0,0 +1,105 @@
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config.config import Config
+from app.utils.logger import logger
+from app.utils.timing import record as record_timing
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """请求执行的SQL语句数超出预算(严格模式)"""
+
+
+class RequestQueryStats:
+    """单个请求的SQL统计"""
+
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "budget")
+
+    def __init__(self, budget: Optional[int] = None):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.budget = budget
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "slowest_ms": self.slowest * 1000,
+            "slowest_statement": self.slowest_statement,
+            "budget": self.budget
+        }
+
+
+# 当前请求的SQL统计，由中间件设置
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def begin() -> Tuple[RequestQueryStats, Token]:
+    """开始统计当前请求的SQL"""
+    stats = RequestQueryStats(Config.QUERY_BUDGET)
+    return stats, _request_stats.set(stats)
+
+
+def end(token: Token) -> None:
+    _request_stats.reset(token)
+
+
+def current() -> Optional[RequestQueryStats]:
+    """当前请求的SQL统计，不在请求内时返回None"""
+    return _request_stats.get()
+
+
+def query_budget(budget: Optional[int]):
+    """
+    路由依赖项：设置当前请求的SQL语句数预算，None 表示不限制
+
+    用法: @router.get(..., dependencies=[Depends(query_budget(4))])
+    """
+    def set_budget():
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.budget = budget
+    return set_budget
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 开始时间记在本次执行的上下文上：执行失败时不会触发 after_cursor_execute，不能用连接上的栈
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start_time", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    if elapsed * 1000 >= Config.SLOW_QUERY_THRESHOLD_MS:
+        # 批量写入时参数可能有上千行，只记录行数
+        params = f"<{len(parameters)} rows>" if executemany else repr(parameters)
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement} | params: {params}")
+
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.total += elapsed
+    if elapsed > stats.slowest:
+        stats.slowest = elapsed
+        stats.slowest_statement = statement
+    record_timing("db", elapsed)
+    if stats.budget is not None and stats.count == stats.budget + 1:
+        message = f"Query budget exceeded: {stats.count} statements > budget {stats.budget}, last: {statement}"
+        if Config.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def instrument(engine) -> None:
+    """为同步引擎(异步引擎传入 sync_engine)注册SQL统计事件"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,40 @@
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """orjson 无法直接序列化的对象：Pydantic 模型按字段顺序转为字典，其余交给 jsonable_encoder"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return jsonable_encoder(obj)
+
+
+def render_json(content: Any) -> bytes:
+    """
+    使用 orjson 序列化为JSON字节
+
+    输出为紧凑格式、非ASCII字符不转义，字段顺序与 JSONResponse 一致；
+    浮点数采用最短表示，仅极大/极小值的指数写法不同(1e16 而非 1e+16)
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def render_base_response(data_json: bytes, message: str = "success", code: int = 200) -> bytes:
+    """将已序列化的 data 拼接为 BaseResponse 结构的JSON字节"""
+    return b"".join((
+        b'{"code":', render_json(code),
+        b',"message":', render_json(message),
+        b',"data":', data_json,
+        b"}"
+    ))
+
+
+class OrjsonResponse(JSONResponse):
+    """使用 orjson 序列化的JSON响应"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
@@ -0,0 +1,69 @@
+"""
+生成冷风机目录二进制快照
+
+从数据库加载完整目录(冷风机属性、各工况冷量索引、修正系数网格、预渲染片段)及系数表，写入快照目录；
+服务配置 CATALOG_SNAPSHOT_PATH 后启动时直接从快照加载
+
+用法:
+    python -m app.utils.snapshot_catalog --output data/catalog_snapshot
+    python -m app.utils.snapshot_catalog --info data/catalog_snapshot
+"""
+import argparse
+import sys
+import time
+
+from app.config.config import Config
+from app.models.database import SessionLocal
+from app.models.repositories import CatalogVersionRepository
+from app.services.catalog_snapshot import read_manifest, read_snapshot, write_snapshot
+from app.services.cooler_catalog import CoolerCatalog
+from app.utils.coefficients import coefficient_registry
+
+
+def dump(output: str) -> dict:
+    """从数据库加载目录并写入快照，返回 manifest"""
+    if Config.COEFFICIENT_FILE:
+        coefficient_registry.load_file(Config.COEFFICIENT_FILE)
+    db = SessionLocal()
+    try:
+        # 先读版本号再读数据，与服务启动时加载目录一致
+        source_version = CatalogVersionRepository(db).get_version()
+        catalog = CoolerCatalog.load(db, clamp=Config.SC_QUANT_CLAMP, source_version=source_version)
+    finally:
+        db.close()
+    return write_snapshot(catalog, output, coefficient_registry.to_mapping())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成冷风机目录二进制快照")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--output", help="快照目录，已存在时整体替换")
+    group.add_argument("--info", help="输出已有快照的信息并校验可读取")
+    args = parser.parse_args(argv)
+
+    try:
+        start = time.perf_counter()
+        if args.output:
+            manifest = dump(args.output)
+            print(f"快照已写入 {args.output}: {manifest['size']} 台冷风机，{len(manifest['partitions'])} 个冷量分区，"
+                  f"{manifest['sc_quant']['size']} 个修正系数，目录版本 {manifest['source_version']}，"
+                  f"耗时 {time.perf_counter() - start:.2f} 秒")
+        else:
+            manifest = read_manifest(args.info)
+            catalog, _ = read_snapshot(args.info)
+            print(f"快照 {args.info}: 格式 {manifest['format']}，创建于 {manifest['created_time']}，"
+                  f"目录版本 {manifest['source_version']}，{catalog.size} 台冷风机，{len(catalog.partitions)} 个冷量分区，"
+                  f"{catalog.sc_quant_grid.size} 个修正系数，加载耗时 {(time.perf_counter() - start) * 1000:.1f} 毫秒")
+    except FileNotFoundError as e:
+        print(f"错误: 找不到文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
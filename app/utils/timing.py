@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 当前请求的阶段耗时(秒)，由中间件设置；字典在请求内共享，线程池和子任务中的记录同样可见
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def begin() -> Tuple[Dict[str, float], Token]:
+    """开始记录当前请求的阶段耗时"""
+    timings: Dict[str, float] = {}
+    return timings, _request_timings.set(timings)
+
+
+def end(token: Token) -> None:
+    """结束记录"""
+    _request_timings.reset(token)
+
+
+def record(name: str, seconds: float) -> None:
+    """累加阶段耗时，未在请求内时忽略"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """记录代码块耗时"""
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """格式化为 Server-Timing 响应头，耗时单位毫秒"""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings.items())
+
+
+class TimingStats:
+    """按路由和阶段汇总耗时，百分位数基于最近 window 个样本"""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        # {路由: {阶段: [次数, 总耗时, 最大耗时, 最近样本]}}
+        self._stats: Dict[str, Dict[str, list]] = {}
+
+    def add(self, route: str, timings: Dict[str, float]) -> None:
+        with self._lock:
+            stages = self._stats.setdefault(route, {})
+            for name, seconds in timings.items():
+                entry = stages.get(name)
+                if entry is None:
+                    entry = stages[name] = [0, 0.0, 0.0, deque(maxlen=self.window)]
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+                entry[3].append(seconds)
+
+    @staticmethod
+    def _percentile(samples: List[float], q: float) -> float:
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """各路由各阶段的次数、平均、最大及 p50/p95/p99 耗时(毫秒)"""
+        with self._lock:
+            copied = {
+                route: {name: (count, total, maximum, sorted(samples)) for name, (count, total, maximum, samples) in stages.items()}
+                for route, stages in self._stats.items()
+            }
+        return {
+            route: {
+                name: {
+                    "count": count,
+                    "mean_ms": total / count * 1000,
+                    "max_ms": maximum * 1000,
+                    "p50_ms": self._percentile(samples, 50) * 1000,
+                    "p95_ms": self._percentile(samples, 95) * 1000,
+                    "p99_ms": self._percentile(samples, 99) * 1000
+                }
+                for name, (count, total, maximum, samples) in stages.items()
+            }
+            for route, stages in copied.items()
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# 进程内阶段耗时汇总
+timing_stats = TimingStats()
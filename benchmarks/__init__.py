@@ -0,0 +1,6 @@
+"""
+选型链路基准测试
+
+- datagen: 生成 1k ~ 1M 行规模的合成 cooler/cooling_capacity/sc_quant 数据到本地 SQLite 文件
+- bench: 微基准测试，结果输出为 JSON，可与其他提交的结果对比
+"""
@@ -0,0 +1,228 @@
+"""
+选型链路微基准测试
+
+覆盖 CoolerService.filter_cooler 各执行模式、仓库查询、to_pydantic 和系数查询，
+结果写入 JSON 文件，可通过 --baseline 与其他提交的结果对比
+
+用法:
+    python -m benchmarks.datagen --rows 10k
+    python -m benchmarks.bench --db benchmarks/data/catalog_10k.db --output results.json
+    python -m benchmarks.bench --db benchmarks/data/catalog_10k.db --baseline results.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.env import configure
+
+# 查询参数范围
+EVAPORATING_TEMPS = (-40, -35, -30, -25, -20, -15, -10, -5, 0, 5)
+DELTA_TS = (5, 6, 7, 8, 9, 10)
+REQUIRED_CAPS = (2, 5, 10, 20, 40, 80)
+# repo.coolers_by_models 一次查询的型号数量，与返回的候选数量一致
+TOP_K_SAMPLE = 5
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩百分位数：第 ceil(q/100*n) 个值"""
+    # 先乘后除，q*n/100 为整数时不因 q/100 的舍入误差多进一位(如 99.9 分位、n=1000)
+    rank = math.ceil(q * len(sorted_values) / 100)
+    return sorted_values[min(len(sorted_values) - 1, max(0, rank - 1))]
+
+
+def measure(func: Callable[[int], object], repeat: int, warmup: int) -> Dict[str, float]:
+    """
+    多次调用 func(i) 并统计耗时(毫秒)
+
+    Args:
+        func: 被测函数，参数为调用序号，便于轮换输入
+        repeat: 计时次数
+        warmup: 预热次数
+    """
+    for i in range(warmup):
+        func(i)
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        func(i)
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+    timings.sort()
+    return {
+        "n": repeat,
+        "mean_ms": statistics.fmean(timings),
+        "median_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 95),
+        "min_ms": timings[0],
+        "max_ms": timings[-1],
+    }
+
+
+def make_filters(count: int, seed: int = 0) -> list:
+    """生成可复现的选型参数"""
+    from app.schemas.product import CoolerFilter
+    from benchmarks.datagen import REFRIGERANT_WEIGHTS
+
+    rnd = random.Random(seed)
+    refrigerants = [refrigerant for refrigerant, _ in REFRIGERANT_WEIGHTS]
+    filters = []
+    for _ in range(count):
+        evaporating_temp = rnd.choice(EVAPORATING_TEMPS)
+        filters.append(CoolerFilter(
+            evaporating_temp=evaporating_temp,
+            repo_temp=evaporating_temp + rnd.choice(DELTA_TS),
+            required_cooling_cap=rnd.choice(REQUIRED_CAPS),
+            refrigerant=rnd.choice(refrigerants),
+            refrigerant_supply_type=rnd.choice(("直膨", "泵供液")),
+            fan_distance=rnd.choice((0, 0, 4.5, 6.0))
+        ))
+    return filters
+
+
+def git_commit() -> Optional[str]:
+    """当前提交，非 git 目录时返回None"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat: int, warmup: int, only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """运行全部基准测试，返回 {名称: 统计}"""
+    import numpy as np
+
+    from app.config.config import Config
+    from app.models.database import SessionLocal
+    from app.models.repositories import CoolerRepository, CoolingCapacityRepository, SCQuantRepository
+    from app.services import cooler_catalog, sc_quant_grid
+    from app.services.cooler_service import CoolerService
+    from app.utils.coefficients import coefficient_registry
+    from app.utils.enums import SCLevel, Refrigerant, RefrigerantSupplyType
+
+    db = SessionLocal()
+    filters = make_filters(256)
+    cooler_repo = CoolerRepository(db)
+    cap_repo = CoolingCapacityRepository(db)
+    quant_repo = SCQuantRepository(db)
+    sample_coolers = cooler_repo.search(limit=TOP_K_SAMPLE)
+    sample_models = [cooler.model for cooler in sample_coolers]
+    refrigerant = cap_repo.search(limit=1)[0].refrigerant
+
+    def filter_mode(pushdown: bool = False):
+        def bench(i):
+            Config.FILTER_DB_PUSHDOWN = pushdown
+            try:
+                CoolerService.filter_cooler(db, filters[i % len(filters)])
+            finally:
+                Config.FILTER_DB_PUSHDOWN = False
+        return bench
+
+    cases: Dict[str, Callable[[int], object]] = {
+        "enum.sc_level_get_q": lambda i: SCLevel.get_q(EVAPORATING_TEMPS[i % len(EVAPORATING_TEMPS)], "直膨"),
+        "enum.refrigerant_get_q": lambda i: Refrigerant.get_q("R404A", "泵供液"),
+        "enum.get_level_by_value": lambda i: SCLevel.get_level_by_value(EVAPORATING_TEMPS[i % len(EVAPORATING_TEMPS)]),
+        "coefficients.sc_level_q": lambda i: coefficient_registry.sc_level_q(SCLevel.SC3, RefrigerantSupplyType.DIRECT),
+        "service.get_target_caps_256": lambda i: CoolerService.get_target_caps(filters, np.full(len(filters), np.nan)),
+        "repo.sc_quant_exact": lambda i: quant_repo.get_by_evaporating_temp_and_delta_t(-30, 5),
+        "repo.capacities_by_status_refrigerant": lambda i: cap_repo.get_by_working_status_and_refrigerant(
+            f"SC{i % 5 + 1}", refrigerant
+        ),
+        "repo.coolers_by_models": lambda i: cooler_repo.get_by_cooler_ids(sample_models),
+        "repo.nearest_coolers": lambda i: cap_repo.get_nearest_coolers(f"SC{i % 5 + 1}", refrigerant, 20, 5),
+        "dao.to_pydantic": lambda i: [cooler.to_pydantic(10.0, "SC1") for cooler in sample_coolers],
+        "filter_cooler.db": filter_mode(),
+        "filter_cooler.db_pushdown": filter_mode(pushdown=True),
+    }
+
+    results = {}
+
+    def selected(name):
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    def run_case(name, func):
+        if not selected(name):
+            return
+        results[name] = measure(func, repeat, warmup)
+        print(f"{name:45s} median {results[name]['median_ms']:9.3f} ms  p95 {results[name]['p95_ms']:9.3f} ms")
+
+    for name, func in cases.items():
+        run_case(name, func)
+
+    # 依次加载修正系数网格和内存目录，测量对应模式
+    sc_quant_grid.load_sc_quant_grid(db, clamp=Config.SC_QUANT_CLAMP)
+    run_case("filter_cooler.db_grid", filter_mode())
+    run_case("filter_cooler.db_pushdown_grid", filter_mode(pushdown=True))
+    if selected("filter_cooler.catalog") or selected("filter_cooler_batch.catalog_256"):
+        cooler_catalog.load_catalog(db)
+        run_case("filter_cooler.catalog", filter_mode())
+        run_case("filter_cooler_batch.catalog_256", lambda i: CoolerService.filter_cooler_batch(db, filters))
+        cooler_catalog._catalog = None
+    sc_quant_grid._grid = None
+    db.close()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    """打印与基线结果的中位数对比"""
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'change':>9s}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:45s} {'-':>12s} {current['median_ms']:12.3f} {'new':>9s}")
+            continue
+        before = baseline[name]["median_ms"]
+        change = (current["median_ms"] - before) / before * 100 if before else 0.0
+        print(f"{name:45s} {before:12.3f} {current['median_ms']:12.3f} {change:+8.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选型链路微基准测试")
+    parser.add_argument("--db", required=True, help="datagen 生成的 SQLite 文件")
+    parser.add_argument("--output", help="结果 JSON 文件")
+    parser.add_argument("--baseline", help="用于对比的历史结果 JSON 文件")
+    parser.add_argument("--repeat", type=int, default=50, help="每项计时次数")
+    parser.add_argument("--warmup", type=int, default=5, help="每项预热次数")
+    parser.add_argument("--only", nargs="*", help="只运行名称以给定前缀开头的基准")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"数据文件不存在: {args.db}，请先运行 python -m benchmarks.datagen")
+    # 基准测试关注计算路径，关闭结果缓存
+    configure(args.db, FILTER_CACHE_ENABLED="false", CATALOG_ENABLED="false", FILTER_DB_PUSHDOWN="false")
+
+    from app.models.database import SessionLocal
+    from app.models.dao import CoolingCapacity
+
+    db = SessionLocal()
+    rows = db.query(CoolingCapacity).count()
+    db.close()
+
+    results = run(args.repeat, args.warmup, args.only)
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dataset": os.path.basename(args.db),
+        "cooling_capacity_rows": rows,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
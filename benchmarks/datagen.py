@@ -0,0 +1,201 @@
+"""
+合成选型数据生成器
+
+按 cooling_capacity 行数生成数据集，每台冷风机对应一种制冷剂和 SC1~SC5 五个工况的冷量，
+冷量按工况等级系数递减；sc_quant 使用 app/sql/sc_quant_insert.sql 中的真实系数表
+
+用法:
+    python -m benchmarks.datagen --rows 10k
+    python -m benchmarks.datagen --rows 1k 10k 100k 1M --output-dir benchmarks/data
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from benchmarks.env import DATA_DIR, configure
+
+# 数据规模 (cooling_capacity 行数)
+SIZES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1M": 1_000_000,
+}
+
+# 每台冷风机的工况
+WORKING_STATUSES = ("SC1", "SC2", "SC3", "SC4", "SC5")
+# 制冷剂及其占比
+REFRIGERANT_WEIGHTS = (("R404A", 0.45), ("R22", 0.25), ("R507C", 0.1), ("R407C", 0.08), ("R410A", 0.07), ("R23", 0.05))
+# 系列及片距(mm)
+SERIES_FIN_SPACINGS = {
+    "DD": (4.0, 4.5),
+    "DL": (4.5, 6.0),
+    "DJ": (6.0, 8.0),
+    "DF": (8.0, 10.0),
+}
+# 插入批大小
+CHUNK_SIZE = 10_000
+
+SC_QUANT_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "sql", "sc_quant_insert.sql")
+
+
+def parse_size(value: str) -> int:
+    """解析规模参数，支持 1k/10k/100k/1M 或整数"""
+    if value in SIZES:
+        return SIZES[value]
+    match = re.fullmatch(r"(\d+)([kKmM]?)", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"无效的数据规模: {value}")
+    number, unit = int(match.group(1)), match.group(2).lower()
+    return number * {"": 1, "k": 1_000, "m": 1_000_000}[unit]
+
+
+def size_label(rows: int) -> str:
+    """规模标签，用于文件名"""
+    for label, size in SIZES.items():
+        if size == rows:
+            return label
+    return str(rows)
+
+
+def load_sc_quants() -> List[Tuple[float, float, float]]:
+    """读取真实工况修正系数 (蒸发温度, 温差, 修正系数)"""
+    pattern = re.compile(r"VALUES \(([-\d.]+), ([-\d.]+), ([-\d.]+),")
+    quants = []
+    with open(SC_QUANT_SQL, "r", encoding="utf-8") as f:
+        for line in f:
+            match = pattern.search(line)
+            if match:
+                quants.append(tuple(float(value) for value in match.groups()))
+    return quants
+
+
+def generate_coolers(rows: int, seed: int = 0) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    逐台生成冷风机及其冷量记录
+
+    Args:
+        rows: cooling_capacity 目标行数，冷风机数量为 rows / 5
+        seed: 随机种子，相同种子生成相同数据
+    """
+    from app.utils.coefficients import DEFAULT_SC_LEVEL_Q
+
+    rnd = random.Random(seed)
+    refrigerants = [refrigerant for refrigerant, _ in REFRIGERANT_WEIGHTS]
+    weights = [weight for _, weight in REFRIGERANT_WEIGHTS]
+    series_names = list(SERIES_FIN_SPACINGS)
+    now = datetime.now()
+    for i in range((rows + len(WORKING_STATUSES) - 1) // len(WORKING_STATUSES)):
+        series = rnd.choice(series_names)
+        fin_spacing_num = rnd.choice(SERIES_FIN_SPACINGS[series])
+        # 换热面积对数均匀分布，冷量与换热面积近似成正比
+        area = round(10 ** rnd.uniform(1, 2.7), 1)
+        fan_count = max(1, min(6, int(area // 60) + 1))
+        model = f"{series}{fan_count}-{area:g}/{fin_spacing_num:g}-{i}"
+        refrigerant = rnd.choices(refrigerants, weights)[0]
+        base_capacity = area * rnd.uniform(0.08, 0.12)
+        cooler = {
+            "heat_exchange_area": area,
+            "tube_volumn": round(area * rnd.uniform(0.15, 0.25), 1),
+            "air_flow_rate": round(area * rnd.uniform(35, 45)),
+            "total_fan_power": f"{fan_count}×{rnd.choice((0.25, 0.37, 0.55, 0.75))}",
+            "total_fan_current": f"{fan_count}×{rnd.choice((0.6, 0.9, 1.3, 1.8))}",
+            "air_flow": str(rnd.choice((8, 10, 12, 15, 18, 22))),
+            "defrost_power": round(area * rnd.uniform(0.05, 0.09), 2),
+            "pipe_dia": rnd.choice(("12.7/22", "16/28", "19/35", "22/42")),
+            "noise": round(rnd.uniform(45, 70), 1),
+            "weight": round(area * rnd.uniform(0.5, 0.8), 1),
+            "model": model,
+            "fin_spacing": f"C{int(fin_spacing_num * 10):02d}={fin_spacing_num:g}mm",
+            "fin_spacing_num": fin_spacing_num,
+            "series": series,
+            "create_time": now,
+            "update_time": now,
+            "is_deleted": 0,
+            "comment": None,
+        }
+        capacities = [
+            {
+                "cooler_id": model,
+                "working_status": working_status,
+                "refrigerant": refrigerant,
+                "capacity": round(base_capacity * DEFAULT_SC_LEVEL_Q[working_status]["直膨"] * rnd.uniform(0.97, 1.03), 2),
+                "created_time": now,
+                "updated_time": now,
+                "is_deleted": 0,
+            }
+            for working_status in WORKING_STATUSES
+        ]
+        yield cooler, capacities
+
+
+def generate(path: str, rows: int, seed: int = 0) -> Dict[str, int]:
+    """
+    生成数据集到 SQLite 文件，已存在的文件会被覆盖
+
+    Returns:
+        各表行数
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    configure(path)
+
+    from sqlalchemy import create_engine
+    from app.models.database import Base
+    from app.models.dao import Cooler, CoolingCapacity, SCQuant
+
+    engine = create_engine(f"sqlite:///{os.path.abspath(path)}")
+    Base.metadata.create_all(bind=engine)
+    counts = {"cooler": 0, "cooling_capacity": 0, "sc_quant": 0}
+    now = datetime.now()
+    with engine.begin() as conn:
+        quants = [
+            {"evaporating_temp": temp, "delta_t": delta_t, "quant": quant,
+             "create_time": now, "update_time": now, "is_deleted": 0}
+            for temp, delta_t, quant in load_sc_quants()
+        ]
+        conn.execute(SCQuant.__table__.insert(), quants)
+        counts["sc_quant"] = len(quants)
+
+        cooler_chunk, capacity_chunk = [], []
+        for cooler, capacities in generate_coolers(rows, seed):
+            cooler_chunk.append(cooler)
+            capacity_chunk.extend(capacities)
+            if len(capacity_chunk) >= CHUNK_SIZE:
+                conn.execute(Cooler.__table__.insert(), cooler_chunk)
+                conn.execute(CoolingCapacity.__table__.insert(), capacity_chunk)
+                counts["cooler"] += len(cooler_chunk)
+                counts["cooling_capacity"] += len(capacity_chunk)
+                cooler_chunk, capacity_chunk = [], []
+        if cooler_chunk:
+            conn.execute(Cooler.__table__.insert(), cooler_chunk)
+            conn.execute(CoolingCapacity.__table__.insert(), capacity_chunk)
+            counts["cooler"] += len(cooler_chunk)
+            counts["cooling_capacity"] += len(capacity_chunk)
+    engine.dispose()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成选型数据到本地 SQLite 文件")
+    parser.add_argument("--rows", nargs="+", type=parse_size, default=[SIZES["10k"]],
+                        help="cooling_capacity 行数，支持 1k/10k/100k/1M")
+    parser.add_argument("--output-dir", default=DATA_DIR, help="输出目录")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    for rows in args.rows:
+        path = os.path.join(args.output_dir, f"catalog_{size_label(rows)}.db")
+        start = time.perf_counter()
+        counts = generate(path, rows, args.seed)
+        print(f"{path}: {counts} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
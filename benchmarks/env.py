@@ -0,0 +1,21 @@
+import os
+
+# 基准测试数据默认目录
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def configure(db_path: str, **overrides: str) -> None:
+    """
+    在导入 app 之前设置环境变量，使应用连接到本地 SQLite 文件
+
+    Args:
+        db_path: SQLite 文件路径
+        overrides: 其他需要覆盖的配置项
+    """
+    # 必填配置项给出占位值，基准测试不会用到
+    for key in ("DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME", "SECRET_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    for key, value in overrides.items():
+        os.environ[key] = value
@@ -0,0 +1,367 @@
+"""
+选型接口压测工具
+
+以固定并发(闭环)或目标 RPS(开环)请求 /api/v1/products/cooler/filter 的 GET 和 POST，
+报告吞吐量、延迟百分位数、错误率以及服务端数据库连接池等待时间；
+指定 SLO 或基线结果时，超出阈值以非零状态码退出
+
+用法:
+    # 启动本地服务(SQLite 数据来自 benchmarks.datagen)并以 32 并发压测 30 秒
+    python -m benchmarks.loadgen --serve-db benchmarks/data/catalog_10k.db --concurrency 32 --duration 30
+    # 对已启动的服务以 200 RPS 压测，要求 p99 不超过 100ms
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --rps 200 --slo p99=100 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench import git_commit, percentile
+from benchmarks.env import configure
+
+FILTER_PATH = "/api/v1/products/cooler/filter"
+STATS_PATH = "/api/v1/products/cooler/stats"
+DEFAULT_PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadgen_params.json")
+PERCENTILES = (50, 90, 95, 99)
+
+
+class ParamSampler:
+    """
+    按分布文件生成请求参数
+
+    分布写法: {"choice": [...], "weights": [...]}、{"uniform": [下限, 上限]}、
+    {"lognormal": [mu, sigma]} 或常量；repo_temp 由 evaporating_temp + delta_t 得出
+    """
+
+    def __init__(self, spec: dict, seed: int = 0):
+        self.methods = list(spec.get("methods", {"GET": 1}).items())
+        self.params = spec["params"]
+        self.rnd = random.Random(seed)
+
+    def _sample(self, dist):
+        if not isinstance(dist, dict):
+            return dist
+        if "choice" in dist:
+            return self.rnd.choices(dist["choice"], dist.get("weights"))[0]
+        if "uniform" in dist:
+            return round(self.rnd.uniform(*dist["uniform"]), 2)
+        if "lognormal" in dist:
+            return round(self.rnd.lognormvariate(*dist["lognormal"]), 2)
+        raise ValueError(f"不支持的分布: {dist}")
+
+    def sample(self) -> Tuple[str, dict]:
+        """返回 (请求方法, 选型参数)"""
+        method = self.rnd.choices([m for m, _ in self.methods], [w for _, w in self.methods])[0]
+        values = {name: self._sample(dist) for name, dist in self.params.items()}
+        delta_t = values.pop("delta_t", None)
+        if delta_t is not None:
+            values["repo_temp"] = values["evaporating_temp"] + delta_t
+        return method, values
+
+
+class Recorder:
+    """按请求方法记录延迟和错误"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, method: str, latency: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(method, []).append(latency)
+        key = str(status) if status is not None else "connection_error"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[method] = self.errors.get(method, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        """汇总各方法及整体的吞吐量、延迟百分位数(毫秒)和错误率"""
+        def describe(latencies: List[float], errors: int) -> dict:
+            latencies = sorted(latencies)
+            result = {
+                "requests": len(latencies),
+                "errors": errors,
+                "error_rate": errors / len(latencies) if latencies else 0.0,
+                "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+            }
+            if latencies:
+                result.update({f"p{q}_ms": percentile(latencies, q) * 1000 for q in PERCENTILES})
+                result["mean_ms"] = sum(latencies) / len(latencies) * 1000
+                result["max_ms"] = latencies[-1] * 1000
+            return result
+
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        report = {"total": describe(all_latencies, sum(self.errors.values())), "statuses": self.statuses}
+        for method, latencies in self.latencies.items():
+            report[method] = describe(latencies, self.errors.get(method, 0))
+        return report
+
+
+async def send(client: httpx.AsyncClient, method: str, params: dict) -> Optional[int]:
+    """发送一次选型请求，返回状态码，连接失败返回None"""
+    try:
+        if method == "GET":
+            response = await client.get(FILTER_PATH, params=params)
+        else:
+            response = await client.post(FILTER_PATH, json=params)
+        return response.status_code
+    except httpx.HTTPError:
+        return None
+
+
+async def run_closed_loop(client, sampler: ParamSampler, recorder: Recorder, concurrency: int,
+                          duration: float, total: Optional[int]) -> None:
+    """固定并发：每个工作协程收到响应后立即发送下一个请求"""
+    deadline = time.perf_counter() + duration
+    remaining = [total] if total else None
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            method, params = sampler.sample()
+            start = time.perf_counter()
+            status = await send(client, method, params)
+            recorder.record(method, time.perf_counter() - start, status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_open_loop(client, sampler: ParamSampler, recorder: Recorder, rps: float,
+                        duration: float, total: Optional[int], max_in_flight: int) -> None:
+    """
+    目标 RPS：按计划时间发出请求，不等待前一个响应
+
+    延迟从计划发送时间开始计算，服务端变慢导致的排队计入延迟，避免协调遗漏
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+    start = time.perf_counter()
+    count = int(rps * duration) if not total else total
+    tasks = []
+
+    async def one(method, params, scheduled):
+        async with semaphore:
+            status = await send(client, method, params)
+        recorder.record(method, time.perf_counter() - scheduled, status)
+
+    for i in range(count):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        method, params = sampler.sample()
+        tasks.append(asyncio.create_task(one(method, params, scheduled)))
+    await asyncio.gather(*tasks)
+
+
+async def fetch_pool_stats(client: httpx.AsyncClient) -> Optional[dict]:
+    """读取服务端连接池统计，接口不可用时返回None"""
+    try:
+        response = await client.get(STATS_PATH)
+        return response.json()["data"]["db_pool"]
+    except (httpx.HTTPError, KeyError, ValueError):
+        return None
+
+
+def pool_wait_delta(before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    """压测期间的连接池等待统计(单个服务进程)"""
+    if not before or not after:
+        return None
+    delta = {}
+    for name, stats in after.items():
+        if "wait_count" not in stats or name not in before:
+            continue
+        count = stats["wait_count"] - before[name]["wait_count"]
+        total_ms = stats["wait_total_ms"] - before[name]["wait_total_ms"]
+        delta[name] = {
+            "wait_count": count,
+            "wait_total_ms": total_ms,
+            "wait_mean_ms": total_ms / count if count else 0.0,
+            "wait_max_ms": stats["wait_max_ms"],
+            "size": stats.get("size"),
+            "overflow": stats.get("overflow"),
+        }
+    return delta
+
+
+async def run_load(args, spec: dict) -> dict:
+    """执行压测并生成报告"""
+    sampler = ParamSampler(spec, args.seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=max(args.concurrency, 1), max_keepalive_connections=max(args.concurrency, 1))
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        for _ in range(args.warmup):
+            method, params = sampler.sample()
+            await send(client, method, params)
+        pool_before = await fetch_pool_stats(client)
+        start = time.perf_counter()
+        if args.rps:
+            await run_open_loop(client, sampler, recorder, args.rps, args.duration, args.requests, args.concurrency)
+        else:
+            await run_closed_loop(client, sampler, recorder, args.concurrency, args.duration, args.requests)
+        elapsed = time.perf_counter() - start
+        pool_after = await fetch_pool_stats(client)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "url": args.url,
+        "mode": "open_loop" if args.rps else "closed_loop",
+        "concurrency": args.concurrency,
+        "target_rps": args.rps,
+        "duration_s": elapsed,
+        "results": recorder.summary(elapsed),
+        "db_pool": pool_wait_delta(pool_before, pool_after),
+    }
+
+
+def parse_slo(values: List[str]) -> Dict[str, float]:
+    """解析 SLO 参数，如 p95=50 p99=200 (毫秒)"""
+    slo = {}
+    for value in values or []:
+        name, _, limit = value.partition("=")
+        if not name.startswith("p") or not limit:
+            raise argparse.ArgumentTypeError(f"无效的SLO: {value}，格式如 p99=200")
+        slo[f"{name}_ms"] = float(limit)
+    return slo
+
+
+def check(report: dict, slo: Dict[str, float], max_error_rate: Optional[float],
+          baseline: Optional[dict], max_regression: float) -> List[str]:
+    """检查 SLO、错误率和相对基线的退化，返回违规描述"""
+    total = report["results"]["total"]
+    violations = []
+    for name, limit in slo.items():
+        if total.get(name, float("inf")) > limit:
+            violations.append(f"{name} {total.get(name, float('nan')):.2f} > SLO {limit:.2f}")
+    if max_error_rate is not None and total["error_rate"] > max_error_rate:
+        violations.append(f"error_rate {total['error_rate']:.4f} > {max_error_rate:.4f}")
+    if baseline:
+        base_total = baseline["results"]["total"]
+        for q in PERCENTILES:
+            name = f"p{q}_ms"
+            if name in base_total and name in total and total[name] > base_total[name] * (1 + max_regression):
+                violations.append(
+                    f"{name} {total[name]:.2f} regressed more than {max_regression:.0%} from baseline {base_total[name]:.2f}"
+                )
+    return violations
+
+
+def print_report(report: dict) -> None:
+    results = report["results"]
+    print(f"\n{'method':8s} {'requests':>9s} {'rps':>9s} {'err%':>7s} " + " ".join(f"{f'p{q}(ms)':>9s}" for q in PERCENTILES))
+    for name, stats in results.items():
+        if name == "statuses" or not stats.get("requests"):
+            continue
+        print(f"{name:8s} {stats['requests']:9d} {stats['throughput_rps']:9.1f} {stats['error_rate'] * 100:7.2f} "
+              + " ".join(f"{stats[f'p{q}_ms']:9.2f}" for q in PERCENTILES))
+    print(f"status codes: {results['statuses']}")
+    for name, stats in (report.get("db_pool") or {}).items():
+        print(f"db pool ({name}): {stats['wait_count']} checkouts, wait total {stats['wait_total_ms']:.1f} ms, "
+              f"mean {stats['wait_mean_ms']:.3f} ms, max {stats['wait_max_ms']:.1f} ms")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(db_path: str, workers: int, extra_env: Dict[str, str]) -> Iterator[str]:
+    """以 SQLite 数据文件启动本地 uvicorn 服务，返回服务地址"""
+    configure(db_path, **extra_env)
+    port = free_port()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=root,
+        env=os.environ.copy()
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"服务启动失败，退出码 {process.returncode}")
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("等待服务启动超时")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选型接口压测")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="已启动服务的地址，如 http://127.0.0.1:8000")
+    target.add_argument("--serve-db", help="以该 SQLite 数据文件在本地启动服务")
+    parser.add_argument("--workers", type=int, default=1, help="本地服务的 uvicorn 进程数")
+    parser.add_argument("--env", nargs="*", default=[], help="本地服务的额外配置，如 CATALOG_ENABLED=true")
+    parser.add_argument("--params", default=DEFAULT_PARAMS_FILE, help="请求参数分布文件")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发数；指定 --rps 时为最大在途请求数")
+    parser.add_argument("--rps", type=float, help="目标每秒请求数(开环)，不指定时为固定并发(闭环)")
+    parser.add_argument("--duration", type=float, default=10, help="压测时长(秒)")
+    parser.add_argument("--requests", type=int, help="请求总数，优先于时长")
+    parser.add_argument("--warmup", type=int, default=20, help="预热请求数")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求超时(秒)")
+    parser.add_argument("--seed", type=int, default=0, help="参数随机种子")
+    parser.add_argument("--slo", nargs="*", help="延迟SLO(毫秒)，如 p95=50 p99=200")
+    parser.add_argument("--max-error-rate", type=float, help="允许的最大错误率")
+    parser.add_argument("--baseline", help="基线报告，延迟百分位数退化超过 --max-regression 时失败")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="允许的相对退化比例")
+    parser.add_argument("--output", help="报告 JSON 文件")
+    args = parser.parse_args(argv)
+
+    slo = parse_slo(args.slo)
+    with open(args.params, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.serve_db:
+        extra_env = dict(item.split("=", 1) for item in args.env)
+        with serve(args.serve_db, args.workers, extra_env) as url:
+            args.url = url
+            report = asyncio.run(run_load(args, spec))
+    else:
+        report = asyncio.run(run_load(args, spec))
+
+    print_report(report)
+    violations = check(report, slo, args.max_error_rate, baseline, args.max_regression)
+    report["violations"] = violations
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
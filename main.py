@@ -1,11 +1,23 @@
+import time
+
 import uvicorn as uvicorn
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import HTTPException, RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from app.api import api_router
 from app.config.config import Config
+from app.models.database import SessionLocal, get_pool_stats
+from app.services.catalog_poller import catalog_poller
+from app.services.catalog_snapshot import load_catalog_snapshot
+from app.services.cooler_catalog import get_catalog, load_catalog
+from app.services.cooler_service import filter_cache
+from app.services.sc_quant_grid import load_sc_quant_grid
+from app.utils.coefficients import coefficient_registry
 from app.utils.logger import logger
+from app.utils import metrics, query_stats
+from app.utils.timing import begin as begin_timing, end as end_timing, format_server_timing, timing_stats
 from app.utils.error_handlers import (
     http_exception_handler,
     request_validation_exception_handler,
@@ -47,6 +59,103 @@ async def log_requests(request, call_next):
     
     return response
 
+
+@app.middleware("http")
+async def server_timing(request, call_next):
+    """记录各阶段耗时，写入 Server-Timing 响应头并在进程内汇总"""
+    if not Config.SERVER_TIMING_ENABLED:
+        return await call_next(request)
+
+    timings, token = begin_timing()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        end_timing(token)
+    timings["total"] = time.perf_counter() - start
+
+    response.headers["Server-Timing"] = format_server_timing(timings)
+    # 按请求方法和路由汇总
+    timing_stats.add(f"{request.method} {metrics.route_label(request)}", timings)
+    return response
+
+
+def _after_body(response, callback) -> None:
+    """响应体发送完毕(或中断)后调用 callback；流式响应的耗时和SQL在发送响应体时产生"""
+    body_iterator = response.body_iterator
+
+    async def body_with_callback():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            callback()
+
+    response.body_iterator = body_with_callback()
+
+
+@app.middleware("http")
+async def collect_metrics(request, call_next):
+    """
+    记录请求数、延迟和在途请求数，每个路由执行的SQL语句数由 track_queries 记录
+
+    延迟计至响应体发送完毕，流式响应(如 /cooler/export)包含整个响应体的生成时间
+    """
+    if not Config.METRICS_ENABLED:
+        return await call_next(request)
+
+    method = request.method
+    metrics.http_requests_in_progress.inc(method=method)
+    start = time.perf_counter()
+
+    def record(status: int) -> None:
+        elapsed = time.perf_counter() - start
+        metrics.http_requests_in_progress.dec(method=method)
+        route = metrics.route_label(request)
+        metrics.http_requests_total.inc(method=method, route=route, status=str(status))
+        metrics.http_request_duration_seconds.observe(elapsed, method=method, route=route)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        record(500)
+        raise
+    _after_body(response, lambda: record(response.status_code))
+    return response
+
+
+def _record_queries(request, stats: query_stats.RequestQueryStats) -> None:
+    """输出请求的SQL统计并计入指标"""
+    if stats.count:
+        logger.debug(
+            f"{request.method} {request.url.path}: {stats.count} queries, {stats.total * 1000:.1f} ms, "
+            f"slowest {stats.slowest * 1000:.1f} ms: {stats.slowest_statement}"
+        )
+    if Config.METRICS_ENABLED:
+        route = metrics.route_label(request)
+        metrics.db_queries_total.inc(stats.count, method=request.method, route=route)
+        metrics.db_query_seconds_total.inc(stats.total, method=request.method, route=route)
+
+
+@app.middleware("http")
+async def track_queries(request, call_next):
+    """
+    统计每个请求执行的SQL语句数、总耗时和最慢语句
+
+    流式响应(如 /cooler/export)的SQL在发送响应体时执行，统计在响应体发送完毕后输出
+    """
+    stats, token = query_stats.begin()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _record_queries(request, stats)
+        raise
+    finally:
+        query_stats.end(token)
+
+    _after_body(response, lambda: _record_queries(request, stats))
+    return response
+
 # 注册API路由
 app.include_router(api_router)
 
@@ -66,6 +175,49 @@ def health_check():
         "version": Config.APP_VERSION
     }
 
+# 连接池和缓存指标在采集时刷新
+db_pool_size = metrics.registry.gauge("db_pool_size", "Configured connection pool size", ("engine",))
+db_pool_checked_out = metrics.registry.gauge("db_pool_checked_out", "Connections currently checked out", ("engine",))
+db_pool_overflow = metrics.registry.gauge("db_pool_overflow", "Overflow connections currently open", ("engine",))
+db_pool_checkouts_total = metrics.registry.counter("db_pool_checkouts_total", "Connection checkouts", ("engine",))
+db_pool_wait_seconds_total = metrics.registry.counter(
+    "db_pool_wait_seconds_total", "Total time spent acquiring connections", ("engine",)
+)
+db_pool_wait_max_seconds = metrics.registry.gauge("db_pool_wait_max_seconds", "Longest connection acquisition", ("engine",))
+cache_requests_total = metrics.registry.counter("cache_requests_total", "Cache lookups by result", ("cache", "result"))
+cache_evictions_total = metrics.registry.counter("cache_evictions_total", "Cache evictions", ("cache",))
+cache_entries = metrics.registry.gauge("cache_entries", "Cache entries", ("cache",))
+cache_hit_ratio = metrics.registry.gauge("cache_hit_ratio", "Cache hit ratio including stale hits", ("cache",))
+
+
+def collect_pool_and_cache_metrics():
+    for name, stats in get_pool_stats().items():
+        if "size" in stats:
+            db_pool_size.set(stats["size"], engine=name)
+            db_pool_checked_out.set(stats["checked_out"], engine=name)
+            db_pool_overflow.set(stats["overflow"], engine=name)
+        if "wait_count" in stats:
+            db_pool_checkouts_total.set_total(stats["wait_count"], engine=name)
+            db_pool_wait_seconds_total.set_total(stats["wait_total_ms"] / 1000, engine=name)
+            db_pool_wait_max_seconds.set(stats["wait_max_ms"] / 1000, engine=name)
+    stats = filter_cache.stats()
+    cache_requests_total.set_total(stats["hits"], cache="filter", result="hit")
+    cache_requests_total.set_total(stats["stale_hits"], cache="filter", result="stale_hit")
+    cache_requests_total.set_total(stats["misses"], cache="filter", result="miss")
+    cache_evictions_total.set_total(stats["evictions"], cache="filter")
+    cache_entries.set(stats["size"], cache="filter")
+    cache_hit_ratio.set(stats["hit_ratio"], cache="filter")
+
+
+metrics.registry.add_collector(collect_pool_and_cache_metrics)
+
+
+# 指标端点(Prometheus 文本格式)
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus 指标"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 # 应用启动事件
 @app.on_event("startup")
 async def startup_event():
@@ -73,12 +225,38 @@ async def startup_event():
     logger.info(f"Starting {Config.APP_NAME} v{Config.APP_VERSION}")
     logger.info(f"Environment: {Config.__class__.__name__}")
     logger.info(f"API Prefix: {Config.API_PREFIX}")
+    if Config.COEFFICIENT_FILE:
+        version = coefficient_registry.load_file(Config.COEFFICIENT_FILE)
+        logger.info(f"Coefficients v{version} loaded from {Config.COEFFICIENT_FILE}")
+    if Config.CATALOG_ENABLED and Config.CATALOG_SNAPSHOT_PATH:
+        # 快照加载失败时退回数据库
+        try:
+            load_catalog_snapshot(Config.CATALOG_SNAPSHOT_PATH)
+        except Exception as e:
+            logger.error(f"Failed to load catalog snapshot {Config.CATALOG_SNAPSHOT_PATH}, loading from database: {str(e)}")
+    db = SessionLocal()
+    try:
+        if Config.CATALOG_ENABLED:
+            if get_catalog() is None:
+                load_catalog(db)
+        else:
+            load_sc_quant_grid(db, clamp=Config.SC_QUANT_CLAMP)
+    except Exception as e:
+        # 目录必须可用；修正系数网格加载失败时退回逐次查询
+        if Config.CATALOG_ENABLED:
+            raise
+        logger.error(f"Failed to load SC quant grid, falling back to per-request lookup: {str(e)}")
+    finally:
+        db.close()
+    if Config.CATALOG_POLL_INTERVAL > 0:
+        catalog_poller.start()
 
 # 应用关闭事件
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时执行"""
     logger.info(f"Shutting down {Config.APP_NAME}")
+    catalog_poller.stop()
 
 if __name__ == '__main__':
     uvicorn.run(
@@ -0,0 +1,76 @@
+"""
+测试公共夹具
+
+应用配置和数据库引擎在导入时创建，因此在导入 app 之前设置环境变量，测试使用临时 SQLite 数据库
+"""
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix="cooler-test-")
+os.environ.update({
+    "DB_HOST": "localhost",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test",
+    "DATABASE_URL": f"sqlite:///{_db_dir}/test.db",
+    "ASYNC_DB_ENABLED": "false",
+    "CATALOG_ENABLED": "false",
+    "FILTER_DB_PUSHDOWN": "false",
+    "FILTER_CACHE_ENABLED": "true",
+    "LOG_LEVEL": "WARNING",
+})
+
+from app.config.config import Config  # noqa: E402
+from app.models.dao import Cooler, CoolingCapacity  # noqa: E402
+from app.models.database import Base, SessionLocal, engine  # noqa: E402
+from app.services import cooler_catalog, cooler_service, sc_quant_grid  # noqa: E402
+from app.services.cooler_service import filter_cache  # noqa: E402
+
+WORKING_STATUSES = ("SC1", "SC2", "SC3", "SC4", "SC5")
+REFRIGERANTS = ("R404A", "R22")
+
+
+def seed_coolers(session, count: int, seed: int = 1) -> None:
+    """写入 count 台冷风机及其各(工况, 制冷剂)冷量，冷量取一位小数以产生相同差值"""
+    rnd = random.Random(seed)
+    for i in range(count):
+        fin = rnd.choice([4.0, 4.5, 6.0, 8.0])
+        session.add(Cooler(
+            model=f"M{i}", heat_exchange_area=round(rnd.uniform(10, 300), 1), fin_spacing=f"C=={fin}",
+            fin_spacing_num=fin, series=rnd.choice(["DD", "DL", "DJ"]), weight=round(rnd.uniform(10, 100), 1),
+            is_deleted=0
+        ))
+        for working_status in WORKING_STATUSES:
+            for refrigerant in REFRIGERANTS:
+                session.add(CoolingCapacity(
+                    cooler_id=f"M{i}", working_status=working_status, refrigerant=refrigerant,
+                    capacity=round(rnd.uniform(1, 60), 1), is_deleted=0
+                ))
+    session.commit()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """每个测试使用重建的空库，不启用目录，结果缓存清空并回到初始数据版本"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(cooler_catalog, "_catalog", None)
+    monkeypatch.setattr(cooler_service, "_data_version", 0)
+    monkeypatch.setattr(filter_cache, "version", None)
+    monkeypatch.setattr(sc_quant_grid, "_grid", None)
+    monkeypatch.setattr(Config, "FILTER_DB_PUSHDOWN", False)
+    filter_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        filter_cache.clear()
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.bench import percentile
+
+
+@pytest.mark.parametrize("n,q,expected", [
+    (100, 50, 50),
+    (100, 95, 95),
+    (100, 99, 99),
+    (100, 100, 100),
+    (1000, 99.9, 999),
+    (20, 95, 19),
+    (7, 50, 4),
+    (1, 99, 1),
+    (10, 0, 1),
+])
+def test_percentile_is_nearest_rank(n, q, expected):
+    values = list(range(1, n + 1))
+    assert percentile(values, q) == expected
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.capacity_index import CapacityIndex
+
+
+def _random_index(rnd: random.Random, size: int):
+    """冷量取少量整数和半整数，制造大量相同冷量和相同差值；ID与行号顺序无关"""
+    capacities = np.array([rnd.randint(0, 40) / 2 for _ in range(size)], dtype=np.float64)
+    rows = np.array(rnd.sample(range(size * 3), size), dtype=np.int32)
+    ids = rnd.sample(range(1, size * 10), size * 3)
+    return CapacityIndex(capacities, rows), capacities, rows, ids
+
+
+def _brute_nearest(capacities, rows, target_cap, k, mask=None):
+    """
+    按差值升序排列全部记录
+
+    差值相同时较小的冷量在前；冷量相同时，小于目标的一侧按行号降序、其余按行号升序(由内向外展开的顺序)
+    """
+    candidates = [(row, cap) for row, cap in zip(rows.tolist(), capacities.tolist()) if mask is None or mask[row]]
+    candidates.sort(key=lambda item: (abs(item[1] - target_cap), item[1], -item[0] if item[1] < target_cap else item[0]))
+    return candidates[:k]
+
+
+def _brute_page_order(capacities, rows, ids, target_cap, mask=None):
+    """按 (差值, ID) 升序排列全部记录 [(行号, 冷量, 差值)]"""
+    candidates = [(abs(cap - target_cap), ids[row], row, cap)
+                  for row, cap in zip(rows.tolist(), capacities.tolist()) if mask is None or mask[row]]
+    candidates.sort()
+    return [(row, cap, distance) for distance, _, row, cap in candidates]
+
+
+def _targets(rnd: random.Random):
+    # 包含与冷量重合、落在两个冷量正中间以及超出两端的目标
+    return [-3.0, 0.0, 7.25, 10.0, 10.5, 12.75, 20.0, 25.0] + [rnd.uniform(-2, 22) for _ in range(20)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("size", [1, 7, 60])
+def test_nearest_matches_brute_force(seed, size):
+    rnd = random.Random(seed)
+    index, capacities, rows, _ = _random_index(rnd, size)
+    mask = np.array([rnd.random() < 0.5 for _ in range(size * 3)])
+    for target_cap in _targets(rnd):
+        for k in (1, 3, 5, size + 2):
+            assert index.nearest(target_cap, k) == _brute_nearest(capacities, rows, target_cap, k)
+            assert index.nearest(target_cap, k, mask) == _brute_nearest(capacities, rows, target_cap, k, mask)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("size", [1, 7, 60])
+def test_nearest_batch_matches_brute_force(seed, size):
+    rnd = random.Random(seed)
+    index, capacities, rows, _ = _random_index(rnd, size)
+    targets = _targets(rnd)
+    mask = np.array([rnd.random() < 0.5 for _ in range(size * 3)])
+    # 无位图的目标走向量化窗口，带位图的目标逐个展开
+    masks = [mask if i % 3 == 0 else None for i in range(len(targets))]
+    for k in (1, 5, size + 2):
+        expected = [_brute_nearest(capacities, rows, target_cap, k, target_mask)
+                    for target_cap, target_mask in zip(targets, masks)]
+        assert index.nearest_batch(np.array(targets), k, masks) == expected
+        assert index.nearest_batch(np.array(targets), k) == [
+            _brute_nearest(capacities, rows, target_cap, k) for target_cap in targets
+        ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("page_size", [1, 3, 8])
+def test_page_walk_matches_brute_force(seed, page_size):
+    rnd = random.Random(seed)
+    index, capacities, rows, ids = _random_index(rnd, 60)
+    mask = np.array([rnd.random() < 0.6 for _ in range(len(ids))])
+    for target_cap in _targets(rnd)[:12]:
+        for page_mask in (None, mask):
+            expected = _brute_page_order(capacities, rows, ids, target_cap, page_mask)
+            walked = []
+            after = None
+            # 每页至少前进一条，页数有上限
+            for _ in range(len(expected) + 2):
+                page = index.page(target_cap, page_size, ids, after, page_mask)
+                assert len(page) <= page_size
+                walked.extend(page)
+                if len(page) < page_size:
+                    break
+                last_row, _, last_distance = page[-1]
+                after = (last_distance, ids[last_row])
+            assert walked == expected
+
+
+def test_from_sorted_matches_constructor():
+    rnd = random.Random(3)
+    index, _, _, _ = _random_index(rnd, 40)
+    restored = CapacityIndex.from_sorted(index.capacities.copy(), index.rows.copy())
+    for target_cap in _targets(rnd):
+        assert restored.nearest(target_cap, 6) == index.nearest(target_cap, 6)
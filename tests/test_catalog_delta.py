@@ -0,0 +1,123 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.models.repositories import (
+    CatalogVersionRepository,
+    CoolerRepository,
+    CoolingCapacityRepository,
+    SCQuantRepository
+)
+from app.services.catalog_poller import CatalogPoller
+from app.services.cooler_catalog import CoolerCatalog, get_catalog, load_catalog
+
+from conftest import REFRIGERANTS, WORKING_STATUSES, seed_coolers
+
+
+def assert_same_catalog(actual: CoolerCatalog, expected: CoolerCatalog) -> None:
+    """增量更新的目录与全量加载的目录逐项一致(行号、列、位图、冷量索引、预渲染片段)"""
+    assert actual.size == expected.size
+    assert actual.id_list == expected.id_list
+    assert np.array_equal(actual.ids, expected.ids)
+    assert actual.float_columns.keys() == expected.float_columns.keys()
+    for column in expected.float_columns:
+        assert np.array_equal(actual.float_columns[column], expected.float_columns[column], equal_nan=True), column
+    assert actual.string_columns == expected.string_columns
+    assert actual.model_index == expected.model_index
+    assert actual.duplicate_rows == expected.duplicate_rows
+    for name in ("fin_spacing_bitmaps", "series_bitmaps"):
+        actual_bitmaps, expected_bitmaps = getattr(actual, name), getattr(expected, name)
+        assert actual_bitmaps.keys() == expected_bitmaps.keys(), name
+        for value in expected_bitmaps:
+            assert np.array_equal(actual_bitmaps[value], expected_bitmaps[value]), (name, value)
+    assert actual.partitions.keys() == expected.partitions.keys()
+    for partition in expected.partitions:
+        assert actual.partitions[partition].capacities.tolist() == expected.partitions[partition].capacities.tolist()
+        assert actual.partitions[partition].rows.tolist() == expected.partitions[partition].rows.tolist()
+    assert actual.fragments == expected.fragments
+    assert actual.status_suffixes == expected.status_suffixes
+    for name in ("evaporating_temps", "delta_ts", "values"):
+        assert np.array_equal(getattr(actual.sc_quant_grid, name), getattr(expected.sc_quant_grid, name),
+                              equal_nan=True), name
+
+
+def _random_change(rnd: random.Random, session, models: list, step: int) -> None:
+    """通过仓库执行一次随机写入，每次写入递增目录版本号并记录变更型号"""
+    coolers = CoolerRepository(session)
+    capacities = CoolingCapacityRepository(session)
+    model = rnd.choice(models)
+    cooler = coolers.get_by_fields(model=model)
+    op = rnd.choice(["update", "delete", "create", "rename", "duplicate", "capacity", "capacity_delete",
+                     "new_partition", "quant"])
+    if op == "update" and cooler:
+        coolers.update(cooler.id, weight=rnd.uniform(1, 99), series=rnd.choice(["DD", "ZZ", None]),
+                       fin_spacing_num=rnd.choice([4.5, 7.0, None]))
+    elif op == "delete" and cooler:
+        coolers.delete(cooler.id)
+    elif op == "create":
+        model = f"N{step}"
+        models.append(model)
+        coolers.create(model=model, heat_exchange_area=10 + step, series="NEW", is_deleted=0)
+        capacities.create(cooler_id=model, working_status="SC1", refrigerant="R404A",
+                          capacity=round(rnd.uniform(1, 60), 1), is_deleted=0)
+    elif op == "rename" and cooler:
+        model = f"R{step}"
+        models.append(model)
+        coolers.update(cooler.id, model=model)
+    elif op == "duplicate":
+        # 同一型号的重复冷风机记录，选型以先出现的为准
+        coolers.create(model=model, heat_exchange_area=99, series="DUP", is_deleted=0)
+    elif op == "capacity":
+        capacities.create(cooler_id=model, working_status=rnd.choice(WORKING_STATUSES),
+                          refrigerant=rnd.choice(REFRIGERANTS), capacity=round(rnd.uniform(1, 60), 1), is_deleted=0)
+    elif op == "capacity_delete":
+        capacities.delete_by_cooler_id(model)
+    elif op == "new_partition":
+        capacities.create(cooler_id=model, working_status="SC1", refrigerant="R507C", capacity=5.0, is_deleted=0)
+    elif op == "quant":
+        SCQuantRepository(session).create(evaporating_temp=rnd.choice([-30, -20, -10, 0]),
+                                          delta_t=rnd.choice([5, 6, 8, 10]), quant=round(rnd.uniform(0.5, 1.5), 3),
+                                          is_deleted=0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_delta_apply_equals_full_reload(db, seed):
+    seed_coolers(db, 40, seed=seed)
+    load_catalog(db)
+    poller = CatalogPoller(1)
+    poller.source_version = CatalogVersionRepository(db).get_version()
+
+    rnd = random.Random(seed)
+    models = [f"M{i}" for i in range(40)]
+    for step in range(40):
+        _random_change(rnd, db, models, step)
+        if poller.poll(db):
+            assert_same_catalog(get_catalog(), CoolerCatalog.load(db))
+
+    # 变更均按型号增量应用，未退化为整体重新加载
+    assert poller.delta_updates > 0
+    assert poller.full_reloads == 0
+
+
+def test_delta_apply_preserves_search_results(db):
+    seed_coolers(db, 30)
+    load_catalog(db)
+    poller = CatalogPoller(1)
+    poller.source_version = CatalogVersionRepository(db).get_version()
+    coolers = CoolerRepository(db)
+    coolers.update(coolers.get_by_fields(model="M3").id, series="ZZ")
+    CoolingCapacityRepository(db).delete_by_cooler_id("M7")
+    assert poller.poll(db)
+
+    catalog, full = get_catalog(), CoolerCatalog.load(db)
+    mask, full_mask = catalog.build_mask(None, "ZZ", None, None), full.build_mask(None, "ZZ", None, None)
+    for working_status in WORKING_STATUSES:
+        for target_cap in (1.0, 15.5, 30.0, 59.0):
+            expected = [(full.id_list[row], cap) for row, cap in full.nearest(working_status, "R404A", target_cap, 5)]
+            assert [(catalog.id_list[row], cap)
+                    for row, cap in catalog.nearest(working_status, "R404A", target_cap, 5)] == expected
+            expected = [(full.id_list[row], cap)
+                        for row, cap in full.nearest(working_status, "R404A", target_cap, 5, full_mask)]
+            assert [(catalog.id_list[row], cap)
+                    for row, cap in catalog.nearest(working_status, "R404A", target_cap, 5, mask)] == expected
@@ -0,0 +1,103 @@
+from sqlalchemy import select
+
+from app.models.dao import CoolingCapacity
+from app.models.database import engine
+from app.models.repositories import CatalogVersionRepository
+from app.utils.catalog_sync import CAPACITY_SYNC, COOLER_SYNC, SC_QUANT_SYNC, plan_sync, sync_table
+
+CHUNK_SIZE = 100
+
+
+def _capacity_rows(model: str, statuses, capacity: float = 10.0) -> list:
+    return [
+        CAPACITY_SYNC.with_hash({
+            "cooler_id": model, "working_status": status, "refrigerant": "R404A",
+            "capacity": capacity + i, "is_deleted": 0
+        })
+        for i, status in enumerate(statuses)
+    ]
+
+
+def _cooler_rows(models) -> list:
+    return [COOLER_SYNC.with_hash({"model": model, "heat_exchange_area": 50.0, "is_deleted": 0}) for model in models]
+
+
+def _quant_rows(points) -> list:
+    return [
+        SC_QUANT_SYNC.with_hash({"evaporating_temp": temp, "delta_t": delta_t, "quant": 1.0, "is_deleted": 0})
+        for temp, delta_t in points
+    ]
+
+
+def _active_capacities() -> set:
+    table = CoolingCapacity.__table__
+    with engine.connect() as connection:
+        return set(connection.execute(
+            select(table.c.cooler_id, table.c.working_status).where(table.c.is_deleted == 0)
+        ).all())
+
+
+def _deleted_keys(plan) -> set:
+    return {tuple(row[name] for name in plan.spec.key_columns) for _, row in plan.deletes}
+
+
+def _seed_capacities():
+    sync_table(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2", "SC3"]) + _capacity_rows("B", ["SC1", "SC2"]),
+               CHUNK_SIZE)
+
+
+def test_partial_workbook_deletes_only_within_its_scope(db):
+    _seed_capacities()
+
+    # 工作簿只含型号 A，且 A 少了 SC3：只删除 A/SC3，B 不受影响
+    plan = plan_sync(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2"]))
+    assert _deleted_keys(plan) == {("A", "SC3", "R404A")}
+    assert plan.summary() == {"inserted": 0, "updated": 0, "deleted": 1, "unchanged": 2}
+
+    sync_table(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2"]), CHUNK_SIZE)
+    assert _active_capacities() == {("A", "SC1"), ("A", "SC2"), ("B", "SC1"), ("B", "SC2")}
+
+
+def test_delete_missing_deletes_across_scopes(db):
+    _seed_capacities()
+    plan = plan_sync(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2"]), delete_missing=True)
+    assert _deleted_keys(plan) == {("A", "SC3", "R404A"), ("B", "SC1", "R404A"), ("B", "SC2", "R404A")}
+
+
+def test_unchanged_import_writes_nothing(db):
+    _seed_capacities()
+    version = CatalogVersionRepository(db).get_version()
+    plan = sync_table(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2", "SC3"]), CHUNK_SIZE)
+    assert plan.changes == 0
+    assert CatalogVersionRepository(db).get_version() == version
+
+
+def test_duplicates_deleted_only_for_incoming_keys(db):
+    _seed_capacities()
+    # 直接写入重复行，绕过同步
+    table = CoolingCapacity.__table__
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [
+            {"cooler_id": "A", "working_status": "SC1", "refrigerant": "R404A", "capacity": 1.0, "is_deleted": 0},
+            {"cooler_id": "B", "working_status": "SC1", "refrigerant": "R404A", "capacity": 1.0, "is_deleted": 0},
+        ])
+
+    plan = plan_sync(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2", "SC3"]))
+    assert _deleted_keys(plan) == {("A", "SC1", "R404A")}
+    plan = plan_sync(CAPACITY_SYNC, _capacity_rows("A", ["SC1", "SC2", "SC3"]), delete_missing=True)
+    assert _deleted_keys(plan) == {("A", "SC1", "R404A"), ("B", "SC1", "R404A"), ("B", "SC2", "R404A")}
+    # delete_missing 时 B 的重复行和 B 的两条行全部删除
+    assert len([row_id for row_id, row in plan.deletes if row["cooler_id"] == "B"]) == 3
+
+
+def test_table_without_scope_keeps_missing_rows(db):
+    sync_table(COOLER_SYNC, _cooler_rows(["A", "B"]), CHUNK_SIZE)
+    assert plan_sync(COOLER_SYNC, _cooler_rows(["A"])).deletes == []
+    assert _deleted_keys(plan_sync(COOLER_SYNC, _cooler_rows(["A"]), delete_missing=True)) == {("B",)}
+
+
+def test_sc_quant_scope_is_evaporating_temp(db):
+    sync_table(SC_QUANT_SYNC, _quant_rows([(-20, 5), (-20, 6), (-10, 5), (-10, 6)]), CHUNK_SIZE)
+    # 只导入 -20 的一列，-20 下消失的温差删除，-10 不受影响
+    plan = plan_sync(SC_QUANT_SYNC, _quant_rows([(-20, 5)]))
+    assert _deleted_keys(plan) == {(-20.0, 6.0)}
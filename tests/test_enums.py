@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.utils.coefficients import SC_LEVEL_CODES, get_coefficient_registry
+from app.utils.enums import SC_LEVEL_MAX_TEMP, SC_LEVEL_RANGES, SCLevel
+
+TEMPS = [x / 8 for x in range(-400, 81)] + [-4.0001, -27.9999, -1e9, float("-inf")]
+
+
+def _brute_force(value: float) -> SCLevel:
+    for low, high, level in SC_LEVEL_RANGES:
+        if low <= value <= high:
+            return level
+    return SCLevel.SC5
+
+
+def test_get_level_by_value_matches_ranges():
+    for value in TEMPS + [float("nan")]:
+        assert SCLevel.get_level_by_value(value) is _brute_force(value), value
+    assert SCLevel.get_level_by_value(np.float64(-34.75)) is SCLevel.SC4
+    assert SCLevel.get_level_by_value(-4.5) is SCLevel.SC5
+
+
+def test_registry_level_codes_match_get_level_by_value():
+    codes = get_coefficient_registry().sc_level_codes(np.array(TEMPS)).tolist()
+    assert codes == [SC_LEVEL_CODES[SCLevel.get_level_by_value(value)] for value in TEMPS]
+
+
+@pytest.mark.parametrize("value", [SC_LEVEL_MAX_TEMP + 0.5, math.inf])
+def test_temperature_above_max_is_rejected(value):
+    with pytest.raises(ValueError):
+        SCLevel.get_level_by_value(value)
+    with pytest.raises(ValueError):
+        get_coefficient_registry().sc_level_codes(np.array([0, value]))
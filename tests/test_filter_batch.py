@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+
+from app.models.dao import Cooler
+from app.models.database import engine
+from app.schemas.product import CoolerFilter
+from app.services.cooler_catalog import load_catalog
+from app.services.cooler_projection import CoolerProjection
+from app.services.cooler_service import CoolerService
+
+from conftest import seed_coolers
+
+
+def _filters():
+    return [
+        CoolerFilter(evaporating_temp=temp, repo_temp=temp + 8, required_cooling_cap=cap, refrigerant=refrigerant,
+                     fan_distance=fan_distance)
+        for temp in (-30, -20, -8, 0)
+        for cap in (10, 40)
+        for refrigerant in ("R404A", "R22")
+        for fan_distance in (None, 4.5)
+    ]
+
+
+def _project(projection: CoolerProjection, result: dict) -> dict:
+    """投影完整结果，作为对照"""
+    return projection.build(tuple(getattr(item, field) for field in projection.fields) for item in result["items"])
+
+
+@pytest.mark.parametrize("mode", ["db", "catalog"])
+@pytest.mark.parametrize("fields,compact", [("model,cooling_capacity,working_status", False), ("id,weight", True)])
+def test_batch_projection_matches_full_result(db, mode, fields, compact):
+    seed_coolers(db, 30)
+    if mode == "catalog":
+        load_catalog(db)
+    projection = CoolerProjection.parse(fields, compact)
+    filters = _filters()
+
+    full = CoolerService.filter_cooler_batch(db, filters)
+    projected = CoolerService.filter_cooler_batch(db, filters, projection)
+
+    assert projected == [_project(projection, result) for result in full]
+    if mode == "catalog":
+        assert projected == [CoolerService.filter_cooler(db, params, projection) for params in filters]
+
+
+def test_batch_projection_queries_only_projected_columns(db):
+    seed_coolers(db, 10)
+    projection = CoolerProjection.parse("model,cooling_capacity", False)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        CoolerService.filter_cooler_batch(db, _filters()[:4], projection)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    cooler_queries = [statement for statement in statements if "FROM cooler" in statement]
+    assert cooler_queries
+    assert all(Cooler.weight.name not in statement.split("FROM")[0] for statement in cooler_queries)
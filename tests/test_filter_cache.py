@@ -0,0 +1,56 @@
+import orjson
+import pytest
+
+from app.config.config import Config
+from app.models.dao import Cooler, CoolingCapacity
+from app.schemas.product import CoolerFilter
+from app.services.cooler_catalog import load_catalog
+from app.services.cooler_service import CoolerService, filter_cache
+
+
+def _seed_level_boundary(session):
+    """同一型号在 SC1 和 SC5 下冷量不同，蒸发温度 -4.0 属于 SC1，-4.004 落在区间缝隙中属于 SC5"""
+    for i, (sc1, sc5) in enumerate([(13.2, 13.4), (12.7, 14.5), (30.0, 2.0), (5.0, 40.0)]):
+        session.add(Cooler(model=f"B{i}", heat_exchange_area=50 + i, series="DD", is_deleted=0))
+        session.add(CoolingCapacity(cooler_id=f"B{i}", working_status="SC1", refrigerant="R404A", capacity=sc1,
+                                    is_deleted=0))
+        session.add(CoolingCapacity(cooler_id=f"B{i}", working_status="SC5", refrigerant="R404A", capacity=sc5,
+                                    is_deleted=0))
+    session.commit()
+
+
+def _items(data: bytes):
+    return [(item["working_status"], item["cooling_capacity"]) for item in orjson.loads(data)["items"]]
+
+
+@pytest.mark.parametrize("mode", ["db", "pushdown", "catalog"])
+def test_cached_result_depends_only_on_cache_key(db, monkeypatch, mode):
+    _seed_level_boundary(db)
+    if mode == "pushdown":
+        monkeypatch.setattr(Config, "FILTER_DB_PUSHDOWN", True)
+    if mode == "catalog":
+        load_catalog(db)
+
+    def query(evaporating_temp):
+        params = CoolerFilter(evaporating_temp=evaporating_temp, repo_temp=4, required_cooling_cap=10)
+        return CoolerService.filter_cooler_json(db, params)
+
+    # -4.004 与 -4.0 量化后为同一缓存键，先到的请求不影响缓存值
+    first = query(-4.004)
+    cached = query(-4.0)
+    assert len(filter_cache) == 1
+    filter_cache.clear()
+    fresh = query(-4.0)
+    assert first == cached == fresh
+    assert {status for status, _ in _items(fresh)} == {"SC1"}
+
+
+def test_quantize_params_rounds_to_quantum():
+    params = CoolerFilter(evaporating_temp=-4.004, repo_temp=0.066, required_cooling_cap=10.005,
+                          fan_distance=4.5, min_heat_exchange_area=None)
+    quantized = CoolerService.quantize_params(params)
+    assert quantized.evaporating_temp == -4.0
+    assert quantized.repo_temp == 0.07
+    assert quantized.fan_distance == 4.5
+    assert quantized.min_heat_exchange_area is None
+    assert CoolerService.cache_key(quantized) == CoolerService.cache_key(params)
@@ -0,0 +1,40 @@
+import pytest
+
+from app.config.config import Config
+from app.models.dao import Cooler, CoolingCapacity
+from app.schemas.product import CoolerFilter
+from app.services.cooler_catalog import load_catalog
+from app.services.cooler_service import TOP_K, CoolerService
+
+
+PARAMS = CoolerFilter(evaporating_temp=-20, repo_temp=-12, required_cooling_cap=10)
+
+
+def _seed_with_deleted(session):
+    """离目标冷量最近的三台冷风机已逻辑删除，其冷量记录仍未删除"""
+    # 未写入修正系数，各模式均按工况等级取值
+    target_cap = CoolerService.get_target_cap(PARAMS, None)
+    for i in range(10):
+        session.add(Cooler(model=f"D{i}", heat_exchange_area=50 + i, series="DD", is_deleted=1 if i < 3 else 0))
+        session.add(CoolingCapacity(cooler_id=f"D{i}", working_status="SC3", refrigerant="R404A",
+                                    capacity=target_cap + i * 1.5, is_deleted=0))
+    # 没有冷风机记录的冷量同样不参与排序
+    session.add(CoolingCapacity(cooler_id="ORPHAN", working_status="SC3", refrigerant="R404A",
+                                capacity=target_cap, is_deleted=0))
+    session.commit()
+
+
+@pytest.mark.parametrize("mode", ["db", "pushdown", "catalog"])
+def test_deleted_coolers_do_not_take_top_k_slots(db, monkeypatch, mode):
+    _seed_with_deleted(db)
+    if mode == "pushdown":
+        monkeypatch.setattr(Config, "FILTER_DB_PUSHDOWN", True)
+    if mode == "catalog":
+        load_catalog(db)
+
+    expected = [f"D{i}" for i in range(3, 3 + TOP_K)]
+    result = CoolerService.filter_cooler(db, PARAMS)
+    assert sorted(item.model for item in result["items"]) == expected
+    if mode != "pushdown":
+        batch = CoolerService.filter_cooler_batch(db, [PARAMS])
+        assert [item.model for item in batch[0]["items"]] == expected
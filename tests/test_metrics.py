@@ -0,0 +1,37 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from app.api.v1 import products
+from app.utils import metrics
+
+EXPORT_ROUTE = "/api/v1/products/cooler/export"
+
+
+def _sample(name: str, route: str) -> float:
+    prefix = f'{name}{{method="GET",route="{route}"}} '
+    for line in metrics.registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_streaming_latency_includes_body(db, monkeypatch):
+    def slow_export(export_format):
+        for i in range(3):
+            time.sleep(0.1)
+            yield f"{i}\n".encode()
+
+    monkeypatch.setattr(products, "iter_export", slow_export)
+    total_before = _sample("http_request_duration_seconds_sum", EXPORT_ROUTE)
+    count_before = _sample("http_request_duration_seconds_count", EXPORT_ROUTE)
+
+    response = TestClient(main.app).get(EXPORT_ROUTE)
+
+    assert response.content == b"0\n1\n2\n"
+    assert _sample("http_request_duration_seconds_count", EXPORT_ROUTE) == count_before + 1
+    assert _sample("http_request_duration_seconds_sum", EXPORT_ROUTE) - total_before >= 0.3
+    in_progress = [line for line in metrics.registry.render().splitlines()
+                   if line.startswith('http_requests_in_progress{method="GET"}')]
+    assert in_progress == ['http_requests_in_progress{method="GET"} 0']